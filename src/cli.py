@@ -0,0 +1,235 @@
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+from typing import Any, List, Optional, TextIO
+
+import mysql.connector
+from dotenv import load_dotenv
+
+from core.saved_connections import ConnectionManager
+from core.script_runner import split_statements
+import database
+
+# Headless entry point: runs SQL from files or stdin and streams results
+# to stdout as CSV or JSON lines. Reuses the core without importing Tk.
+#   python src/cli.py -c user@host -d shop -f jsonl queries.sql
+#   echo "SELECT 1" | python src/cli.py --host localhost --user root
+
+# Exit codes
+EXIT_OK = 0
+EXIT_SQL_ERROR = 1
+EXIT_USAGE = 2              # Also used by argparse
+EXIT_CONNECTION_ERROR = 3
+
+# ----------------------------- Output Writers ---------------------------- #
+def _json_value(value: Any) -> Any:
+    """
+    Convert a column value to a JSON-serializable value.
+    
+    Args:
+        value (Any): The value from the cursor
+        
+    Returns:
+        Any: The value, as a JSON type (text for dates, decimals, ...)
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+class ResultWriter:
+    """
+    Writes result sets to an output stream, as CSV (a header row per 
+    result set) or JSON lines (one object per row).
+    
+    Args:
+        output (TextIO): The stream to write to
+        output_format (str): 'csv' or 'jsonl'
+    """
+    __slots__ = ["_output", "_format", "_csv"]
+    
+    def __init__(self, output: TextIO, output_format: str) -> None:
+        self._output = output
+        self._format = output_format
+        self._csv = csv.writer(output, lineterminator="\n")
+        
+    def header(self, columns: List[str]) -> None:
+        """
+        Start a new result set.
+        
+        Args:
+            columns (List[str]): The column names
+        """
+        if self._format == "csv":
+            self._csv.writerow(columns)
+    
+    def rows(self, columns: List[str], rows: List[tuple]) -> None:
+        """
+        Write a batch of rows.
+        
+        Args:
+            columns (List[str]): The column names
+            rows (List[tuple]): The rows
+        """
+        if self._format == "csv":
+            self._csv.writerows(
+                [_json_value(value) for value in row] for row in rows)
+        else:
+            self._output.write("".join(
+                json.dumps(dict(zip(columns, map(_json_value, row))),
+                           ensure_ascii=False) + "\n"
+                for row in rows))
+# ----------------------------^ Output Writers ^---------------------------- #
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+    
+    Args:
+        argv (Optional [List[str]]): The arguments (default sys.argv)
+    """
+    parser = argparse.ArgumentParser(
+        description="Run SQL on a MySQL server without the GUI, streaming "
+                    "results to stdout.")
+    parser.add_argument("files", nargs="*", 
+                        help="SQL files to run (default: read stdin)")
+    parser.add_argument("-e", "--execute", 
+                        help="SQL to run instead of files")
+    parser.add_argument("-c", "--connection", 
+                        help="Name (user@host) of a saved connection")
+    parser.add_argument("--saved-connections", 
+                        default="src/saved_connections.json",
+                        help="Saved connections file")
+    parser.add_argument("--host", help="Host (default: $DB_HOST)")
+    parser.add_argument("--user", help="User (default: $DB_USER)")
+    parser.add_argument("--password", 
+                        help="Password (default: $DB_PASSWORD)")
+    parser.add_argument("-d", "--database", help="Database to use")
+    parser.add_argument("-f", "--format", choices=("csv", "jsonl"),
+                        default="csv", help="Output format")
+    parser.add_argument("--fetch-size", type=int, default=1000,
+                        help="Rows fetched per round trip")
+    parser.add_argument("--continue-on-error", action="store_true",
+                        help="Run the remaining statements after an error")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Report each statement on stderr")
+    return parser.parse_args(argv)
+
+def _connect(args: argparse.Namespace) -> mysql.connector.MySQLConnection:
+    """
+    Connect using a saved connection, or the given or environment 
+    credentials.
+    
+    Args:
+        args (argparse.Namespace): The parsed arguments
+        
+    Returns:
+        MySQLConnection: The connection
+    """
+    if args.connection:
+        saved = ConnectionManager(args.saved_connections).get_connections()
+        if args.connection not in saved:
+            raise KeyError(f"No saved connection named {args.connection}")
+        details = saved[args.connection]
+    else:
+        load_dotenv()
+        # Given but empty values (e.g. --password "") are still used
+        details = {key: value if value is not None else os.getenv(variable)
+                   for key, value, variable in (
+                       ("host", args.host, "DB_HOST"),
+                       ("user", args.user, "DB_USER"),
+                       ("password", args.password, "DB_PASSWORD"))}
+    return mysql.connector.connect(
+        host=details["host"],
+        user=details["user"],
+        password=details["password"],
+        database=args.database
+    )
+
+def _read_script(args: argparse.Namespace) -> str:
+    """
+    Read the SQL to run from -e, the given files, or stdin.
+    
+    Args:
+        args (argparse.Namespace): The parsed arguments
+    """
+    if args.execute is not None:
+        return args.execute
+    if not args.files:
+        return sys.stdin.read()
+    scripts = []
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as file:
+            scripts.append(file.read())
+    # Each file ends its last statement
+    return "\n;\n".join(scripts)
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the CLI.
+    
+    Args:
+        argv (Optional [List[str]]): The arguments (default sys.argv)
+        
+    Returns:
+        int: The exit code
+    """
+    args = _parse_args(argv)
+    output = sys.stdout
+    # Results are the only thing written to stdout; the core's own 
+    # messages (print) go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            statements = split_statements(_read_script(args))
+        except OSError as err:
+            print(f"Could not read SQL: {err}")
+            return EXIT_USAGE
+        try:
+            connection = _connect(args)
+        except (mysql.connector.Error, KeyError) as err:
+            print(f"Could not connect: {err}")
+            return EXIT_CONNECTION_ERROR
+        writer = ResultWriter(output, args.format)
+        exit_code = EXIT_OK
+        stream = None
+        try:
+            for index, statement in enumerate(statements, 1):
+                rows = 0
+                stream = database.stream_query(connection, statement.text,
+                                               args.fetch_size)
+                try:
+                    for batch_index, (columns, batch) in enumerate(stream):
+                        if batch_index == 0:
+                            writer.header(columns)
+                        writer.rows(columns, batch)
+                        rows += len(batch)
+                except mysql.connector.Error as err:
+                    exit_code = EXIT_SQL_ERROR
+                    print(f"Statement {index} failed: {err}")
+                    if not args.continue_on_error:
+                        break
+                    continue
+                if args.verbose:
+                    print(f"Statement {index}: {rows} rows")
+            output.flush()
+        except BrokenPipeError:
+            # Output closed early (e.g. piped into head), stop quietly
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, output.fileno())
+        finally:
+            try:
+                # Reads the rest of a result abandoned by a broken pipe,
+                # so the connection can be closed
+                if stream is not None:
+                    stream.close()
+                connection.close()
+            except mysql.connector.Error:
+                pass
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -1,14 +1,32 @@
 
-from typing import Dict, Any
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Optional
 import mysql.connector
 
 from ui.ui_components import UIComponents
+from core.query_handle import QueryHandle
+from core.script_runner import ScriptRunner
+from core.query_history import QueryHistory
+import core.query_profiler as profiler
+from core.autocomplete import CompletionEngine
+from core.async_backend import AsyncBackend
+from core.prefetcher import Prefetcher
 import database
+import database_aio
 # Windows
 from ui.windows.main_window import MainWindow
 from ui.windows.new_connection_window import NewConnectionWindow
 from ui.windows.server_window import ServerWindow
 from ui.windows.saved_connections_window import SavedConnectionsWindow
+from ui.windows.result_window import ResultWindow
+from ui.windows.script_window import ScriptWindow
+from ui.windows.history_window import HistoryWindow
+from ui.windows.profiler_window import ProfilerWindow
+from ui.windows.advisor_window import AdvisorWindow
+from ui.windows.diff_window import DiffWindow
+from ui.windows.database_window import DatabaseWindow
 
 class AppState():
     """
@@ -19,17 +37,42 @@ class AppState():
         - Handling events through the UIComponents event system
         - Beginning and Quitting the application
     """
-    __slots__ = ["_ui_components", "_connections", "_windows", 
-                 "_selected_connection"]
+    # Seconds to wait for a cancelled query to release its connection
+    CANCEL_WAIT_SECONDS = 5
+    # Seconds between server status updates in the server window
+    STATUS_INTERVAL_SECONDS = 2
+    # Windows that run work on the selected connection, one at a time
+    CONNECTION_WINDOWS = ("result_window", "script_window", 
+                          "profiler_window")
+    
+    __slots__ = ["_ui_components", "_connections", "_connection_details",
+                 "_windows", "_selected_connection",
+                 "_selected_connection_name", "_selected_database",
+                 "_query_history",
+                 "_completion_engines", "_async_backend", 
+                 "_status_monitor", "_prefetcher"]
              
     def __init__(self, 
                  ui_components: UIComponents,
-                 main_window: MainWindow) -> None:
+                 main_window: MainWindow,
+                 query_history: Optional[QueryHistory] = None) -> None:
         self._ui_components: UIComponents = ui_components
         self._connections: Dict[str, mysql.connector.MySQLConnection]= {}
+        # Key: connection name, Value: Dict['host', 'user', 'password']
+        self._connection_details: Dict[str, Dict[str, str]] = {}
         self._windows: Dict[str, Any] = {}
         self._windows["main_window"] = main_window
         self._selected_connection = None
+        self._selected_connection_name: Optional[str] = None
+        self._selected_database: Optional[str] = None
+        self._query_history = query_history or QueryHistory()
+        # Key: connection name, Value: its schema completion engine
+        self._completion_engines: Dict[str, CompletionEngine] = {}
+        # Event loop thread for asyncio (database_aio) work
+        self._async_backend = AsyncBackend()
+        self._status_monitor: Optional[Future] = None
+        # Prefetches databases chosen in the server window
+        self._prefetcher: Optional[Prefetcher] = None
     
         
     def _subscribe_events(self) -> None:
@@ -46,6 +89,12 @@ class AppState():
                                       self._connect_to_server)
         self._ui_components.subscribe("USE_DATABASE",
                                       self._use_database)
+        self._ui_components.subscribe("RUN_QUERY",
+                                      self._run_query)
+        self._ui_components.subscribe("RUN_SCRIPT",
+                                      self._run_script)
+        self._ui_components.subscribe("PROFILE_QUERY",
+                                      self._profile_query)
         
     # ------------------------------ Running ------------------------------ #
     def begin(self) -> None:
@@ -53,6 +102,11 @@ class AppState():
         Begin the application.
         """
         self._subscribe_events()
+        database.add_query_listener(self._query_history.on_query)
+        self._async_backend.start()
+        self._async_backend.attach(self._windows["main_window"])
+        self._ui_components.attach_render_scheduler(
+            self._windows["main_window"])
         self._windows["main_window"].create_main_menu()
         
     def quit(self) -> None:
@@ -67,6 +121,10 @@ class AppState():
         windows = list(self._windows.keys()).copy()
         for win in reversed(windows):
             self._close_window(win)
+        self._async_backend.stop()
+        # Write any queued query history
+        database.remove_query_listener(self._query_history.on_query)
+        self._query_history.close()
         raise SystemExit()
     # -----------------------------^ Running ^----------------------------- #
     
@@ -86,12 +144,42 @@ class AppState():
             case "saved_connections":
                 self._windows["saved_connections"] = \
                     SavedConnectionsWindow(self._ui_components)
+            case "history_window":
+                self._windows["history_window"] = \
+                    HistoryWindow(self._ui_components, self._query_history)
+            case "advisor_window":
+                connection_name = self._selected_connection_name
+                self._windows["advisor_window"] = AdvisorWindow(
+                    self._ui_components,
+                    lambda: self.open_side_connection(connection_name),
+                    self._query_history,
+                    connection_name,
+                    self._selected_database)
+            case "diff_window":
+                self._windows["diff_window"] = DiffWindow(
+                    self._ui_components,
+                    list(self._connections.keys()),
+                    self.open_side_connection)
+            case "database_window":
+                connection_name = self._selected_connection_name
+                if "database_window" in self._windows:
+                    self._close_window("database_window")
+                self._windows["database_window"] = DatabaseWindow(
+                    self._ui_components,
+                    lambda: self.open_side_connection(connection_name),
+                    self._selected_database,
+                    self._prefetcher)
             case "settings":
                 print(f"Settings window not implemented yet")
             case "server_window":
+                self._start_prefetcher(self._selected_connection_name)
                 self._windows["server_window"] = \
                     ServerWindow(self._ui_components, 
-                        self._selected_connection)
+                        self._selected_connection,
+                        self._completion_engines.get(
+                            self._selected_connection_name),
+                        self._prefetcher)
+                self._start_status_monitor(self._selected_connection_name)
             case _:
                 print(f"Window name {window_name} not found. Cannot open.")
         
@@ -103,6 +191,12 @@ class AppState():
             window_name (str): The name of the window to close
         """
         print(f"Closing window {window_name}")
+        if window_name == "server_window" and self._status_monitor:
+            self._status_monitor.cancel()
+            self._status_monitor = None
+        if window_name == "server_window" and self._prefetcher:
+            self._prefetcher.stop()
+            self._prefetcher = None
         self._windows[window_name].destroy()
         del self._windows[window_name]
     
@@ -135,24 +229,143 @@ class AppState():
                 self._ui_components.publish("CONNECT_SERVER_FAIL")
                 return 
         # If no errors are raised, add the connection:
-        self.add_connection(f"{user}@{host}", connection)
+        self.add_connection(f"{user}@{host}", connection,
+                            {"host": host, "user": user, 
+                             "password": password})
         print(f"Connected to {user}@{host}")
         
         self.select_connection(f"{user}@{host}")
+        self._start_completion_engine(f"{user}@{host}")
         
         self._open_window("server_window")
     
     def _use_database(self, database_name: str) -> None:
         """
-        Use a database.
+        Use a database on the selected connection, once work still running
+        on it (in a worker thread) is cancelled.
         
         Args:
             database_name (str): The name of the database to use
         """
+        if self._selected_connection is None:
+            print("No connection selected. Cannot use database.")
+            return
+        if not self._release_connection():
+            return
         print(f"Using database {database_name}")
         database.use_database(self._selected_connection, database_name)
+        self._selected_database = database_name
+        engine = self._completion_engines.get(self._selected_connection_name)
+        if engine is not None:
+            engine.set_current_schema(database_name)
         # Open database window
         self._open_window("database_window")
+        
+    def _run_query(self, query: str, timeout: Optional[float] = None,
+                   max_execution_time: Optional[int] = None) -> None:
+        """
+        Run a query on the selected connection in the background, and open
+        a result window for it (which allows cancelling it).
+        
+        Args:
+            query (str): The query to run
+            timeout (Optional [float]): Client-side deadline in seconds
+            max_execution_time (Optional [int]): Server-side limit in 
+                milliseconds (SELECT only)
+        """
+        if self._selected_connection is None:
+            print("No connection selected. Cannot run query.")
+            return
+        if not self._release_connection():
+            return
+        connection_name = self._selected_connection_name
+        handle = QueryHandle(
+            connection = self._selected_connection,
+            query = query,
+            side_connection_factory = \
+                lambda: self.open_side_connection(connection_name),
+            timeout = timeout,
+            max_execution_time = max_execution_time
+        ).start()
+        self._windows["result_window"] = \
+            ResultWindow(self._ui_components, handle)
+    
+    def _profile_query(self, query: str, analyze: bool = False,
+                       timeout: Optional[float] = None) -> None:
+        """
+        Explain a query on the selected connection in the background, and
+        open a profiler window showing its plan.
+        
+        Args:
+            query (str): The query to profile
+            analyze (bool): Use EXPLAIN ANALYZE, which runs the query to 
+                measure actual rows and time per plan node
+            timeout (Optional [float]): Client-side deadline in seconds
+        """
+        if self._selected_connection is None:
+            print("No connection selected. Cannot profile query.")
+            return
+        if not self._release_connection():
+            return
+        connection_name = self._selected_connection_name
+        handle = QueryHandle(
+            connection = self._selected_connection,
+            query = profiler.explain_statement(query, analyze),
+            side_connection_factory = \
+                lambda: self.open_side_connection(connection_name),
+            timeout = timeout,
+            # Read right after the EXPLAIN, on the same connection
+            follow_up = profiler.stage_timings if analyze else None
+        ).start()
+        self._windows["profiler_window"] = ProfilerWindow(
+            self._ui_components, handle, analyze)
+    
+    def _run_script(self, path: str, stop_on_error: bool = True) -> None:
+        """
+        Run a SQL script file on the selected connection in the background,
+        and open a script window listing its results.
+        
+        Args:
+            path (str): The path of the script file
+            stop_on_error (bool): Stop at the first failing statement
+        """
+        if self._selected_connection is None:
+            print("No connection selected. Cannot run script.")
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                script = file.read()
+        except OSError as err:
+            print(f"Could not read script {path}: {err}")
+            return
+        if not self._release_connection():
+            return
+        runner = ScriptRunner(
+            connection = self._selected_connection,
+            script = script,
+            stop_on_error = stop_on_error
+        )
+        self._windows["script_window"] = \
+            ScriptWindow(self._ui_components, runner)
+    
+    def _release_connection(self) -> bool:
+        """
+        Close any window running work on the selected connection, waiting
+        for the work to be cancelled, as a connection runs one statement 
+        at a time.
+        
+        Returns:
+            bool: True if the connection is free to use
+        """
+        for window_name in self.CONNECTION_WINDOWS:
+            if window_name not in self._windows:
+                continue
+            window = self._windows[window_name]
+            self._close_window(window_name)
+            if not window.wait(self.CANCEL_WAIT_SECONDS):
+                print(f"Work in {window_name} is still being cancelled.")
+                return False
+        return True
     # -------------------------^ Event Callbacks ^------------------------- #
     
     # ----------------------- Connection Management ----------------------- #
@@ -169,15 +382,40 @@ class AppState():
         """
         return self._connections.get(connection_name)
     
-    def add_connection(self, connection_name: str, connection) -> None:
+    def add_connection(self, connection_name: str, connection,
+                       details: Optional[Dict[str, str]] = None) -> None:
         """
         Add a named connection.
         
         Args:
             connection_name (str): The name of the connection to set
             connection (MySQLConnection): The connection object
+            details (Optional Dict[str, str]): The host, user and password
+                used to connect, needed to open side connections
         """
         self._connections[connection_name] = connection
+        if details is not None:
+            self._connection_details[connection_name] = details
+    
+    def open_side_connection(self, connection_name: str) \
+        -> mysql.connector.MySQLConnection:
+        """
+        Open a new connection to the same server, as the same user, as a 
+        named connection. Used for work that cannot share the connection,
+        e.g. cancelling a query running on it. The caller must close it.
+        
+        Args:
+            connection_name (str): The name of the connection to copy
+            
+        Returns:
+            MySQLConnection: The new connection object
+        """
+        details = self._connection_details[connection_name]
+        return mysql.connector.connect(
+            host=details["host"],
+            user=details["user"],
+            password=details["password"]
+        )
         
     def close_connection(self, connection_name: str) -> None:
         """
@@ -188,9 +426,99 @@ class AppState():
         """
         self._connections[connection_name].close()
         del self._connections[connection_name]
+        engine = self._completion_engines.pop(connection_name, None)
+        if engine is not None:
+            database.remove_query_listener(engine.on_query)
+        self._connection_details.pop(connection_name, None)
+    
+    def _start_completion_engine(self, connection_name: str) -> None:
+        """
+        Create the schema completion engine of a connection, kept up to 
+        date from the DDL run through database.py. The schema metadata is 
+        loaded, and tables made stale by DDL are refreshed, in the 
+        background on side connections.
+        
+        Args:
+            connection_name (str): The name of the connection
+        """
+        engine = CompletionEngine(
+            connection_name, 
+            lambda: self.open_side_connection(connection_name))
+        self._completion_engines[connection_name] = engine
+        database.add_query_listener(engine.on_query)
+        
+        def load():
+            try:
+                side_connection = self.open_side_connection(connection_name)
+            except (mysql.connector.Error, KeyError) as err:
+                print(f"Could not load completions: {err}")
+                return
+            try:
+                engine.load(side_connection)
+            except mysql.connector.Error as err:
+                print(f"Could not load completions: {err}")
+            finally:
+                side_connection.close()
+        threading.Thread(target=load, daemon=True).start()
+    
+    def _start_prefetcher(self, connection_name: str) -> None:
+        """
+        Start prefetching for the server window, on a side connection of
+        the connection it shows.
+        
+        Args:
+            connection_name (str): The name of the connection
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+        self._prefetcher = Prefetcher(
+            lambda: self.open_side_connection(connection_name)).start()
+    
+    def _start_status_monitor(self, connection_name: str) -> None:
+        """
+        Show live server status in the server window, polled on an asyncio
+        connection on the async backend, so it never blocks the UI or 
+        the connection used for queries.
+        
+        Args:
+            connection_name (str): The name of the connection to monitor
+        """
+        if self._status_monitor is not None:
+            self._status_monitor.cancel()
+        details = self._connection_details.get(connection_name)
+        if details is None:
+            return
+        
+        def show(status: str) -> None:
+            if "server_window" in self._windows:
+                self._windows["server_window"].set_status(status)
+                
+        async def monitor() -> None:
+            connection = await database_aio.create_connection(**details)
+            if connection is None:
+                self._async_backend.call_soon(show, "Status: Unavailable")
+                return
+            try:
+                while True:
+                    rows = await database_aio.read_query(
+                        connection, "SHOW GLOBAL STATUS WHERE Variable_name"
+                        " IN ('Uptime', 'Threads_connected', "
+                        "'Threads_running', 'Questions')", notify=False)
+                    values = dict(rows or [])
+                    self._async_backend.call_soon(show, 
+                        f"Status: Connected | Uptime "
+                        f"{values.get('Uptime', '?')}s | Threads "
+                        f"{values.get('Threads_running', '?')}/"
+                        f"{values.get('Threads_connected', '?')} | "
+                        f"Questions {values.get('Questions', '?')}")
+                    await asyncio.sleep(self.STATUS_INTERVAL_SECONDS)
+            finally:
+                await connection.close()
+        self._status_monitor = self._async_backend.submit(monitor())
     
     def select_connection(self, connection_name: str) -> None:
         self._selected_connection = self.get_connection(connection_name)
+        self._selected_connection_name = connection_name
         
     def get_selected_connection(self) -> mysql.connector.MySQLConnection:
         return self._selected_connection        
@@ -0,0 +1,191 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+class AsyncBackend:
+    """
+    Runs an asyncio event loop in a dedicated thread, so that many 
+    concurrent queries and connections (database_aio) share one thread
+    instead of needing a thread each.
+    
+    Coroutines are submitted from any thread. Their results can be handed
+    back to the Tk thread: callbacks are queued and run by a poller on a
+    Tk widget's after() loop, as Tk may only be used from its own thread.
+    Nothing here imports tkinter, so the backend also runs headless.
+    
+    Args:
+        max_concurrency (int): Maximum coroutines run at once by gather()
+    """
+    __slots__ = ["_loop", "_thread", "_callbacks", "_widget", "_poll_ms",
+                 "_poll_id", "_max_concurrency"]
+    
+    def __init__(self, max_concurrency: int = 100) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+        # (callback, args) to run on the Tk thread
+        self._callbacks: queue.Queue = queue.Queue()
+        self._widget = None
+        self._poll_ms = 20
+        self._poll_id = None
+        self._max_concurrency = max_concurrency
+    
+    # ------------------------------ Running ------------------------------ #
+    def start(self) -> None:
+        """
+        Start the event loop thread.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="AsyncBackend")
+        self._thread.start()
+        
+    def _run(self) -> None:
+        """
+        Run the event loop until stopped (loop thread).
+        """
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+        # Cancel whatever is still pending, then close the loop
+        pending = asyncio.all_tasks(self._loop)
+        for task in pending:
+            task.cancel()
+        self._loop.run_until_complete(
+            asyncio.gather(*pending, return_exceptions=True))
+        self._loop.close()
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the event loop, cancelling pending coroutines, and stop 
+        polling for Tk callbacks.
+        
+        Args:
+            timeout (float): Seconds to wait for the loop thread to end
+        """
+        self.detach()
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def submit(self, coroutine: Awaitable) -> Future:
+        """
+        Run a coroutine on the event loop. Safe to call from any thread.
+        
+        Args:
+            coroutine (Awaitable): The coroutine to run
+            
+        Returns:
+            Future: A concurrent.futures.Future of its result, which can be
+                cancelled to cancel the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+    
+    async def gather(self, coroutines: Iterable[Awaitable]) -> List[Any]:
+        """
+        Run coroutines concurrently, at most max_concurrency at a time 
+        (e.g. a query fanned out over many connections). Must be awaited 
+        on the backend's loop.
+        
+        Args:
+            coroutines (Iterable[Awaitable]): The coroutines to run
+            
+        Returns:
+            List[Any]: Their results (or exceptions), in order
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        
+        async def limited(coroutine):
+            async with semaphore:
+                return await coroutine
+        return await asyncio.gather(
+            *(limited(coroutine) for coroutine in coroutines),
+            return_exceptions=True)
+    # -----------------------------^ Running ^----------------------------- #
+    
+    # ---------------------------- Tk Bridge ---------------------------- #
+    def attach(self, widget, poll_ms: int = 20) -> None:
+        """
+        Run queued callbacks on a Tk widget's thread, polling every poll_ms.
+        
+        Args:
+            widget (tk.Misc): Any widget of the Tk application (usually the
+                main window)
+            poll_ms (int): Polling interval in milliseconds
+        """
+        self._widget = widget
+        self._poll_ms = poll_ms
+        self._poll()
+        
+    def detach(self) -> None:
+        """
+        Stop polling for callbacks.
+        """
+        if self._widget is not None and self._poll_id is not None:
+            self._widget.after_cancel(self._poll_id)
+        self._widget = None
+        self._poll_id = None
+    
+    def _poll(self) -> None:
+        """
+        Run the queued callbacks (Tk thread).
+        """
+        while True:
+            try:
+                callback, args = self._callbacks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as err:
+                print(f"Async callback error: '{err}'")
+        if self._widget is not None:
+            self._poll_id = self._widget.after(self._poll_ms, self._poll)
+    
+    def call_soon(self, callback: Callable, *args) -> None:
+        """
+        Queue a callback to run on the Tk thread. Safe to call from any 
+        thread, including coroutines on the loop.
+        
+        Args:
+            callback (Callable): The function to call
+            args: Arguments to call it with
+        """
+        self._callbacks.put((callback, args))
+    
+    def run(self, coroutine: Awaitable,
+            on_result: Optional[Callable[[Any], None]] = None,
+            on_error: Optional[Callable[[BaseException], None]] = None) \
+        -> Future:
+        """
+        Run a coroutine on the loop, and hand its result (or error) to a 
+        callback on the Tk thread.
+        
+        Args:
+            coroutine (Awaitable): The coroutine to run
+            on_result (Optional [Callable]): Called with the result
+            on_error (Optional [Callable]): Called with the exception (it
+                is printed if not given)
+            
+        Returns:
+            Future: The future of the coroutine's result
+        """
+        future = self.submit(coroutine)
+        
+        def done(future: Future) -> None:
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                if on_error is not None:
+                    self.call_soon(on_error, error)
+                else:
+                    print(f"Async error: '{error}'")
+            elif on_result is not None:
+                self.call_soon(on_result, future.result())
+        future.add_done_callback(done)
+        return future
+    # ---------------------------^ Tk Bridge ^--------------------------- #
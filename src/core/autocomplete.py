@@ -0,0 +1,604 @@
+import bisect
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import mysql.connector
+
+import database
+
+class SortedNames:
+    """
+    A compact prefix index: names kept in a sorted array, with a parallel
+    array of lowercase keys. A prefix lookup is a binary search followed
+    by a scan of the matches, so it is O(log n + matches).
+    
+    Args:
+        names (Iterable[str]): The initial names (duplicates are dropped)
+    """
+    __slots__ = ["_keys", "_names"]
+    
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        # Sorted once when built in bulk, kept sorted by add()
+        unique = {name.lower(): name for name in names}
+        self._keys: List[str] = sorted(unique)
+        self._names: List[str] = [unique[key] for key in self._keys]
+        
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def __contains__(self, name: str) -> bool:
+        key = name.lower()
+        idx = bisect.bisect_left(self._keys, key)
+        return idx < len(self._keys) and self._keys[idx] == key
+        
+    def add(self, name: str) -> None:
+        """
+        Add a name, if not already present.
+        
+        Args:
+            name (str): The name to add
+        """
+        key = name.lower()
+        idx = bisect.bisect_left(self._keys, key)
+        if idx < len(self._keys) and self._keys[idx] == key:
+            return
+        self._keys.insert(idx, key)
+        self._names.insert(idx, name)
+    
+    def remove(self, name: str) -> None:
+        """
+        Remove a name, if present.
+        
+        Args:
+            name (str): The name to remove
+        """
+        key = name.lower()
+        idx = bisect.bisect_left(self._keys, key)
+        if idx < len(self._keys) and self._keys[idx] == key:
+            del self._keys[idx]
+            del self._names[idx]
+    
+    def names(self) -> List[str]:
+        """Returns all names, sorted case-insensitively."""
+        return list(self._names)
+        
+    def prefix(self, prefix: str, limit: int) -> List[str]:
+        """
+        Find the names starting with a prefix (case-insensitive).
+        
+        Args:
+            prefix (str): The prefix to look up
+            limit (int): Maximum number of names to return
+            
+        Returns:
+            List[str]: The matching names, sorted
+        """
+        key = prefix.lower()
+        idx = bisect.bisect_left(self._keys, key)
+        matches = []
+        while idx < len(self._keys) and len(matches) < limit \
+                and self._keys[idx].startswith(key):
+            matches.append(self._names[idx])
+            idx += 1
+        return matches
+
+# --------------------------- Statement Parsing --------------------------- #
+_IDENT = r"`[^`]+`|[\w$]+"
+_NAME = rf"((?:{_IDENT})(?:\s*\.\s*(?:{_IDENT}))?)"
+_KEYWORDS = ("where", "on", "using", "join", "inner", "left", "right", 
+             "cross", "straight_join", "natural", "group", "order", "limit",
+             "having", "set", "for", "union", "window", "force", "use", 
+             "ignore", "lock", "values", "select", "partition")
+_TABLE_REF = re.compile(
+    rf"\b(?:from|join|update|into|table)\s+{_NAME}"
+    rf"(?:\s+(?:as\s+)?(?!(?:{'|'.join(_KEYWORDS)})\b)({_IDENT}))?",
+    re.IGNORECASE)
+_COMMA_REF = re.compile(
+    rf",\s*{_NAME}(?:\s+(?:as\s+)?(?!(?:{'|'.join(_KEYWORDS)})\b)"
+    rf"({_IDENT}))?", re.IGNORECASE)
+_FROM_LIST = re.compile(
+    r"\bfrom\b(.*?)(?=\b(?:where|join|inner|left|right|cross|group|order|"
+    r"limit|having|union|straight_join|natural)\b|$)", 
+    re.IGNORECASE | re.DOTALL)
+# Identifier (possibly qualified) being typed at the end of the text
+_TRAILING = re.compile(rf"(?:(?:{_IDENT})\s*\.\s*){{0,2}}`?[\w$]*$")
+_LAST_KEYWORD = re.compile(
+    r"\b(select|from|join|update|into|table|use|where|on|and|or|by|set|"
+    r"having|describe|desc|drop|truncate|alter|database|schema|values|"
+    r"straight_join)\b", re.IGNORECASE)
+_TABLE_CONTEXT = ("from", "join", "update", "into", "table", "describe",
+                  "desc", "drop", "truncate", "alter", "straight_join")
+_SCHEMA_CONTEXT = ("use", "database", "schema")
+
+def _unquote(identifier: str) -> str:
+    """Remove backquotes and surrounding space from an identifier."""
+    return identifier.strip().strip("`")
+
+def _split_name(name: str) -> Tuple[Optional[str], str]:
+    """
+    Split a possibly qualified name into (qualifier, name).
+    
+    Args:
+        name (str): e.g. 'db.table', '`db`.`table`' or 'table'
+    """
+    parts = [_unquote(part) for part in re.split(r"\s*\.\s*", name)]
+    if len(parts) >= 2:
+        return parts[-2], parts[-1]
+    return None, parts[0]
+# --------------------------^ Statement Parsing ^-------------------------- #
+
+class CompletionEngine:
+    """
+    Schema-aware completion for SQL text: database, table and column 
+    names of one server, held in SortedNames prefix indexes. Built in bulk
+    from information_schema, then kept up to date incrementally from the 
+    DDL run through database.py (register on_query as a query listener).
+    
+    Completion is context-aware: after FROM/JOIN/UPDATE... tables are 
+    offered, after USE databases, after 'alias.' the columns of that 
+    table, and elsewhere the columns of the tables in the FROM clause.
+    
+    Args:
+        connection_name (str): The name (user@host) of the connection the 
+            engine describes; queries on other connections are ignored
+        side_connection_factory (Optional [Callable]): Returns a new 
+            connection to the server, used to refresh stale tables in the
+            background after DDL; stale tables are kept otherwise
+    """
+    __slots__ = ["_connection_name", "_side_connection_factory", "_lock",
+                 "_databases", "_tables", "_columns", "_all_columns", 
+                 "_column_counts", "_current_schema", "stale"]
+    
+    def __init__(self, connection_name: str,
+                 side_connection_factory: Optional[Callable[
+                     [], mysql.connector.MySQLConnection]] = None) -> None:
+        self._connection_name = connection_name
+        self._side_connection_factory = side_connection_factory
+        self._lock = threading.Lock()
+        self._databases = SortedNames()
+        # Key: lowercase database, Value: its tables
+        self._tables: Dict[str, SortedNames] = {}
+        # Key: (lowercase database, lowercase table), Value: its columns
+        self._columns: Dict[Tuple[str, str], SortedNames] = {}
+        # Every column name of every table, with how many tables have it
+        self._all_columns = SortedNames()
+        self._column_counts: Dict[str, int] = {}
+        # Default schema of the connection, followed from USE statements
+        self._current_schema: Optional[str] = None
+        # (database, table) whose DDL could not be applied incrementally,
+        # see refresh()
+        self.stale: Set[Tuple[str, str]] = set()
+    
+    # ------------------------------ Loading ------------------------------ #
+    def load(self, connection: mysql.connector.MySQLConnection) -> None:
+        """
+        Build the indexes from the server's schema metadata.
+        
+        Args:
+            connection (MySQLConnection): A connection to the server
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT SCHEMA_NAME FROM "
+                           "information_schema.SCHEMATA")
+            schemas = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT TABLE_SCHEMA, TABLE_NAME FROM "
+                           "information_schema.TABLES")
+            tables = cursor.fetchall()
+            cursor.execute("SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME "
+                           "FROM information_schema.COLUMNS")
+            columns = cursor.fetchall()
+        finally:
+            cursor.close()
+        table_names: Dict[str, List[str]] = {}
+        for schema, table in tables:
+            table_names.setdefault(schema.lower(), []).append(table)
+        column_names: Dict[Tuple[str, str], List[str]] = {}
+        counts: Dict[str, int] = {}
+        for schema, table, column in columns:
+            column_names.setdefault(
+                (schema.lower(), table.lower()), []).append(column)
+            counts[column.lower()] = counts.get(column.lower(), 0) + 1
+        with self._lock:
+            self._databases = SortedNames(schemas)
+            self._tables = {schema: SortedNames(names)
+                            for schema, names in table_names.items()}
+            self._columns = {key: SortedNames(names)
+                             for key, names in column_names.items()}
+            self._all_columns = SortedNames(
+                column for _, _, column in columns)
+            self._column_counts = counts
+            self.stale.clear()
+    
+    def refresh(self, connection: mysql.connector.MySQLConnection) -> None:
+        """
+        Reload the columns of the stale tables (DDL that could not be 
+        applied incrementally, e.g. CREATE TABLE ... SELECT).
+        
+        Args:
+            connection (MySQLConnection): A connection to the server
+        """
+        with self._lock:
+            stale = list(self.stale)
+            self.stale.clear()
+        cursor = connection.cursor()
+        try:
+            for schema, table in stale:
+                cursor.execute(
+                    "SELECT COLUMN_NAME FROM information_schema.COLUMNS"
+                    " WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s"
+                    " ORDER BY ORDINAL_POSITION", (schema, table))
+                columns = [row[0] for row in cursor.fetchall()]
+                with self._lock:
+                    self._drop_table(schema, table)
+                    if columns:
+                        self._add_table(schema, table, columns)
+        finally:
+            cursor.close()
+    
+    def _refresh_stale(self) -> None:
+        """
+        Refresh the stale tables on a new side connection (worker thread).
+        """
+        try:
+            connection = self._side_connection_factory()
+        except mysql.connector.Error as err:
+            print(f"Could not refresh completions: {err}")
+            return
+        try:
+            self.refresh(connection)
+        except mysql.connector.Error as err:
+            print(f"Could not refresh completions: {err}")
+        finally:
+            connection.close()
+    # -----------------------------^ Loading ^----------------------------- #
+    
+    # --------------------------- Index Updates --------------------------- #
+    def _add_table(self, schema: str, table: str, 
+                   columns: List[str]) -> None:
+        """
+        Add a table and its columns (lock held).
+        """
+        self._databases.add(schema)
+        self._tables.setdefault(schema.lower(), SortedNames()).add(table)
+        names = self._columns.setdefault((schema.lower(), table.lower()),
+                                         SortedNames())
+        for column in columns:
+            if column not in names:
+                names.add(column)
+                self._count_column(column, 1)
+    
+    def _drop_table(self, schema: str, table: str) -> None:
+        """
+        Remove a table and its columns (lock held).
+        """
+        if schema.lower() in self._tables:
+            self._tables[schema.lower()].remove(table)
+        names = self._columns.pop((schema.lower(), table.lower()), None)
+        for column in names.names() if names else []:
+            self._count_column(column, -1)
+    
+    def _count_column(self, column: str, change: int) -> None:
+        """
+        Track how many tables have a column name, adding it to or removing 
+        it from the all-columns index as needed (lock held).
+        """
+        count = self._column_counts.get(column.lower(), 0) + change
+        if count > 0:
+            self._column_counts[column.lower()] = count
+            self._all_columns.add(column)
+        else:
+            self._column_counts.pop(column.lower(), None)
+            self._all_columns.remove(column)
+    
+    def on_query(self, connection, query: str, duration: float, rows: int,
+                 error: Optional[Exception] = None) -> None:
+        """
+        Query listener (see database.add_query_listener), applies the DDL
+        run on the engine's connection to the indexes.
+        
+        Args:
+            connection (MySQLConnection): The connection the query ran on
+            query (str): The query text
+            duration (float): The time taken, in seconds
+            rows (int): Rows returned or affected
+            error (Optional [Exception]): The error, if the query failed
+        """
+        if error is not None:
+            return
+        words = query.split(None, 1)
+        if not words or words[0].upper() not in ("USE", "CREATE", "DROP",
+                                                 "ALTER", "RENAME"):
+            return
+        if database.connection_name(connection) != self._connection_name:
+            return
+        self.apply_ddl(query)
+        if self.stale and self._side_connection_factory is not None:
+            threading.Thread(target=self._refresh_stale, daemon=True).start()
+    
+    def apply_ddl(self, query: str) -> None:
+        """
+        Apply a DDL statement (or USE) to the indexes. Statements that 
+        cannot be applied incrementally mark their table stale instead.
+        
+        Args:
+            query (str): The DDL statement
+        """
+        with self._lock:
+            self._apply_ddl(query)
+    
+    def _apply_ddl(self, query: str) -> None:
+        """
+        Apply a DDL statement to the indexes (lock held).
+        """
+        text = " ".join(query.strip().rstrip(";").split())
+        match = re.match(rf"use\s+({_IDENT})$", text, re.IGNORECASE)
+        if match:
+            self._current_schema = _unquote(match.group(1))
+            return
+        match = re.match(rf"create\s+(?:database|schema)\s+"
+                         rf"(?:if\s+not\s+exists\s+)?({_IDENT})", 
+                         text, re.IGNORECASE)
+        if match:
+            self._databases.add(_unquote(match.group(1)))
+            return
+        match = re.match(rf"drop\s+(?:database|schema)\s+"
+                         rf"(?:if\s+exists\s+)?({_IDENT})", 
+                         text, re.IGNORECASE)
+        if match:
+            schema = _unquote(match.group(1))
+            self._databases.remove(schema)
+            for table in self._tables.get(schema.lower(), 
+                                          SortedNames()).names():
+                self._drop_table(schema, table)
+            self._tables.pop(schema.lower(), None)
+            return
+        match = re.match(r"drop\s+(?:temporary\s+)?tables?\s+"
+                         r"(?:if\s+exists\s+)?(.*?)(?:\s+restrict|"
+                         r"\s+cascade)?$", text, re.IGNORECASE)
+        if match:
+            for name in match.group(1).split(","):
+                schema, table = self._qualify(name)
+                if schema:
+                    self._drop_table(schema, table)
+            return
+        match = re.match(r"rename\s+tables?\s+(.*)$", text, re.IGNORECASE)
+        if match:
+            for pair in match.group(1).split(","):
+                names = re.split(r"\s+to\s+", pair, flags=re.IGNORECASE)
+                if len(names) == 2:
+                    self._rename_table(names[0], names[1])
+            return
+        match = re.match(rf"create\s+(?:temporary\s+)?table\s+"
+                         rf"(?:if\s+not\s+exists\s+)?{_NAME}\s*(.*)$",
+                         text, re.IGNORECASE)
+        if match:
+            schema, table = self._qualify(match.group(1))
+            if not schema:
+                return
+            columns = self._column_definitions(match.group(2))
+            if columns is None:
+                # CREATE TABLE ... LIKE / ... AS SELECT: ask the server
+                self._add_table(schema, table, [])
+                self.stale.add((schema, table))
+            else:
+                self._add_table(schema, table, columns)
+            return
+        match = re.match(rf"alter\s+table\s+{_NAME}\s+(.*)$", text, 
+                         re.IGNORECASE)
+        if match:
+            self._alter_table(match.group(1), match.group(2))
+            
+    def _qualify(self, name: str) -> Tuple[Optional[str], str]:
+        """
+        Split a table name, using the current schema if it is unqualified.
+        
+        Returns:
+            Tuple[Optional[str], str]: (schema, table), schema is None if
+                unknown
+        """
+        schema, table = _split_name(name)
+        return schema or self._current_schema, table
+    
+    def _rename_table(self, old_name: str, new_name: str) -> None:
+        """
+        Move a table's columns to a new name (lock held).
+        """
+        old_schema, old_table = self._qualify(old_name)
+        new_schema, new_table = self._qualify(new_name)
+        if not old_schema or not new_schema:
+            return
+        names = self._columns.get((old_schema.lower(), old_table.lower()))
+        columns = names.names() if names else []
+        self._drop_table(old_schema, old_table)
+        self._add_table(new_schema, new_table, columns)
+        if names is None:
+            self.stale.add((new_schema, new_table))
+    
+    def _column_definitions(self, body: str) -> Optional[List[str]]:
+        """
+        Get the column names from the body of a CREATE TABLE statement.
+        
+        Args:
+            body (str): The text after the table name
+            
+        Returns:
+            Optional [List[str]]: The column names, None if the body has 
+                no column definitions
+        """
+        if not body.startswith("("):
+            return None
+        # Split the top level of the parenthesised definitions on commas
+        items, depth, current = [], 0, ""
+        for char in body[1:]:
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                if depth == 0:
+                    break
+                depth -= 1
+            if char == "," and depth == 0:
+                items.append(current)
+                current = ""
+            else:
+                current += char
+        items.append(current)
+        columns = []
+        for item in items:
+            words = item.split()
+            if not words or words[0].lower() in (
+                    "primary", "key", "index", "unique", "constraint",
+                    "foreign", "check", "fulltext", "spatial"):
+                continue
+            columns.append(_unquote(words[0]))
+        return columns
+    
+    def _alter_table(self, name: str, actions: str) -> None:
+        """
+        Apply the column changes of an ALTER TABLE (lock held).
+        
+        Args:
+            name (str): The table name
+            actions (str): The text after the table name
+        """
+        schema, table = self._qualify(name)
+        if not schema:
+            return
+        key = (schema.lower(), table.lower())
+        match = re.match(rf"rename\s+(?:to\s+|as\s+)?{_NAME}$", actions,
+                         re.IGNORECASE)
+        if match:
+            self._rename_table(name, match.group(1))
+            return
+        names = self._columns.setdefault(key, SortedNames())
+        for action in re.split(r",(?![^()]*\))", actions):
+            words = action.split()
+            verb = [word.lower() for word in words[:3]]
+            if not verb:
+                continue
+            if verb[0] == "add" and len(words) > 1 and verb[1] not in (
+                    "primary", "key", "index", "unique", "constraint",
+                    "foreign", "check", "fulltext", "spatial", "partition"):
+                column = words[2] if verb[1] == "column" else words[1]
+                if column.startswith("("):
+                    # ADD (col1 ..., col2 ...)
+                    self.stale.add((schema, table))
+                elif _unquote(column) not in names:
+                    names.add(_unquote(column))
+                    self._count_column(_unquote(column), 1)
+            elif verb[0] == "drop" and len(words) > 1 and verb[1] not in (
+                    "primary", "key", "index", "foreign", "check", 
+                    "constraint", "partition"):
+                column = _unquote(words[2] if verb[1] == "column" 
+                                  else words[1])
+                if column in names:
+                    names.remove(column)
+                    self._count_column(column, -1)
+            elif verb[0] in ("change", "rename") and len(words) > 2:
+                offset = 2 if verb[1] == "column" else 1
+                if verb[0] == "rename" and verb[1] != "column":
+                    continue    # RENAME INDEX / KEY
+                old = _unquote(words[offset])
+                new_idx = offset + (2 if verb[0] == "rename" else 1)
+                if new_idx < len(words) and old in names:
+                    names.remove(old)
+                    self._count_column(old, -1)
+                    names.add(_unquote(words[new_idx]))
+                    self._count_column(_unquote(words[new_idx]), 1)
+    # --------------------------^ Index Updates ^-------------------------- #
+    
+    # ----------------------------- Completion ---------------------------- #
+    def set_current_schema(self, schema: Optional[str]) -> None:
+        """
+        Set the default schema used for unqualified table names.
+        
+        Args:
+            schema (Optional [str]): The schema, None if none is selected
+        """
+        with self._lock:
+            self._current_schema = schema
+    
+    def _table_refs(self, statement: str) -> Dict[str, Tuple[str, str]]:
+        """
+        Find the tables referenced by a statement, with their aliases.
+        
+        Args:
+            statement (str): The statement being edited
+            
+        Returns:
+            Dict[str, Tuple[str, str]]: Key: lowercase alias (or table 
+                name), Value: (schema, table)
+        """
+        refs = {}
+        matches = _TABLE_REF.findall(statement)
+        for from_list in _FROM_LIST.findall(statement):
+            matches += _COMMA_REF.findall(from_list)
+        for name, alias in matches:
+            schema, table = self._qualify(name)
+            if not schema:
+                continue
+            refs[table.lower()] = (schema, table)
+            if alias:
+                refs[_unquote(alias).lower()] = (schema, table)
+        return refs
+    
+    def complete(self, before_cursor: str, after_cursor: str = "",
+                 limit: int = 50) -> Tuple[str, List[str]]:
+        """
+        Complete the identifier being typed at the cursor.
+        
+        Args:
+            before_cursor (str): The statement text before the cursor
+            after_cursor (str): The statement text after the cursor, used 
+                to find the tables of the FROM clause
+            limit (int): Maximum number of completions
+            
+        Returns:
+            Tuple[str, List[str]]: The prefix being completed, and the 
+                completions (names replacing the prefix)
+        """
+        token = _TRAILING.search(before_cursor).group(0)
+        qualifier, prefix = None, _unquote(token)
+        if "." in token:
+            qualifier, prefix = _split_name(token)
+        preceding = before_cursor[:len(before_cursor) - len(token)]
+        keywords = _LAST_KEYWORD.findall(preceding)
+        context = keywords[-1].lower() if keywords else ""
+        with self._lock:
+            if context in _SCHEMA_CONTEXT:
+                return prefix, self._databases.prefix(prefix, limit)
+            if context in _TABLE_CONTEXT and preceding.rstrip()[-1:] \
+                    not in ("=", "("):
+                if qualifier:
+                    tables = self._tables.get(qualifier.lower())
+                    return prefix, tables.prefix(prefix, limit) \
+                        if tables else []
+                tables = self._tables.get((self._current_schema or 
+                                           "").lower())
+                matches = tables.prefix(prefix, limit) if tables else []
+                return prefix, matches + self._databases.prefix(
+                    prefix, limit - len(matches))
+            refs = self._table_refs(before_cursor + after_cursor)
+            if qualifier:
+                # alias.column, or schema.table.column
+                schema_table = refs.get(qualifier.lower())
+                if schema_table is None:
+                    schema_table = self._qualify(qualifier)
+                names = self._columns.get(
+                    ((schema_table[0] or "").lower(), 
+                     schema_table[1].lower()))
+                if names is None and qualifier.lower() in self._tables:
+                    # schema.table
+                    return prefix, self._tables[qualifier.lower()].prefix(
+                        prefix, limit)
+                return prefix, names.prefix(prefix, limit) if names else []
+            if refs:
+                matches: List[str] = []
+                for schema, table in set(refs.values()):
+                    names = self._columns.get((schema.lower(), 
+                                               table.lower()))
+                    if names is not None:
+                        matches += names.prefix(prefix, limit)
+                return prefix, sorted(set(matches), key=str.lower)[:limit]
+            return prefix, self._all_columns.prefix(prefix, limit)
+    # ----------------------------^ Completion ^---------------------------- #
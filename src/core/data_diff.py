@@ -0,0 +1,390 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Tuple
+import mysql.connector
+
+Key = Tuple
+
+def row_checksum(columns: List[str], large_columns: Collection[str] = (),
+                 prefix_length: int = 256) -> str:
+    """
+    Build the SQL expression of a row's checksum. NULL markers are 
+    included, as CONCAT_WS skips NULLs ('' and NULL would match).
+    Large columns contribute only a prefix and their length, so the 
+    concatenation stays small (CONCAT returns NULL beyond 
+    max_allowed_packet); changes past the prefix that keep the length
+    are then not detected.
+    
+    Args:
+        columns (List[str]): All columns of the table
+        large_columns (Collection[str]): Columns checksummed by prefix
+        prefix_length (int): Characters (or bytes) of their prefix
+        
+    Returns:
+        str: The CRC32 expression
+    """
+    quoted = ", ".join(
+        f"LEFT(`{column}`, {prefix_length}), LENGTH(`{column}`)"
+        if column in large_columns else f"`{column}`"
+        for column in columns)
+    nulls = ", ".join(f"ISNULL(`{column}`)" for column in columns)
+    return f"CRC32(CONCAT_WS('#', {quoted}, CONCAT({nulls})))"
+
+class RowDifference:
+    """
+    A row that differs between the source and target table.
+    
+    Args:
+        kind (str): 'missing' (only in source), 'extra' (only in target)
+            or 'changed' (in both, with different values)
+        key (Key): The row's primary key values
+    """
+    __slots__ = ["kind", "key"]
+    
+    def __init__(self, kind: str, key: Key) -> None:
+        self.kind = kind
+        self.key = key
+
+class TableDiff:
+    """
+    Compares a table on two servers without transferring its rows: the
+    table is split into primary key ranges, and a checksum of each range
+    is computed on both servers in parallel. Only ranges whose checksums
+    differ are split further, down to per-row checksums, so only the 
+    differing rows' keys come back over the network.
+    
+    Each connection is used by one thread at a time; side connections 
+    should be used, as comparing a large table takes a while.
+    
+    Args:
+        source (MySQLConnection): Connection to the reference server
+        target (MySQLConnection): Connection to the server to check
+        schema (str): The schema of the table (same on both servers)
+        table (str): The table to compare, it must have a primary key
+        chunk_size (int): Rows per top level range
+        leaf_size (int): Ranges with at most this many rows are compared
+            row by row
+    """
+    __slots__ = ["_source", "_target", "_schema", "_table", "_chunk_size",
+                 "_leaf_size", "_key_columns", "_columns", "_stop", 
+                 "chunks_compared", "rows_compared"]
+    
+    # Each differing range is split into this many sub ranges
+    SPLIT_FACTOR = 10
+    
+    def __init__(self,
+                 source: mysql.connector.MySQLConnection,
+                 target: mysql.connector.MySQLConnection,
+                 schema: str,
+                 table: str,
+                 chunk_size: int = 100000,
+                 leaf_size: int = 1000) -> None:
+        self._source = source
+        self._target = target
+        self._schema = schema
+        self._table = table
+        self._chunk_size = chunk_size
+        self._leaf_size = leaf_size
+        self._key_columns: List[str] = []
+        self._columns: List[str] = []
+        self._stop = threading.Event()
+        # Progress, readable while running
+        self.chunks_compared = 0
+        self.rows_compared = 0
+        
+    def stop(self) -> None:
+        """
+        Stop the comparison after the current range. Safe to call from any
+        thread.
+        """
+        self._stop.set()
+    
+    # ----------------------------- Comparing ----------------------------- #
+    def differences(self, progress: Optional[Callable[[str], None]] = None)\
+        -> Iterator[RowDifference]:
+        """
+        Compare the table, yielding each differing row as it is found.
+        
+        Args:
+            progress (Optional [Callable]): Called with a status message as
+                the comparison advances
+            
+        Yields:
+            RowDifference: Each row that differs
+        """
+        self._load_columns()
+        report = progress or (lambda message: None)
+        report("Finding chunk boundaries...")
+        chunks = self._boundaries(None, None, self._chunk_size)
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # Each server checksums all chunks on its own thread
+            source_sums = pool.submit(self._checksums, self._source, chunks)
+            target_sums = pool.submit(self._checksums, self._target, chunks)
+            differing = [(lower, upper, max(count, target_sum[0]))
+                         for (lower, upper, count), source_sum, target_sum
+                         in zip(chunks, source_sums.result(), 
+                                target_sums.result())
+                         if source_sum != target_sum]
+            self.chunks_compared += len(chunks)
+            report(f"{len(differing)} of {len(chunks)} chunks differ")
+            for lower, upper, count in differing:
+                if self._stop.is_set():
+                    return
+                yield from self._drill_down(pool, lower, upper, count, report)
+                
+    def _drill_down(self, pool: ThreadPoolExecutor, lower: Optional[Key], 
+                    upper: Optional[Key], count: int,
+                    report: Callable[[str], None]) -> Iterator[RowDifference]:
+        """
+        Find the differing rows of a range whose checksums differ.
+        
+        Args:
+            pool (ThreadPoolExecutor): Pool running one task per server
+            lower (Optional [Key]): Exclusive lower key (None: no bound)
+            upper (Optional [Key]): Inclusive upper key (None: no bound)
+            count (int): Rows of the range, on the larger side
+            report (Callable): Progress callback
+            
+        Yields:
+            RowDifference: Each row that differs in the range
+        """
+        chunks = []
+        if count > self._leaf_size:
+            size = max(self._leaf_size, count // self.SPLIT_FACTOR)
+            chunks = self._boundaries(lower, upper, size)
+        # Small ranges, and ranges the source cannot split (their extra
+        # rows are on the target), are compared row by row
+        if len(chunks) <= 1:
+            source_rows = pool.submit(self._row_sums, self._source, 
+                                      lower, upper)
+            target_rows = pool.submit(self._row_sums, self._target, 
+                                      lower, upper)
+            yield from self._compare_rows(source_rows.result(), 
+                                          target_rows.result())
+            return
+        source_sums = pool.submit(self._checksums, self._source, chunks)
+        target_sums = pool.submit(self._checksums, self._target, chunks)
+        self.chunks_compared += len(chunks)
+        for (sub_lower, sub_upper, sub_count), source_sum, target_sum in \
+                zip(chunks, source_sums.result(), target_sums.result()):
+            if self._stop.is_set():
+                return
+            if source_sum != target_sum:
+                report(f"Checking {sub_count} rows after {sub_lower}")
+                yield from self._drill_down(pool, sub_lower, sub_upper, 
+                                            # Target-only rows may be many
+                                            max(sub_count, target_sum[0]),
+                                            report)
+                
+    def _compare_rows(self, source_rows: Dict[Key, int], 
+                      target_rows: Dict[Key, int]) \
+        -> Iterator[RowDifference]:
+        """
+        Compare the per-row checksums of a range.
+        
+        Args:
+            source_rows (Dict[Key, int]): Source row checksums by key
+            target_rows (Dict[Key, int]): Target row checksums by key
+            
+        Yields:
+            RowDifference: Each row that differs
+        """
+        self.rows_compared += len(source_rows)
+        for key, checksum in source_rows.items():
+            if key not in target_rows:
+                yield RowDifference("missing", key)
+            elif target_rows[key] != checksum:
+                yield RowDifference("changed", key)
+        for key in target_rows.keys() - source_rows.keys():
+            yield RowDifference("extra", key)
+    # ----------------------------^ Comparing ^---------------------------- #
+    
+    # ------------------------------ Queries ------------------------------ #
+    def _load_columns(self) -> None:
+        """
+        Read the table's columns and primary key columns from the source.
+        """
+        cursor = self._source.cursor()
+        try:
+            cursor.execute(
+                "SELECT COLUMN_NAME, COLUMN_KEY = 'PRI'"
+                " FROM information_schema.COLUMNS"
+                " WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s"
+                " ORDER BY ORDINAL_POSITION", (self._schema, self._table))
+            rows = cursor.fetchall()
+            cursor.execute(
+                "SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE"
+                " WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s"
+                " AND CONSTRAINT_NAME = 'PRIMARY'"
+                " ORDER BY ORDINAL_POSITION", (self._schema, self._table))
+            self._key_columns = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        self._columns = [row[0] for row in rows]
+        if not self._columns:
+            raise ValueError(f"Table {self._schema}.{self._table} not found")
+        if not self._key_columns:
+            raise ValueError(
+                f"Table {self._schema}.{self._table} has no primary key")
+    
+    def _quoted(self, columns: List[str]) -> str:
+        """Returns the columns, quoted and comma separated."""
+        return ", ".join(f"`{column}`" for column in columns)
+    
+    def _range_condition(self, lower: Optional[Key], 
+                         upper: Optional[Key]) -> Tuple[str, list]:
+        """
+        Build the WHERE condition selecting a key range.
+        
+        Args:
+            lower (Optional [Key]): Exclusive lower key (None: no bound)
+            upper (Optional [Key]): Inclusive upper key (None: no bound)
+            
+        Returns:
+            Tuple[str, list]: The condition and its parameters
+        """
+        key = f"({self._quoted(self._key_columns)})"
+        placeholders = f"({', '.join(['%s'] * len(self._key_columns))})"
+        conditions = []
+        params: list = []
+        if lower is not None:
+            conditions.append(f"{key} > {placeholders}")
+            params += list(lower)
+        if upper is not None:
+            conditions.append(f"{key} <= {placeholders}")
+            params += list(upper)
+        return " AND ".join(conditions) or "TRUE", params
+    
+    def _row_checksum(self) -> str:
+        """Returns the SQL expression of a row's checksum."""
+        return row_checksum(self._columns)
+    
+    def _boundaries(self, lower: Optional[Key], upper: Optional[Key],
+                    size: int) -> List[Tuple[Optional[Key], Optional[Key], 
+                                             int]]:
+        """
+        Split a key range of the source into ranges of about size rows,
+        walking the primary key index.
+        
+        Args:
+            lower (Optional [Key]): Exclusive lower key (None: no bound)
+            upper (Optional [Key]): Inclusive upper key (None: no bound)
+            size (int): Rows per range
+            
+        Returns:
+            List[Tuple]: (lower, upper, source row count) of each range; 
+                the last range keeps the given upper bound
+        """
+        key = self._quoted(self._key_columns)
+        table = f"`{self._schema}`.`{self._table}`"
+        chunks = []
+        cursor = self._source.cursor()
+        try:
+            while not self._stop.is_set():
+                condition, params = self._range_condition(lower, upper)
+                cursor.execute(
+                    f"SELECT {key} FROM {table} WHERE {condition}"
+                    f" ORDER BY {key} LIMIT 1 OFFSET %s", 
+                    params + [size - 1])
+                row = cursor.fetchall()
+                if not row:
+                    break
+                chunks.append((lower, tuple(row[0]), size))
+                lower = tuple(row[0])
+            # Remaining (possibly empty) range up to the upper bound
+            condition, params = self._range_condition(lower, upper)
+            cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {condition}",
+                           params)
+            chunks.append((lower, upper, cursor.fetchall()[0][0]))
+        finally:
+            cursor.close()
+        return chunks
+    
+    def _checksums(self, connection: mysql.connector.MySQLConnection,
+                   chunks: List[Tuple[Optional[Key], Optional[Key], int]]) \
+        -> List[Tuple[int, int]]:
+        """
+        Compute the checksum of each range on one server.
+        
+        Args:
+            connection (MySQLConnection): The server to compute on
+            chunks (List[Tuple]): The (lower, upper, count) ranges
+            
+        Returns:
+            List[Tuple[int, int]]: (row count, checksum) of each range
+        """
+        table = f"`{self._schema}`.`{self._table}`"
+        checksum = f"COUNT(*), COALESCE(BIT_XOR({self._row_checksum()}), 0)"
+        sums = []
+        cursor = connection.cursor()
+        try:
+            for lower, upper, _count in chunks:
+                if self._stop.is_set():
+                    # Unchecked ranges compare as equal
+                    sums.append((0, 0))
+                    continue
+                condition, params = self._range_condition(lower, upper)
+                cursor.execute(
+                    f"SELECT {checksum} FROM {table} WHERE {condition}",
+                    params)
+                count, value = cursor.fetchall()[0]
+                sums.append((int(count), int(value)))
+        finally:
+            cursor.close()
+        return sums
+    
+    def _row_sums(self, connection: mysql.connector.MySQLConnection,
+                  lower: Optional[Key], upper: Optional[Key]) \
+        -> Dict[Key, int]:
+        """
+        Compute the checksum of each row of a range on one server.
+        
+        Args:
+            connection (MySQLConnection): The server to compute on
+            lower (Optional [Key]): Exclusive lower key (None: no bound)
+            upper (Optional [Key]): Inclusive upper key (None: no bound)
+            
+        Returns:
+            Dict[Key, int]: Row checksums by key
+        """
+        table = f"`{self._schema}`.`{self._table}`"
+        condition, params = self._range_condition(lower, upper)
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"SELECT {self._quoted(self._key_columns)}, "
+                f"{self._row_checksum()} FROM {table} WHERE {condition}",
+                params)
+            return {tuple(row[:-1]): row[-1] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+    
+    def fetch_rows(self, connection: mysql.connector.MySQLConnection,
+                   keys: List[Key]) -> Tuple[List[str], List[tuple]]:
+        """
+        Fetch full rows by primary key, e.g. to show differing rows.
+        
+        Args:
+            connection (MySQLConnection): The server to fetch from
+            keys (List[Key]): The keys of the rows
+            
+        Returns:
+            Tuple[List[str], List[tuple]]: The column names, and the rows
+        """
+        if not self._columns:
+            self._load_columns()
+        if not keys:
+            return self._columns, []
+        placeholders = f"({', '.join(['%s'] * len(self._key_columns))})"
+        cursor = connection.cursor()
+        try:
+            cursor.execute(
+                f"SELECT {self._quoted(self._columns)}"
+                f" FROM `{self._schema}`.`{self._table}`"
+                f" WHERE ({self._quoted(self._key_columns)}) IN "
+                f"({', '.join([placeholders] * len(keys))})",
+                [value for key in keys for value in key])
+            return self._columns, cursor.fetchall()
+        finally:
+            cursor.close()
+    # -----------------------------^ Queries ^----------------------------- #
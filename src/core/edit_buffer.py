@@ -0,0 +1,285 @@
+from typing import Any, Dict, List, Tuple
+import mysql.connector
+
+from core.table_browser import TableBrowser
+
+Key = Tuple
+
+class EditBuffer:
+    """
+    Collects edits of a browsed table on the client (cell updates, new 
+    rows and deleted rows) and writes them back in one transaction, in a
+    handful of round trips: edits are merged into multi-row statements, 
+    at most batch_size rows each.
+    
+    Conflicts are detected optimistically: before writing, the edited 
+    and deleted rows are locked (SELECT ... FOR UPDATE) and their 
+    checksums compared to the ones read by the browser. If any row was 
+    changed or deleted by someone else, nothing is written.
+    
+    Args:
+        connection (MySQLConnection): The connection to write with, used
+            by one thread at a time
+        browser (TableBrowser): The browser the rows were read with, the
+            table must have a primary key
+        batch_size (int): Rows per statement
+    """
+    __slots__ = ["_connection", "_browser", "_batch_size", "_updates",
+                 "_inserts", "_deletes", "round_trips"]
+    
+    def __init__(self,
+                 connection: mysql.connector.MySQLConnection,
+                 browser: TableBrowser,
+                 batch_size: int = 500) -> None:
+        self._connection = connection
+        self._browser = browser
+        self._batch_size = batch_size
+        # Key: primary key of an edited row, Value: {column: new value}
+        self._updates: Dict[Key, Dict[str, Any]] = {}
+        # Key: id of a new row, Value: (the row, {column: value})
+        self._inserts: Dict[int, Tuple[List[Any], Dict[str, Any]]] = {}
+        self._deletes: List[Key] = []
+        self.round_trips = 0
+        
+    # ------------------------------ Editing ------------------------------ #
+    def set_value(self, row: List[Any], column_index: int, 
+                  value: Any) -> None:
+        """
+        Change a cell of a row read by the browser (or added by 
+        insert_row). The row itself is updated too.
+        
+        Args:
+            row (List[Any]): The row
+            column_index (int): The position of the column
+            value (Any): The new value, None for NULL
+        """
+        column = self._browser.columns[column_index]
+        if id(row) in self._inserts:
+            self._inserts[id(row)][1][column.name] = value
+        elif column.primary_key:
+            raise ValueError("Primary key values cannot be edited, "
+                             "delete the row and add a new one instead")
+        else:
+            key = self._browser.row_key(row)
+            if key not in self._browser.checksums:
+                raise ValueError("Only rows of tables with a primary key "
+                                 "can be edited")
+            self._updates.setdefault(key, {})[column.name] = value
+        row[column_index] = value
+        
+    def insert_row(self) -> List[Any]:
+        """
+        Add a new row. Its cells are set with set_value, unset columns get
+        their default.
+        
+        Returns:
+            List[Any]: The new row, all NULL
+        """
+        row = [None] * len(self._browser.columns)
+        self._inserts[id(row)] = (row, {})
+        return row
+        
+    def delete_row(self, row: List[Any]) -> None:
+        """
+        Delete a row read by the browser (or added by insert_row).
+        
+        Args:
+            row (List[Any]): The row
+        """
+        if self._inserts.pop(id(row), None) is not None:
+            return
+        key = self._browser.row_key(row)
+        if key not in self._browser.checksums:
+            raise ValueError("Only rows of tables with a primary key "
+                             "can be deleted")
+        self._updates.pop(key, None)
+        if key not in self._deletes:
+            self._deletes.append(key)
+            
+    def is_new(self, row: List[Any]) -> bool:
+        """Returns whether a row was added by insert_row."""
+        return id(row) in self._inserts
+        
+    def pending(self) -> int:
+        """Returns the number of edited, new and deleted rows."""
+        return len(self._updates) + len(self._inserts) + len(self._deletes)
+    
+    def discard(self) -> None:
+        """
+        Forget all edits.
+        """
+        self._updates.clear()
+        self._inserts.clear()
+        self._deletes.clear()
+    # -----------------------------^ Editing ^----------------------------- #
+    
+    # ----------------------------- Writing ----------------------------- #
+    def save(self) -> List[Key]:
+        """
+        Write all edits in one transaction. On a conflict (or an error) 
+        the transaction is rolled back and the edits are kept.
+        
+        Returns:
+            List[Key]: The keys of the rows changed or deleted by someone
+                else since they were read; empty if the edits were written
+        """
+        if not self.pending():
+            return []
+        # Left open by reads on a connection with autocommit off
+        if self._connection.in_transaction:
+            self._connection.commit()
+        self._connection.start_transaction()
+        self.round_trips = 1
+        try:
+            conflicts = self._lock_rows(list(self._updates) + self._deletes)
+            if conflicts:
+                self._connection.rollback()
+                return conflicts
+            for batch in self._batches(self._deletes):
+                self._execute(
+                    f"DELETE FROM {self._browser.qualified_table()}"
+                    f" WHERE {self._in_keys(len(batch))}",
+                    [value for key in batch for value in key])
+            for columns, keys in self._grouped(
+                    (key, values) for key, values in self._updates.items()):
+                for batch in self._batches(keys):
+                    self._update(columns, batch)
+            for columns, rows in self._grouped(
+                    self._inserts.values()):
+                for batch in self._batches(rows):
+                    self._insert(columns, batch)
+            self._connection.commit()
+            self.round_trips += 1
+        except mysql.connector.Error:
+            self._connection.rollback()
+            raise
+        self.discard()
+        return []
+    
+    def _execute(self, sql: str, params: List[Any]) -> List[tuple]:
+        """
+        Run one statement of the transaction.
+        
+        Args:
+            sql (str): The statement
+            params (List[Any]): Its parameters
+            
+        Returns:
+            List[tuple]: The rows returned, if any
+        """
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            self.round_trips += 1
+            return cursor.fetchall() if cursor.with_rows else []
+        finally:
+            cursor.close()
+    
+    def _batches(self, items: List[Any]) -> List[List[Any]]:
+        """Split items into batches of at most batch_size."""
+        return [items[start:start + self._batch_size] 
+                for start in range(0, len(items), self._batch_size)]
+    
+    def _grouped(self, edits) -> List[Tuple[List[str], List[Any]]]:
+        """
+        Group edits by the columns they set, as each statement sets the 
+        same columns for all of its rows.
+        
+        Args:
+            edits (Iterable[Tuple[Any, Dict[str, Any]]]): (row, 
+                {column: value}) pairs
+                
+        Returns:
+            List[Tuple[List[str], List[Any]]]: The columns of each group, 
+                and its (row, {column: value}) pairs
+        """
+        groups: Dict[Tuple[str, ...], List[Any]] = {}
+        for row, values in edits:
+            groups.setdefault(tuple(sorted(values)), []).append(
+                (row, values))
+        return [(list(columns), edits) for columns, edits in groups.items()]
+    
+    def _in_keys(self, count: int) -> str:
+        """
+        Returns a condition selecting count rows by primary key.
+        
+        Args:
+            count (int): The number of keys
+        """
+        keys = self._browser.key_columns()
+        columns = ", ".join(f"`{column.name}`" for column in keys)
+        placeholders = f"({', '.join(['%s'] * len(keys))})"
+        return f"({columns}) IN ({', '.join([placeholders] * count)})"
+    
+    def _lock_rows(self, keys: List[Key]) -> List[Key]:
+        """
+        Lock the rows to write and compare their checksums to the ones
+        read by the browser.
+        
+        Args:
+            keys (List[Key]): The keys of the rows
+            
+        Returns:
+            List[Key]: The keys of the rows that changed or are gone
+        """
+        key_columns = self._browser.key_columns()
+        checksum = self._browser.checksum()
+        current: Dict[Key, int] = {}
+        for batch in self._batches(keys):
+            rows = self._execute(
+                f"SELECT " 
+                f"{', '.join(f'`{column.name}`' for column in key_columns)}"
+                f", {checksum} FROM {self._browser.qualified_table()}"
+                f" WHERE {self._in_keys(len(batch))} FOR UPDATE",
+                [value for key in batch for value in key])
+            for row in rows:
+                current[tuple(row[:-1])] = row[-1]
+        return [key for key in keys 
+                if current.get(key) != self._browser.checksums.get(key)]
+    
+    def _update(self, columns: List[str], 
+                edits: List[Tuple[Key, Dict[str, Any]]]) -> None:
+        """
+        Update the same columns of several rows in one statement.
+        
+        Args:
+            columns (List[str]): The columns to set
+            edits (List[Tuple[Key, Dict[str, Any]]]): The rows' keys and 
+                new values
+        """
+        key_columns = self._browser.key_columns()
+        key = f"({', '.join(f'`{column.name}`' for column in key_columns)})"
+        placeholders = f"({', '.join(['%s'] * len(key_columns))})"
+        cases = " ".join([f"WHEN {key} = {placeholders} THEN %s"] 
+                         * len(edits))
+        assignments = []
+        params: List[Any] = []
+        for column in columns:
+            assignments.append(
+                f"`{column}` = CASE {cases} ELSE `{column}` END")
+            for row_key, values in edits:
+                params += list(row_key) + [values[column]]
+        params += [value for row_key, _ in edits for value in row_key]
+        self._execute(
+            f"UPDATE {self._browser.qualified_table()}"
+            f" SET {', '.join(assignments)}"
+            f" WHERE {self._in_keys(len(edits))}", params)
+        
+    def _insert(self, columns: List[str],
+                rows: List[Tuple[List[Any], Dict[str, Any]]]) -> None:
+        """
+        Insert several rows that set the same columns in one statement.
+        
+        Args:
+            columns (List[str]): The columns to set, others get their 
+                default
+            rows (List[Tuple[List[Any], Dict[str, Any]]]): The new rows
+                and their values
+        """
+        placeholders = f"({', '.join(['%s'] * len(columns))})"
+        self._execute(
+            f"INSERT INTO {self._browser.qualified_table()}"
+            f" ({', '.join(f'`{column}`' for column in columns)})"
+            f" VALUES {', '.join([placeholders] * len(rows))}",
+            [values[column] for _, values in rows for column in columns])
+    # ----------------------------^ Writing ^---------------------------- #
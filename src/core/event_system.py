@@ -26,6 +26,28 @@ class EventSystem:
         if event not in self._subscribers:
             self._subscribers[event] = []
         self._subscribers[event].append(callback)
+    
+    def unsubscribe(self, event: str, callback: Callable) -> None:
+        """
+        Unsubscribe a callback function from an event, e.g. when the
+            window it belongs to is destroyed.
+        
+        Args:
+            event (str): The name of the event
+            callback (Callable): The function that was subscribed
+        """
+        print(f"Unsubscribing from {event}")
+        if callback in self._subscribers.get(event, []):
+            self._subscribers[event].remove(callback)
+            if not self._subscribers[event]:
+                del self._subscribers[event]
+    
+    def subscriber_count(self) -> int:
+        """
+        Returns the number of subscribed callbacks, over all events.
+        """
+        return sum(len(callbacks) 
+                   for callbacks in self._subscribers.values())
         
     def publish(self, event: str, data: Dict[str,Any] = {}) -> None:
         """
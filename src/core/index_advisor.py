@@ -0,0 +1,417 @@
+import re
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+import mysql.connector
+
+from core.query_history import QueryHistory, strip_literals
+import core.query_profiler as profiler
+
+class WorkloadQuery:
+    """
+    A recurring query of a captured workload.
+    
+    Args:
+        sql (str): A sample of the query, with literal values
+        count (int): How many times the query ran
+        total_time (float): Total time spent running it, in seconds
+        schema (Optional [str]): The default schema it ran in, if known
+    """
+    __slots__ = ["sql", "count", "total_time", "schema"]
+    
+    def __init__(self, sql: str, count: int, total_time: float,
+                 schema: Optional[str] = None) -> None:
+        self.sql = sql
+        self.count = count
+        self.total_time = total_time
+        self.schema = schema
+
+class IndexCandidate:
+    """
+    A proposed index, with the workload queries it would help.
+    
+    Args:
+        schema (str): The schema of the table
+        table (str): The table to index
+        columns (List[str]): The index columns, in order
+    """
+    __slots__ = ["schema", "table", "columns", "benefit", "queries", 
+                 "reasons"]
+    
+    def __init__(self, schema: str, table: str, columns: List[str]) -> None:
+        self.schema = schema
+        self.table = table
+        self.columns = columns
+        # Estimated rows examined that the index would avoid, summed over
+        # every execution of the workload queries it helps
+        self.benefit = 0.0
+        self.queries: List[str] = []
+        self.reasons: Set[str] = set()
+        
+    def ddl(self) -> str:
+        """
+        Returns the CREATE INDEX statement for the candidate.
+        """
+        name = "idx_" + "_".join(self.columns)
+        columns = ", ".join(f"`{column}`" for column in self.columns)
+        return f"CREATE INDEX `{name[:64]}` ON " \
+            f"`{self.schema}`.`{self.table}` ({columns})"
+
+# ------------------------------- Workload ------------------------------- #
+def workload_from_history(query_history: QueryHistory,
+                          connection_name: Optional[str] = None,
+                          schema: Optional[str] = None,
+                          limit: int = 50) -> List[WorkloadQuery]:
+    """
+    Capture a workload from the tool's own query history: the recurring 
+    queries that took the most total time.
+    
+    Args:
+        query_history (QueryHistory): The query history
+        connection_name (Optional [str]): Only queries on this connection
+        schema (Optional [str]): The schema the queries ran in (the 
+            history does not record it)
+        limit (int): Maximum number of queries
+        
+    Returns:
+        List[WorkloadQuery]: The workload, most expensive first
+    """
+    query_history.flush()
+    return [WorkloadQuery(stats["sample"], stats["count"], stats["total"],
+                          schema)
+            for stats in query_history.aggregates(connection_name, "total",
+                                                  limit)]
+
+def workload_from_digests(connection: mysql.connector.MySQLConnection,
+                          limit: int = 50) -> List[WorkloadQuery]:
+    """
+    Capture a workload from the server's statement digest summary: the 
+    statements that took the most total time, with a sample of each.
+    
+    Args:
+        connection (MySQLConnection): A connection to the server
+        limit (int): Maximum number of queries
+        
+    Returns:
+        List[WorkloadQuery]: The workload, most expensive first
+    """
+    cursor = connection.cursor()
+    try:
+        # TIMER_WAIT columns are in picoseconds
+        cursor.execute("""
+            SELECT SCHEMA_NAME, QUERY_SAMPLE_TEXT, COUNT_STAR,
+                SUM_TIMER_WAIT / 1000000000000
+            FROM performance_schema.events_statements_summary_by_digest
+            WHERE SCHEMA_NAME IS NOT NULL
+                AND QUERY_SAMPLE_TEXT IS NOT NULL
+                AND (SUM_NO_INDEX_USED > 0 OR SUM_NO_GOOD_INDEX_USED > 0
+                     OR SUM_ROWS_EXAMINED > 10 * SUM_ROWS_SENT)
+            ORDER BY SUM_TIMER_WAIT DESC
+            LIMIT %s
+        """, (limit,))
+        return [WorkloadQuery(sql, int(count), float(total), schema)
+                for schema, sql, count, total in cursor.fetchall()]
+    finally:
+        cursor.close()
+# ------------------------------^ Workload ^------------------------------ #
+
+# ------------------------------- Analysis ------------------------------- #
+_IDENT = r"`?[\w$]+`?"
+_COLUMN = rf"((?:{_IDENT}\.){{0,2}}{_IDENT})"
+_NOT_ALIAS = ("where", "on", "using", "join", "inner", "left", "right", 
+              "cross", "straight_join", "natural", "group", "order", 
+              "limit", "having", "set", "for", "union", "window", "force",
+              "use", "ignore", "lock")
+_TABLE_REF = re.compile(
+    rf"\b(?:from|join|update|into)\s+((?:{_IDENT}\.)?{_IDENT})"
+    rf"(?:\s+(?:as\s+)?(?!(?:{'|'.join(_NOT_ALIAS)})\b)({_IDENT}))?",
+    re.IGNORECASE)
+_CONDITIONS = re.compile(
+    r"\b(?:where|on)\b(.*?)(?=\b(?:join|inner|left|right|cross|where|"
+    r"group by|order by|limit|having|union|for update)\b|$)", 
+    re.IGNORECASE)
+_EQUALITY = re.compile(rf"{_COLUMN}\s*(?:<=>|=|\bin\s*\(|\bis\s+null\b)",
+                       re.IGNORECASE)
+_EQUALITY_RIGHT = re.compile(rf"(?:<=>|[^<>!]=)\s*{_COLUMN}")
+_RANGE = re.compile(rf"{_COLUMN}\s*(?:<(?!=>)|>|\bbetween\b|\blike\b)",
+                    re.IGNORECASE)
+_ORDERING = re.compile(r"\b(?:order|group) by\s+(.*?)(?=\blimit\b|"
+                       r"\bhaving\b|\border by\b|$)", re.IGNORECASE)
+
+def _unquote(identifier: str) -> str:
+    """Remove backquotes from an identifier."""
+    return identifier.replace("`", "")
+
+class _QueryColumns:
+    """
+    The columns of one query that an index could serve, per table alias.
+    Extracted from the query with literals removed; identifiers keep their
+    case, as table names and aliases may be case sensitive.
+    """
+    __slots__ = ["aliases", "equality", "range", "ordering"]
+    
+    def __init__(self, query: str) -> None:
+        text = strip_literals(query)
+        # Key: alias (or table name), Value: (schema or None, table)
+        self.aliases: Dict[str, Tuple[Optional[str], str]] = {}
+        for table, alias in _TABLE_REF.findall(text):
+            parts = _unquote(table).split(".")
+            schema, name = (parts[0], parts[1]) if len(parts) == 2 \
+                else (None, parts[0])
+            self.aliases[name] = (schema, name)
+            if alias:
+                self.aliases[_unquote(alias)] = (schema, name)
+        conditions = " ".join(_CONDITIONS.findall(text))
+        self.equality = _EQUALITY.findall(conditions) + \
+            _EQUALITY_RIGHT.findall(conditions)
+        self.range = _RANGE.findall(conditions)
+        self.ordering: List[str] = []
+        for clause in _ORDERING.findall(text):
+            for item in clause.split(","):
+                words = item.split()
+                if words:
+                    self.ordering.append(words[0])
+# ------------------------------^ Analysis ^------------------------------ #
+
+class IndexAdvisor:
+    """
+    Proposes indexes for a captured workload. Each query is EXPLAINed, 
+    tables read with a full (index) scan or a poorly filtering key get a 
+    candidate composite index: equality columns first, then one range 
+    column, or the ORDER/GROUP BY columns to avoid a filesort.
+    Candidates already covered by an existing index are dropped, and
+    candidates that are prefixes of another are merged into it.
+    
+    Args:
+        connection (MySQLConnection): A connection to the server, used for
+            EXPLAIN and schema metadata. A side connection should be used,
+            as the advisor changes its default schema
+        min_rows (int): Tables examining fewer rows per scan are ignored
+        max_columns (int): Maximum columns in a proposed index
+    """
+    __slots__ = ["_connection", "_min_rows", "_max_columns", "_columns",
+                 "_indexes", "skipped"]
+    
+    # Key use is poor when it keeps less than this % of examined rows
+    POOR_FILTER_PERCENT = 10.0
+    
+    def __init__(self, connection: mysql.connector.MySQLConnection,
+                 min_rows: int = 1000, max_columns: int = 5) -> None:
+        self._connection = connection
+        self._min_rows = min_rows
+        self._max_columns = max_columns
+        # Schema metadata caches, key: (schema, table)
+        self._columns: Dict[Tuple[str, str], List[str]] = {}
+        self._indexes: Dict[Tuple[str, str], List[List[str]]] = {}
+        # (query, reason) of queries that could not be analyzed
+        self.skipped: List[Tuple[str, str]] = []
+    
+    # ----------------------------- Advising ----------------------------- #
+    def advise(self, workload: List[WorkloadQuery],
+               progress: Optional[Callable[[int, int], None]] = None) \
+        -> List[IndexCandidate]:
+        """
+        Analyze a workload and propose indexes.
+        
+        Args:
+            workload (List[WorkloadQuery]): The queries to analyze
+            progress (Optional [Callable]): Called with (done, total) 
+                after each query
+            
+        Returns:
+            List[IndexCandidate]: The proposed indexes, best first
+        """
+        candidates: List[IndexCandidate] = []
+        for done, query in enumerate(workload, 1):
+            try:
+                candidates.extend(self._analyze(query))
+            except mysql.connector.Error as err:
+                self.skipped.append((query.sql, str(err)))
+            except (ValueError, KeyError, IndexError) as err:
+                self.skipped.append(
+                    (query.sql, f"Could not parse plan: {err!r}"))
+            if progress is not None:
+                progress(done, len(workload))
+        return self._merge(candidates)
+    
+    def _analyze(self, query: WorkloadQuery) -> Iterator[IndexCandidate]:
+        """
+        EXPLAIN one query, and yield a candidate per badly accessed table.
+        
+        Args:
+            query (WorkloadQuery): The query to analyze
+            
+        Yields:
+            IndexCandidate: The candidate index, with this query's benefit
+        """
+        cursor = self._connection.cursor()
+        try:
+            if query.schema:
+                cursor.execute(f"USE `{query.schema}`")
+            cursor.execute(profiler.explain_statement(query.sql, False))
+            plan = profiler.parse_plan(cursor.fetchall()[0][0], False)
+            schema = query.schema or self._current_schema(cursor)
+        finally:
+            cursor.close()
+        columns = _QueryColumns(query.sql)
+        ordered = any("filesort" in node.flags for node in plan.walk())
+        for node in plan.walk():
+            if node.table is None or node.estimated_rows is None \
+                    or node.estimated_rows < self._min_rows:
+                continue
+            reason = self._access_problem(node)
+            if reason is None:
+                continue
+            table_schema, table = columns.aliases.get(
+                node.table, (None, node.table))
+            table_schema = table_schema or schema
+            if table_schema is None:
+                self.skipped.append((query.sql, "No schema selected"))
+                continue
+            index_columns = self._index_columns(
+                node.table, table_schema, table, columns, ordered)
+            if not index_columns:
+                self.skipped.append(
+                    (query.sql, f"No indexable columns for {table}"))
+                continue
+            candidate = IndexCandidate(table_schema, table, index_columns)
+            kept = (100.0 if node.filtered is None
+                    else node.filtered) / 100.0
+            candidate.benefit = query.count * node.estimated_rows * \
+                (1.0 - kept)
+            candidate.queries.append(query.sql)
+            candidate.reasons.add(reason)
+            yield candidate
+    
+    def _access_problem(self, node: profiler.PlanNode) -> Optional[str]:
+        """
+        Returns why a table access is bad, or None if it is fine.
+        
+        Args:
+            node (PlanNode): The table access node
+        """
+        if "full scan" in node.flags:
+            return "full table scan"
+        if "full index scan" in node.flags:
+            return "full index scan"
+        if node.key and node.filtered is not None \
+                and node.filtered < self.POOR_FILTER_PERCENT:
+            return f"key {node.key} keeps {node.filtered:g}% of rows"
+        return None
+    
+    def _index_columns(self, alias: str, schema: str, table: str,
+                       columns: _QueryColumns, ordered: bool) -> List[str]:
+        """
+        Choose the columns of a composite index for one table of a query.
+        
+        Args:
+            alias (str): The table's alias in the query
+            schema (str): The table's schema
+            table (str): The table's name
+            columns (_QueryColumns): The query's indexable columns
+            ordered (bool): Whether the query needed a filesort
+            
+        Returns:
+            List[str]: The index columns, empty if there are none
+        """
+        table_columns = set(self._table_columns(schema, table))
+        
+        def resolve(references: List[str]) -> List[str]:
+            resolved = []
+            for reference in references:
+                parts = _unquote(reference).split(".")
+                if len(parts) > 1 and parts[-2] not in (alias, table):
+                    continue
+                # Column names are never case sensitive
+                column = parts[-1].lower()
+                if column in table_columns and column not in resolved:
+                    resolved.append(column)
+            return resolved
+        
+        index_columns = resolve(columns.equality)
+        ranges = [column for column in resolve(columns.range)
+                  if column not in index_columns]
+        if ranges:
+            index_columns.append(ranges[0])
+        elif ordered:
+            # Rows come out of the index sorted, avoiding the filesort
+            index_columns += [column for column in resolve(columns.ordering)
+                              if column not in index_columns]
+        return index_columns[:self._max_columns]
+    
+    def _merge(self, candidates: List[IndexCandidate]) \
+        -> List[IndexCandidate]:
+        """
+        Merge candidates on the same table that are prefixes of each other,
+        and drop those covered by existing indexes.
+        
+        Args:
+            candidates (List[IndexCandidate]): The candidates, per query
+            
+        Returns:
+            List[IndexCandidate]: The merged candidates, best first
+        """
+        merged: List[IndexCandidate] = []
+        for candidate in sorted(candidates, key=lambda c: -len(c.columns)):
+            existing = self._table_indexes(candidate.schema, candidate.table)
+            if any(index[:len(candidate.columns)] == candidate.columns
+                   for index in existing):
+                continue
+            for other in merged:
+                if (other.schema, other.table) == \
+                        (candidate.schema, candidate.table) and \
+                        other.columns[:len(candidate.columns)] == \
+                        candidate.columns:
+                    other.benefit += candidate.benefit
+                    other.queries += [query for query in candidate.queries
+                                      if query not in other.queries]
+                    other.reasons |= candidate.reasons
+                    break
+            else:
+                merged.append(candidate)
+        return sorted(merged, key=lambda c: -c.benefit)
+    # ----------------------------^ Advising ^---------------------------- #
+    
+    # ---------------------------- Schema Data ---------------------------- #
+    def _current_schema(self, cursor) -> Optional[str]:
+        """
+        Returns the connection's default schema, if one is selected.
+        """
+        cursor.execute("SELECT DATABASE()")
+        return cursor.fetchall()[0][0]
+    
+    def _table_columns(self, schema: str, table: str) -> List[str]:
+        """
+        Returns the (lowercase) column names of a table.
+        """
+        if (schema, table) not in self._columns:
+            cursor = self._connection.cursor()
+            try:
+                cursor.execute(
+                    "SELECT LOWER(COLUMN_NAME) FROM information_schema.COLUMNS"
+                    " WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s"
+                    " ORDER BY ORDINAL_POSITION", (schema, table))
+                self._columns[(schema, table)] = \
+                    [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        return self._columns[(schema, table)]
+    
+    def _table_indexes(self, schema: str, table: str) -> List[List[str]]:
+        """
+        Returns the (lowercase) columns of each existing index of a table.
+        """
+        if (schema, table) not in self._indexes:
+            cursor = self._connection.cursor()
+            try:
+                cursor.execute(
+                    "SELECT INDEX_NAME, LOWER(COLUMN_NAME)"
+                    " FROM information_schema.STATISTICS"
+                    " WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s"
+                    " ORDER BY INDEX_NAME, SEQ_IN_INDEX", (schema, table))
+                indexes: Dict[str, List[str]] = {}
+                for index_name, column in cursor.fetchall():
+                    indexes.setdefault(index_name, []).append(column)
+                self._indexes[(schema, table)] = list(indexes.values())
+            finally:
+                cursor.close()
+        return self._indexes[(schema, table)]
+    # ---------------------------^ Schema Data ^--------------------------- #
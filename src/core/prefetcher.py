@@ -0,0 +1,307 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import mysql.connector
+
+from core.table_browser import TableBrowser
+
+class Prefetcher:
+    """
+    Loads what the user is likely to open next ahead of time, while the 
+    user is still choosing: a database's table list and, for its recently
+    used tables, their columns and first page. Results are kept in a 
+    small LRU cache, from which windows take them instead of querying.
+    
+    Work runs on one worker thread with its own low priority connection 
+    (read only, with a per-query time limit), so it never competes with 
+    the user's queries for a connection. Each prefetch has a budget (in 
+    tables and seconds); starting a new prefetch, or cancel(), abandons 
+    the previous one after its current query.
+    
+    Args:
+        connection_factory (Callable): Returns a new connection
+        max_entries (int): Cached entries kept (least recently used first
+            out)
+        max_tables (int): Tables whose first page is loaded per database
+        budget_seconds (float): Time a prefetch may take in total
+        max_age (float): Seconds a cached entry stays valid
+        page_size (int): Rows per prefetched first page
+    """
+    __slots__ = ["_connection_factory", "_max_entries", "_max_tables",
+                 "_budget_seconds", "_max_age", "_page_size", "_cache",
+                 "_recent_tables", "_lock", "_generation", "_requests",
+                 "_thread"]
+    
+    # Server-side limit of each prefetch query, in milliseconds
+    MAX_EXECUTION_TIME = 2000
+    # Tables remembered as recently used, per database
+    RECENT_TABLES = 10
+    
+    def __init__(self,
+                 connection_factory: Callable[
+                     [], mysql.connector.MySQLConnection],
+                 max_entries: int = 32,
+                 max_tables: int = 3,
+                 budget_seconds: float = 2.0,
+                 max_age: float = 60.0,
+                 page_size: int = 200) -> None:
+        self._connection_factory = connection_factory
+        self._max_entries = max_entries
+        self._max_tables = max_tables
+        self._budget_seconds = budget_seconds
+        self._max_age = max_age
+        self._page_size = page_size
+        # Key: ('tables', database) or ('page', database, table),
+        # Value: (time loaded, value)
+        self._cache: OrderedDict[Tuple, Tuple[float, Any]] = OrderedDict()
+        # Key: database, Value: its recently used tables, latest first
+        self._recent_tables: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        # Incremented to abandon queued and running prefetches
+        self._generation = 0
+        self._requests = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        
+    # ------------------------------ Control ------------------------------ #
+    def start(self) -> "Prefetcher":
+        """
+        Start the worker thread.
+        
+        Returns:
+            Prefetcher: self, for chaining
+        """
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """
+        Abandon any prefetch and stop the worker thread, which closes its
+        connection.
+        """
+        self.cancel()
+        self._requests.put(None)
+        
+    def prefetch(self, database_name: str) -> None:
+        """
+        Prefetch a database's table list and recently used tables, 
+        abandoning any previous prefetch.
+        
+        Args:
+            database_name (str): The database the user is likely to open
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._requests.put((generation, database_name))
+        
+    def cancel(self) -> None:
+        """
+        Abandon any prefetch, e.g. when the user moves elsewhere.
+        """
+        with self._lock:
+            self._generation += 1
+    
+    def _cancelled(self, generation: int, deadline: float) -> bool:
+        """
+        Returns whether a prefetch was abandoned or is over its budget.
+        """
+        return generation != self._generation or time.monotonic() > deadline
+    # -----------------------------^ Control ^----------------------------- #
+    
+    # ------------------------------- Cache ------------------------------- #
+    def _get(self, key: Tuple, pop: bool = False) -> Any:
+        """
+        Get a valid cached value, marking it as recently used.
+        
+        Args:
+            key (Tuple): The cache key
+            pop (bool): Also remove it from the cache
+            
+        Returns:
+            Any: The value, or None if not cached
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expired = time.monotonic() - entry[0] > self._max_age
+            if expired or pop:
+                del self._cache[key]
+            else:
+                self._cache.move_to_end(key)
+            return None if expired else entry[1]
+    
+    def _put(self, key: Tuple, value: Any) -> None:
+        """
+        Cache a value, evicting the least recently used entries.
+        
+        Args:
+            key (Tuple): The cache key
+            value (Any): The value
+        """
+        with self._lock:
+            self._cache[key] = (time.monotonic(), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+                
+    def tables(self, database_name: str) -> Optional[List[str]]:
+        """
+        Get a database's prefetched table list.
+        
+        Args:
+            database_name (str): The database
+            
+        Returns:
+            Optional [List[str]]: The table names, or None if not cached
+        """
+        tables = self._get(("tables", database_name))
+        return None if tables is None else list(tables)
+    
+    def take_page(self, database_name: str, table: str,
+                  connection: mysql.connector.MySQLConnection) \
+            -> Optional[Tuple[TableBrowser, List[List[Any]]]]:
+        """
+        Take a table's prefetched first page out of the cache.
+        
+        Args:
+            database_name (str): The database of the table
+            table (str): The table
+            connection (MySQLConnection): The connection to read further 
+                pages with
+            
+        Returns:
+            Optional [Tuple[TableBrowser, List[List[Any]]]]: A browser 
+                positioned after the first page, and the page; or None if
+                not cached
+        """
+        cached = self._get(("page", database_name, table), pop = True)
+        if cached is None:
+            return None
+        browser, rows = cached
+        return browser.copy(connection), [list(row) for row in rows]
+    
+    def used(self, database_name: str, table: str) -> None:
+        """
+        Record that a table was opened, so it is prefetched next time.
+        
+        Args:
+            database_name (str): The database of the table
+            table (str): The table
+        """
+        with self._lock:
+            recent = self._recent_tables.setdefault(database_name, [])
+            if table in recent:
+                recent.remove(table)
+            recent.insert(0, table)
+            del recent[self.RECENT_TABLES:]
+            
+    def invalidate(self, database_name: str, 
+                   table: Optional[str] = None) -> None:
+        """
+        Drop cached entries, e.g. after the data was changed.
+        
+        Args:
+            database_name (str): The database
+            table (Optional [str]): Only drop this table's entries
+        """
+        with self._lock:
+            for key in list(self._cache):
+                if key[1] == database_name and (table is None or 
+                        (key[0] == "page" and key[2] == table)):
+                    del self._cache[key]
+    # ------------------------------^ Cache ^------------------------------ #
+    
+    # ------------------------------ Worker ------------------------------ #
+    def _connect(self) -> mysql.connector.MySQLConnection:
+        """
+        Open the worker's low priority connection.
+        
+        Returns:
+            MySQLConnection: The connection
+        """
+        connection = self._connection_factory()
+        # Otherwise the first read opens a transaction that is never 
+        # ended: every later prefetch would read its stale snapshot, and
+        # the server would keep old row versions for it
+        connection.autocommit = True
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SET SESSION TRANSACTION READ ONLY")
+            cursor.execute(f"SET SESSION max_execution_time = "
+                           f"{self.MAX_EXECUTION_TIME}")
+        finally:
+            cursor.close()
+        return connection
+    
+    def _work(self) -> None:
+        """
+        Run prefetch requests, skipping abandoned ones (worker thread).
+        The connection is opened on the first request.
+        """
+        connection = None
+        try:
+            while True:
+                request = self._requests.get()
+                if request is None:
+                    return
+                generation, database_name = request
+                if generation != self._generation:
+                    continue
+                try:
+                    if connection is None:
+                        connection = self._connect()
+                    self._prefetch(connection, generation, database_name)
+                except mysql.connector.Error as err:
+                    print(f"Prefetch of {database_name} failed: {err}")
+                    if connection is not None:
+                        connection.close()
+                    connection = None
+        finally:
+            if connection is not None:
+                connection.close()
+    
+    def _prefetch(self, connection: mysql.connector.MySQLConnection,
+                  generation: int, database_name: str) -> None:
+        """
+        Load a database's table list, then the columns and first page of
+        its recently used tables, within the budget.
+        
+        Args:
+            connection (MySQLConnection): The worker's connection
+            generation (int): The generation of the request
+            database_name (str): The database
+        """
+        deadline = time.monotonic() + self._budget_seconds
+        tables = self.tables(database_name)
+        if tables is None:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    "SELECT TABLE_NAME FROM information_schema.TABLES"
+                    " WHERE TABLE_SCHEMA = %s ORDER BY TABLE_NAME",
+                    (database_name,))
+                tables = [row[0] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+            self._put(("tables", database_name), tables)
+        with self._lock:
+            recent = [table for table 
+                      in self._recent_tables.get(database_name, [])
+                      if table in tables][:self._max_tables]
+        for table in recent:
+            if self._cancelled(generation, deadline):
+                return
+            if self._get(("page", database_name, table)) is not None:
+                continue
+            browser = TableBrowser(connection, database_name, table,
+                                   page_size = self._page_size)
+            browser.load_columns()
+            if self._cancelled(generation, deadline):
+                return
+            self._put(("page", database_name, table), 
+                      (browser, browser.next_page()))
+    # -----------------------------^ Worker ^----------------------------- #
@@ -0,0 +1,233 @@
+import threading
+import time
+from typing import Any, Callable, List, Optional
+import mysql.connector
+
+import database
+
+class QueryHandle:
+    """
+    A cancellable query, run on a worker thread so the caller (the Tk
+    mainloop) is never blocked by it.
+    Cancelling sends KILL QUERY over a side connection, so the query's
+    own connection is kept and can be reused once the handle is done.
+    The connection must not be used by anything else until then.
+    
+    Args:
+        connection (MySQLConnection): The connection to run the query on
+        query (str): The query to run
+        side_connection_factory (Callable): Returns a new connection to 
+            the same server, used to send KILL QUERY
+        timeout (Optional [float]): Client-side deadline in seconds, the
+            query is cancelled once it is reached
+        max_execution_time (Optional [int]): Server-side limit in 
+            milliseconds, sent as a MAX_EXECUTION_TIME hint (SELECT only)
+        fetch_size (int): Rows fetched per call, cancellation is checked
+            between fetches
+        follow_up (Optional [Callable]): Called with the connection on 
+            the worker thread once the query succeeded, before the handle
+            is done; its return value is kept in follow_up_result
+    """
+    __slots__ = ["_connection", "_query", "_side_connection_factory",
+                 "_timeout", "_fetch_size", "_lock", "_thread", "_timer",
+                 "_finished", "_cancel_requested", "_timed_out",
+                 "_connection_id", "_follow_up", "columns", "rows", 
+                 "rowcount", "error", "duration", "follow_up_result"]
+    
+    def __init__(self,
+                 connection: mysql.connector.MySQLConnection,
+                 query: str,
+                 side_connection_factory: Callable[
+                     [], mysql.connector.MySQLConnection],
+                 timeout: Optional[float] = None,
+                 max_execution_time: Optional[int] = None,
+                 fetch_size: int = 1000,
+                 follow_up: Optional[Callable[
+                     [mysql.connector.MySQLConnection], Any]] = None) \
+        -> None:
+        self._connection = connection
+        self._query = database.with_max_execution_time(
+            query, max_execution_time)
+        self._side_connection_factory = side_connection_factory
+        self._timeout = timeout
+        self._fetch_size = fetch_size
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._timer: Optional[threading.Timer] = None
+        self._finished = threading.Event()
+        self._cancel_requested = False
+        self._timed_out = False
+        self._connection_id: Optional[int] = None
+        self._follow_up = follow_up
+        # Results, valid once done() is True
+        self.columns: List[str] = []
+        self.rows: List[tuple] = []
+        self.rowcount: int = -1
+        self.error: Optional[Exception] = None
+        self.duration: float = 0.0
+        self.follow_up_result: Any = None
+        
+    # ------------------------------ Running ------------------------------ #
+    def start(self) -> "QueryHandle":
+        """
+        Start running the query on a worker thread.
+        
+        Returns:
+            QueryHandle: This handle, for chaining
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if self._timeout:
+            self._timer = threading.Timer(self._timeout, self._deadline)
+            self._timer.daemon = True
+            self._timer.start()
+        return self
+    
+    def _run(self) -> None:
+        """
+        Execute the query and fetch its rows (worker thread).
+        """
+        started = time.perf_counter()
+        cursor = None
+        executed = False
+        try:
+            with self._lock:
+                self._connection_id = \
+                    database.get_connection_id(self._connection)
+                # Cancelled before the id was known, so no KILL was sent:
+                # the query must not be started at all
+                if self._cancel_requested:
+                    return
+            executed = True
+            cursor = self._connection.cursor()
+            cursor.execute(self._query)
+            if cursor.description:
+                self.columns = [column[0] for column in cursor.description]
+                while not self._cancel_requested:
+                    batch = cursor.fetchmany(self._fetch_size)
+                    if not batch:
+                        break
+                    self.rows.extend(batch)
+            else:
+                self._connection.commit()
+            self.rowcount = cursor.rowcount
+        except mysql.connector.Error as err:
+            self.error = err
+        finally:
+            with self._lock:
+                # No KILL may be sent once the query is over, it would
+                # hit whatever runs on the connection next
+                self._connection_id = None
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except mysql.connector.Error:
+                    pass
+            if executed and (self.error is not None or 
+                             self._cancel_requested):
+                database.reset_connection_state(self._connection)
+            if self._timer is not None:
+                self._timer.cancel()
+            self.duration = time.perf_counter() - started
+            if executed:
+                database.notify_query(
+                    self._connection, self._query, self.duration,
+                    len(self.rows) if self.columns else self.rowcount,
+                    self.error)
+                if self._follow_up is not None and self.error is None \
+                    and not self._cancel_requested:
+                    self.follow_up_result = \
+                        self._follow_up(self._connection)
+            self._finished.set()
+    
+    def _deadline(self) -> None:
+        """
+        Client-side deadline reached, cancel the query (timer thread).
+        """
+        if not self._finished.is_set():
+            self._timed_out = True
+            self.cancel()
+    # -----------------------------^ Running ^----------------------------- #
+    
+    # ---------------------------- Cancelling ---------------------------- #
+    def cancel(self) -> None:
+        """
+        Cancel the query. Safe to call from any thread, and more than once.
+        The KILL QUERY is sent on its own thread, so this never blocks.
+        """
+        with self._lock:
+            if self._cancel_requested or self._finished.is_set():
+                return
+            self._cancel_requested = True
+            connection_id = self._connection_id
+        if connection_id is not None:
+            threading.Thread(target=self._kill, args=(connection_id,),
+                             daemon=True).start()
+        
+    def _kill(self, connection_id: int) -> None:
+        """
+        Send KILL QUERY for the connection over a side connection.
+        
+        Args:
+            connection_id (int): The id of the connection to kill the 
+                query on
+        """
+        try:
+            side_connection = self._side_connection_factory()
+        except mysql.connector.Error as err:
+            print(f"Could not open side connection to cancel query: {err}")
+            return
+        try:
+            # Held so the query cannot finish (and the connection be
+            # reused) between the check and the KILL
+            with self._lock:
+                if self._connection_id == connection_id:
+                    database.kill_query(side_connection, connection_id)
+        finally:
+            side_connection.close()
+    # ---------------------------^ Cancelling ^--------------------------- #
+    
+    # ------------------------------ Status ------------------------------ #
+    def done(self) -> bool:
+        """
+        Returns whether the query has finished (or was cancelled) and the 
+        connection is free to use again.
+        """
+        return self._finished.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the query is done.
+        
+        Args:
+            timeout (Optional [float]): Maximum time to wait in seconds
+            
+        Returns:
+            bool: True if the query is done
+        """
+        return self._finished.wait(timeout)
+    
+    def cancelled(self) -> bool:
+        """Returns whether the query was cancelled (or timed out)."""
+        return self._cancel_requested
+    
+    def timed_out(self) -> bool:
+        """Returns whether the query was cancelled by its deadline."""
+        return self._timed_out
+    
+    def status(self) -> str:
+        """
+        Returns a short, human readable description of the query's state.
+        """
+        if not self.done():
+            return "Running..."
+        if self._timed_out:
+            return f"Timed out after {self.duration:.2f}s"
+        if self._cancel_requested:
+            return f"Cancelled after {self.duration:.2f}s"
+        if self.error is not None:
+            return f"Error: {self.error}"
+        if self.columns:
+            return f"{len(self.rows)} rows in {self.duration:.3f}s"
+        return f"{self.rowcount} rows affected in {self.duration:.3f}s"
+    # -----------------------------^ Status ^----------------------------- #
@@ -0,0 +1,350 @@
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import database
+
+# ----------------------------- Fingerprints ----------------------------- #
+_COMMENTS = re.compile(r"/\*(?![!+]).*?\*/|(?:--\s|#)[^\n]*", re.DOTALL)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBERS = re.compile(r"(?<![\w`.])-?(?:0x[0-9a-f]+|"
+                      r"\d+(?:\.\d+)?(?:e[+-]?\d+)?)(?![\w`])",
+                      re.IGNORECASE)
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_MULTI_ROWS = re.compile(r"(\(\?\+\))(?:\s*,\s*\(\?\+\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+def strip_literals(query: str) -> str:
+    """
+    Normalize a query's text, keeping its case: comments are removed, 
+    strings and numbers become '?', value lists collapse to '(?+)' and
+    whitespace is folded.
+    
+    Args:
+        query (str): The query to normalize
+        
+    Returns:
+        str: The normalized query
+    """
+    # Strings first, they are more likely to hold '#' than comments are
+    # to hold quotes
+    normalized = _STRINGS.sub("?", query)
+    normalized = _COMMENTS.sub(" ", normalized)
+    normalized = _NUMBERS.sub("?", normalized)
+    normalized = _VALUE_LISTS.sub("(?+)", normalized)
+    normalized = _MULTI_ROWS.sub(r"\1", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip().rstrip(";")
+    return normalized.strip()
+
+def fingerprint(query: str) -> str:
+    """
+    Normalize a query so that queries differing only in literal values
+    share a fingerprint: the query's stripped literals (see 
+    strip_literals), with case folded too.
+    
+    Args:
+        query (str): The query to normalize
+        
+    Returns:
+        str: The query's fingerprint
+    """
+    return strip_literals(query).lower()
+# ----------------------------^ Fingerprints ^---------------------------- #
+
+class QueryHistory:
+    """
+    A local store of every query run, with its timing, kept in a SQLite 
+    database with a full-text index on the query text.
+    Recording only queues the query; a background thread fingerprints and
+    writes queued queries in batches, so the querying thread is not slowed.
+    
+    Args:
+        path (str): The SQLite database file
+        max_entries (int): Oldest queries are pruned beyond this many
+    """
+    # Queued records written per transaction
+    WRITE_BATCH_SIZE = 500
+    
+    def __init__(self, path: str = "src/query_history.db",
+                 max_entries: int = 100000) -> None:
+        self._path = path
+        self._max_entries = max_entries
+        self._queue: queue.Queue = queue.Queue()
+        self._read_lock = threading.Lock()
+        self._reader = self._connect()
+        self._fts = self._create_schema(self._reader)
+        self._writer = threading.Thread(target=self._write_loop, 
+                                        daemon=True)
+        self._writer.start()
+    
+    # --------------------------- Private Methods -------------------------- #
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open a connection to the history database.
+        
+        Returns:
+            sqlite3.Connection: The connection
+        """
+        connection = sqlite3.connect(self._path, check_same_thread=False)
+        # WAL lets searches run while the writer thread writes
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+    
+    def _create_schema(self, connection: sqlite3.Connection) -> bool:
+        """
+        Create the history tables, if they do not exist.
+        
+        Args:
+            connection (sqlite3.Connection): The connection to use
+        
+        Returns:
+            bool: Whether the full-text index is available (SQLite may be
+                built without FTS5, search then falls back to LIKE)
+        """
+        with connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS queries (
+                    id INTEGER PRIMARY KEY,
+                    executed_at REAL NOT NULL,
+                    connection TEXT NOT NULL,
+                    sql TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    duration REAL NOT NULL,
+                    rows INTEGER NOT NULL,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS queries_fingerprint
+                    ON queries (fingerprint, duration);
+            """)
+        try:
+            with connection:
+                connection.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS queries_fts 
+                        USING fts5(sql, content='queries', 
+                                   content_rowid='id');
+                    CREATE TRIGGER IF NOT EXISTS queries_fts_insert 
+                        AFTER INSERT ON queries BEGIN
+                        INSERT INTO queries_fts (rowid, sql) 
+                            VALUES (new.id, new.sql);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS queries_fts_delete
+                        AFTER DELETE ON queries BEGIN
+                        INSERT INTO queries_fts (queries_fts, rowid, sql)
+                            VALUES ('delete', old.id, old.sql);
+                    END;
+                """)
+        except sqlite3.OperationalError as err:
+            print(f"Query history full-text index unavailable: {err}")
+            return False
+        return True
+    
+    def _write_loop(self) -> None:
+        """
+        Write queued records in batches until closed (writer thread).
+        """
+        connection = self._connect()
+        written = 0
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = []
+            callbacks = []
+            for record in batch:
+                if record is None:  # Sentinel queued by close()
+                    running = False
+                    continue
+                if callable(record):  # Queued by when_written()
+                    callbacks.append(record)
+                    continue
+                executed_at, name, query, duration, rows, error = record
+                records.append((executed_at, name, query, fingerprint(query),
+                                duration, rows, error))
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO queries (executed_at, connection, sql,"
+                        " fingerprint, duration, rows, error)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)", records)
+                    written += len(records)
+                    if written >= self.WRITE_BATCH_SIZE:
+                        written = 0
+                        connection.execute(
+                            "DELETE FROM queries WHERE id <= "
+                            "(SELECT MAX(id) FROM queries) - ?",
+                            (self._max_entries,))
+            except sqlite3.Error as err:
+                print(f"Could not write query history: {err}")
+            for callback in callbacks:
+                try:
+                    callback()
+                except Exception as err:
+                    print(f"Query history callback failed: {err}")
+            for _ in batch:
+                self._queue.task_done()
+        connection.close()
+    # --------------------------^ Private Methods ^------------------------- #
+    
+    # --------------------------- Public Methods --------------------------- #
+    def record(self, connection_name: str, query: str, duration: float,
+               rows: int, error: Optional[str] = None) -> None:
+        """
+        Queue a query to be written to the history.
+        
+        Args:
+            connection_name (str): The name (user@host) of the connection
+            query (str): The query text
+            duration (float): The time taken, in seconds
+            rows (int): Rows returned or affected
+            error (Optional [str]): The error message, if the query failed
+        """
+        self._queue.put((time.time(), connection_name, query, duration, 
+                         rows, error))
+    
+    def on_query(self, connection, query: str, duration: float, rows: int,
+                 error: Optional[Exception] = None) -> None:
+        """
+        Query listener (see database.add_query_listener), records the query.
+        
+        Args:
+            connection (MySQLConnection): The connection the query ran on
+            query (str): The query text
+            duration (float): The time taken, in seconds
+            rows (int): Rows returned or affected
+            error (Optional [Exception]): The error, if the query failed
+        """
+        self.record(database.connection_name(connection), query, duration, 
+                    rows, str(error) if error is not None else None)
+    
+    def flush(self) -> None:
+        """
+        Block until all queued queries are written.
+        """
+        self._queue.join()
+    
+    def when_written(self, callback: Callable[[], None]) -> None:
+        """
+        Call a function on the writer thread once all queries queued so far
+        are written; unlike flush(), the calling thread is not blocked.
+        
+        Args:
+            callback (Callable): The function to call
+        """
+        self._queue.put(callback)
+        
+    def close(self) -> None:
+        """
+        Write all queued queries and close the history.
+        """
+        self._queue.put(None)
+        self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+    
+    def search(self, text: str = "", connection_name: Optional[str] = None,
+               limit: int = 200) -> List[Dict[str, Any]]:
+        """
+        Search the history, most recent first.
+        
+        Args:
+            text (str): Words that must all appear in the query text (all
+                recent queries if empty)
+            connection_name (Optional [str]): Only queries on this 
+                connection
+            limit (int): Maximum number of queries to return
+            
+        Returns:
+            List[Dict[str, Any]]: The queries, with keys 'executed_at', 
+                'connection', 'sql', 'duration', 'rows' and 'error'
+        """
+        sql = "SELECT q.executed_at, q.connection, q.sql, q.duration, " \
+            "q.rows, q.error FROM queries q"
+        conditions = []
+        params: List[Any] = []
+        words = text.split()
+        if words and self._fts:
+            sql += " JOIN queries_fts f ON f.rowid = q.id"
+            conditions.append("queries_fts MATCH ?")
+            # Quote each word, so FTS syntax in the text is taken literally
+            params.append(" ".join(
+                '"' + word.replace('"', '""') + '"' for word in words))
+        elif words:
+            for word in words:
+                conditions.append("q.sql LIKE ?")
+                params.append(f"%{word}%")
+        if connection_name is not None:
+            conditions.append("q.connection = ?")
+            params.append(connection_name)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY q.id DESC LIMIT ?"
+        params.append(limit)
+        with self._read_lock:
+            rows = self._reader.execute(sql, params).fetchall()
+        keys = ("executed_at", "connection", "sql", "duration", "rows", 
+                "error")
+        return [dict(zip(keys, row)) for row in rows]
+    
+    def aggregates(self, connection_name: Optional[str] = None,
+                   order_by: str = "total", limit: int = 50) \
+        -> List[Dict[str, Any]]:
+        """
+        Per-fingerprint statistics, to find the slowest recurring queries.
+        
+        Args:
+            connection_name (Optional [str]): Only queries on this 
+                connection
+            order_by (str): 'total', 'p95', 'p50' or 'count', descending
+            limit (int): Maximum number of fingerprints to return
+            
+        Returns:
+            List[Dict[str, Any]]: Keys 'fingerprint', 'count', 'total', 
+                'p50', 'p95', 'max', 'errors', 'last_id' and 'sample' (the
+                most recent query with the fingerprint, and its id)
+        """
+        if order_by not in ("total", "p95", "p50", "count"):
+            raise ValueError(f"Cannot order aggregates by {order_by}")
+        where = ""
+        params: List[Any] = []
+        if connection_name is not None:
+            where = "WHERE connection = ?"
+            params.append(connection_name)
+        # Nearest-rank percentiles, from each fingerprint's sorted durations
+        sql = f"""
+            WITH ranked AS (
+                SELECT id, fingerprint, duration, error,
+                    ROW_NUMBER() OVER (PARTITION BY fingerprint
+                                       ORDER BY duration) AS position,
+                    COUNT(*) OVER (PARTITION BY fingerprint) AS count
+                FROM queries {where}
+            )
+            SELECT stats.*, queries.sql FROM (
+                SELECT fingerprint, count, SUM(duration) AS total,
+                    MAX(CASE WHEN position = CAST(0.50 * count + 0.999999 
+                        AS INTEGER) THEN duration END) AS p50,
+                    MAX(CASE WHEN position = CAST(0.95 * count + 0.999999 
+                        AS INTEGER) THEN duration END) AS p95,
+                    MAX(duration), COUNT(error), MAX(id) AS last_id
+                FROM ranked
+                GROUP BY fingerprint
+                ORDER BY {order_by} DESC
+                LIMIT ?
+            ) AS stats
+            JOIN queries ON queries.id = stats.last_id
+            ORDER BY {order_by} DESC
+        """
+        params.append(limit)
+        with self._read_lock:
+            rows = self._reader.execute(sql, params).fetchall()
+        keys = ("fingerprint", "count", "total", "p50", "p95", "max", 
+                "errors", "last_id", "sample")
+        return [dict(zip(keys, row)) for row in rows]
+    # --------------------------^ Public Methods ^-------------------------- #
@@ -0,0 +1,293 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+import mysql.connector
+
+# ------------------------------ Plan Nodes ------------------------------ #
+class PlanNode:
+    """
+    A node of a query plan tree, from EXPLAIN FORMAT=JSON (estimates
+    only) or EXPLAIN ANALYZE (estimates and actual measurements).
+    
+    Args:
+        label (str): Description of the operation
+        table (Optional [str]): The table accessed, if any
+    """
+    __slots__ = ["label", "table", "access_type", "key", "estimated_rows",
+                 "estimated_cost", "filtered", "actual_rows", "actual_time",
+                 "loops", "flags", "children"]
+    
+    def __init__(self, label: str, table: Optional[str] = None) -> None:
+        self.label = label
+        self.table = table
+        self.access_type: Optional[str] = None
+        self.key: Optional[str] = None
+        self.estimated_rows: Optional[float] = None
+        self.estimated_cost: Optional[float] = None
+        # Estimated % of examined rows kept by the table's conditions
+        self.filtered: Optional[float] = None
+        self.actual_rows: Optional[float] = None
+        self.actual_time: Optional[float] = None    # ms, all loops
+        self.loops: Optional[int] = None
+        # e.g. 'full scan', 'full index scan', 'filesort', 'temporary'
+        self.flags: List[str] = []
+        self.children: List["PlanNode"] = []
+        
+    def walk(self):
+        """
+        Iterate over this node and all its descendants, depth first.
+        
+        Yields:
+            PlanNode: Each node of the tree
+        """
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+def _number(value: Any) -> Optional[float]:
+    """
+    Convert a plan value (EXPLAIN JSON uses strings, e.g. '1.25') to float.
+    
+    Args:
+        value (Any): The value to convert
+        
+    Returns:
+        Optional [float]: The number, or None if there is none
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _table_node(table: Dict[str, Any]) -> PlanNode:
+    """
+    Build a node from a 'table' object of EXPLAIN FORMAT=JSON.
+    
+    Args:
+        table (Dict[str, Any]): The table object
+        
+    Returns:
+        PlanNode: The node for the table access
+    """
+    access_type = table.get("access_type")
+    node = PlanNode(f"{access_type or 'access'} on "
+                    f"{table.get('table_name', '?')}",
+                    table.get("table_name"))
+    node.access_type = access_type
+    node.key = table.get("key")
+    node.estimated_rows = _number(table.get("rows_examined_per_scan"))
+    node.estimated_cost = _number(
+        table.get("cost_info", {}).get("prefix_cost"))
+    node.filtered = _number(table.get("filtered"))
+    if access_type == "ALL":
+        node.flags.append("full scan")
+    elif access_type == "index":
+        node.flags.append("full index scan")
+    if node.key:
+        node.label += f" using {node.key}"
+    for key, value in table.items():
+        # Derived tables and subqueries in conditions
+        if isinstance(value, dict) and "query_block" in value:
+            node.children.append(_json_node(key, value["query_block"]))
+    for subquery in table.get("attached_subqueries", []):
+        node.children.append(
+            _json_node("attached subquery", subquery["query_block"]))
+    return node
+
+def _json_node(label: str, block: Dict[str, Any]) -> PlanNode:
+    """
+    Build a node (and its children) from a JSON plan object.
+    
+    Args:
+        label (str): The label for the node
+        block (Dict[str, Any]): The plan object (query block, operation)
+        
+    Returns:
+        PlanNode: The node
+    """
+    node = PlanNode(label)
+    cost = block.get("cost_info", {})
+    node.estimated_cost = _number(cost.get("query_cost") 
+                                  or cost.get("sort_cost"))
+    if block.get("using_filesort"):
+        node.flags.append("filesort")
+    if block.get("using_temporary_table"):
+        node.flags.append("temporary")
+    for key, value in block.items():
+        if key == "table":
+            node.children.append(_table_node(value))
+        elif key == "nested_loop":
+            for item in value:
+                node.children.append(_table_node(item["table"]))
+        elif key in ("ordering_operation", "grouping_operation",
+                     "duplicates_removal", "windowing"):
+            node.children.append(
+                _json_node(key.replace("_", " "), value))
+        elif key in ("union_result", "except_result", 
+                     "intersect_result"):
+            child = _json_node(key.replace("_", " "), value)
+            for spec in value.get("query_specifications", []):
+                child.children.append(
+                    _json_node("query block", spec["query_block"]))
+            node.children.append(child)
+        elif key in ("optimized_away_subqueries", "select_list_subqueries",
+                     "having_subqueries", "order_by_subqueries",
+                     "group_by_subqueries"):
+            for subquery in value:
+                node.children.append(_json_node(
+                    key.replace("_", " "), subquery["query_block"]))
+    return node
+
+def parse_explain_json(plan: str) -> PlanNode:
+    """
+    Parse the output of EXPLAIN FORMAT=JSON into a plan tree.
+    
+    Args:
+        plan (str): The JSON plan
+        
+    Returns:
+        PlanNode: The root of the plan tree
+    """
+    return _json_node("query", json.loads(plan)["query_block"])
+
+_ESTIMATE = re.compile(r"\(cost=([\d.e+]+)(?:\.\.([\d.e+]+))? "
+                       r"rows=([\d.e+]+)\)")
+_ACTUAL = re.compile(r"\(actual time=([\d.e+]+)\.\.([\d.e+]+) "
+                     r"rows=([\d.e+]+) loops=(\d+)\)")
+_NEVER_EXECUTED = "(never executed)"
+
+def parse_explain_analyze(plan: str) -> PlanNode:
+    """
+    Parse the output of EXPLAIN ANALYZE (tree format) into a plan tree.
+    Each line is one node, nested by indentation: '-> label (cost=.. 
+    rows=..) (actual time=first..last rows=.. loops=..)'.
+    
+    Args:
+        plan (str): The EXPLAIN ANALYZE output
+        
+    Returns:
+        PlanNode: The root of the plan tree
+    """
+    root = PlanNode("query")
+    # (indent, node) of the current node's ancestors
+    stack: List[Tuple[int, PlanNode]] = [(-1, root)]
+    for line in plan.splitlines():
+        stripped = line.lstrip()
+        if not stripped.startswith("->"):
+            continue
+        indent = len(line) - len(stripped)
+        text = stripped[2:].strip()
+        estimate = _ESTIMATE.search(text)
+        actual = _ACTUAL.search(text)
+        cut = min(match.start() for match in (estimate, actual) if match) \
+            if (estimate or actual) else len(text)
+        label = text[:cut].replace(_NEVER_EXECUTED, "").strip()
+        node = PlanNode(label)
+        if estimate:
+            node.estimated_cost = _number(estimate.group(2) 
+                                          or estimate.group(1))
+            node.estimated_rows = _number(estimate.group(3))
+        if actual:
+            node.loops = int(actual.group(4))
+            node.actual_rows = _number(actual.group(3)) * node.loops
+            node.actual_time = _number(actual.group(2)) * node.loops
+        elif _NEVER_EXECUTED in text:
+            node.actual_rows = 0
+            node.loops = 0
+        table = re.search(r" on (`?[\w$]+`?)", label)
+        if table:
+            node.table = table.group(1).strip("`")
+        if label.startswith("Table scan on"):
+            node.flags.append("full scan")
+        elif label.startswith("Index scan on"):
+            node.flags.append("full index scan")
+        elif label.startswith("Sort"):
+            node.flags.append("filesort")
+        if "temporary" in label:
+            node.flags.append("temporary")
+        while stack[-1][0] >= indent:
+            stack.pop()
+        stack[-1][1].children.append(node)
+        stack.append((indent, node))
+    # A single top-level operation is the query itself
+    if len(root.children) == 1:
+        return root.children[0]
+    return root
+# -----------------------------^ Plan Nodes ^----------------------------- #
+
+# ------------------------------ Profiling ------------------------------ #
+def explain_statement(query: str, analyze: bool) -> str:
+    """
+    Build the EXPLAIN statement for a query.
+    
+    Args:
+        query (str): The query to explain
+        analyze (bool): Use EXPLAIN ANALYZE, which runs the query to 
+            measure it, instead of estimating with EXPLAIN FORMAT=JSON
+        
+    Returns:
+        str: The EXPLAIN statement
+    """
+    query = query.strip().rstrip(";")
+    if analyze:
+        return f"EXPLAIN ANALYZE {query}"
+    return f"EXPLAIN FORMAT=JSON {query}"
+
+def parse_plan(plan: str, analyze: bool) -> PlanNode:
+    """
+    Parse the output of a statement built by explain_statement.
+    
+    Args:
+        plan (str): The EXPLAIN output (first column of the first row)
+        analyze (bool): Whether it is EXPLAIN ANALYZE output
+        
+    Returns:
+        PlanNode: The root of the plan tree
+    """
+    if analyze:
+        return parse_explain_analyze(plan)
+    return parse_explain_json(plan)
+
+def stage_timings(connection: mysql.connector.MySQLConnection) \
+    -> List[Tuple[str, float]]:
+    """
+    Get the stage timings of the last statement completed on the 
+    connection, from performance_schema. Requires the stage instruments
+    and the events_stages_history consumer to be enabled on the server;
+    an empty list is returned if they are not.
+    
+    Args:
+        connection (MySQLConnection): The connection the statement ran on
+        
+    Returns:
+        List[Tuple[str, float]]: (stage name, time in ms), in order
+    """
+    cursor = connection.cursor()
+    try:
+        # The statement running this query is not in the history yet, so
+        # the latest statement in it is the one to profile
+        cursor.execute("""
+            SELECT stages.EVENT_NAME, stages.TIMER_WAIT / 1000000000
+            FROM performance_schema.events_stages_history AS stages
+            JOIN (
+                SELECT statements.THREAD_ID, statements.EVENT_ID
+                FROM performance_schema.events_statements_history
+                    AS statements
+                JOIN performance_schema.threads AS threads
+                    ON threads.THREAD_ID = statements.THREAD_ID
+                WHERE threads.PROCESSLIST_ID = CONNECTION_ID()
+                ORDER BY statements.EVENT_ID DESC
+                LIMIT 1
+            ) AS last_statement
+                ON stages.THREAD_ID = last_statement.THREAD_ID
+                AND stages.NESTING_EVENT_ID = last_statement.EVENT_ID
+            ORDER BY stages.EVENT_ID
+        """)
+        return [(name.replace("stage/sql/", ""), float(ms or 0))
+                for name, ms in cursor.fetchall()]
+    except mysql.connector.Error as err:
+        print(f"Could not read stage timings: {err}")
+        return []
+    finally:
+        cursor.close()
+# -----------------------------^ Profiling ^----------------------------- #
@@ -1,8 +1,9 @@
 import json
 
 class ConnectionManager:
-    def __init__(self):
-        self.saved_connections_file = "src/saved_connections.json"
+    def __init__(self, 
+                 saved_connections_file: str = "src/saved_connections.json"):
+        self.saved_connections_file = saved_connections_file
         self.saved_connections = {}
         self._load_connections()
     
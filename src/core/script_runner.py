@@ -0,0 +1,358 @@
+import re
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+import mysql.connector
+
+import database
+
+# Characters that can start a string, identifier or comment
+_QUOTES = "'\"`"
+
+class Statement:
+    """
+    A single statement of a SQL script.
+    
+    Args:
+        text (str): The statement, without its delimiter
+        compound (bool): Whether the statement was ended by a custom 
+            DELIMITER (e.g. a procedure body containing ';')
+    """
+    __slots__ = ["text", "compound"]
+    
+    def __init__(self, text: str, compound: bool = False) -> None:
+        self.text = text
+        self.compound = compound
+        
+    def standalone(self) -> bool:
+        """
+        Returns whether the statement must be sent in its own round trip:
+        compound statements, and CALLs (which return extra result sets, so
+        results could no longer be matched to statements).
+        """
+        return self.compound or self.text[:4].upper() == "CALL"
+
+class StatementResult:
+    """
+    The result of one statement of a script.
+    
+    Args:
+        index (int): The position of the statement in the script
+        statement (str): The statement text
+        columns (List[str]): Column names, if the statement returned rows
+        rows (List[tuple]): Returned rows, if any
+        rowcount (int): Rows affected or returned (-1 if unknown)
+        error (Optional [mysql.connector.Error]): The error, if it failed
+    """
+    __slots__ = ["index", "statement", "columns", "rows", "rowcount", 
+                 "error"]
+    
+    def __init__(self, index: int, statement: str, columns: List[str],
+                 rows: List[tuple], rowcount: int,
+                 error: Optional[mysql.connector.Error] = None) -> None:
+        self.index = index
+        self.statement = statement
+        self.columns = columns
+        self.rows = rows
+        self.rowcount = rowcount
+        self.error = error
+        
+# ------------------------------ Splitting ------------------------------ #
+def _skip_quoted(script: str, start: int) -> int:
+    """
+    Find the end of a quoted string or identifier.
+    
+    Args:
+        script (str): The script being split
+        start (int): The index of the opening quote
+        
+    Returns:
+        int: The index after the closing quote (or the script's length)
+    """
+    quote = script[start]
+    i = start + 1
+    length = len(script)
+    while i < length:
+        char = script[i]
+        if char == "\\" and quote != "`":
+            i += 2
+        elif char == quote:
+            # A doubled quote is an escaped quote
+            if i + 1 < length and script[i + 1] == quote:
+                i += 2
+            else:
+                return i + 1
+        else:
+            i += 1
+    return length
+
+def split_statements(script: str) -> List[Statement]:
+    """
+    Split a SQL script into statements, as the mysql client does:
+    delimiters inside strings, identifiers and comments are ignored, and
+    DELIMITER lines change the statement delimiter.
+    
+    Args:
+        script (str): The script to split
+        
+    Returns:
+        List[Statement]: The statements, in order (empty ones skipped)
+    """
+    statements: List[Statement] = []
+    delimiter = ";"
+    special = re.compile(r"[\'\"`#/\-]|;")
+    start = 0               # Start of the current statement
+    has_content = False     # Current statement has more than comments
+    i = 0
+    length = len(script)
+    while i < length:
+        if not has_content:
+            # DELIMITER directive, only allowed in place of a statement
+            while i < length and script[i].isspace():
+                i += 1
+            if script[i:i + 10].upper() == "DELIMITER " \
+                    or script[i:i + 10].upper() == "DELIMITER\t":
+                line_end = script.find("\n", i)
+                if line_end == -1:
+                    line_end = length
+                delimiter = script[i + 10:line_end].strip() or ";"
+                special = re.compile(
+                    r"[\'\"`#/\-]|" + re.escape(delimiter))
+                i = start = line_end + 1
+                continue
+        match = special.search(script, i)
+        end = match.start() if match else length
+        if not has_content and script[i:end].strip():
+            has_content = True
+        if match is None:
+            break
+        i = end
+        if script.startswith(delimiter, i):
+            if has_content:
+                statements.append(Statement(
+                    script[start:i].strip(), compound = delimiter != ";"))
+            i = start = i + len(delimiter)
+            has_content = False
+        elif script[i] in _QUOTES:
+            i = _skip_quoted(script, i)
+            has_content = True
+        elif script[i] == "#" or (script.startswith("--", i) and 
+                (i + 2 >= length or script[i + 2].isspace())):
+            line_end = script.find("\n", i)
+            i = length if line_end == -1 else line_end + 1
+        elif script.startswith("/*", i):
+            # Executable comments (/*! */) and hints (/*+ */) are content
+            if script[i + 2:i + 3] in ("!", "+"):
+                has_content = True
+            comment_end = script.find("*/", i + 2)
+            i = length if comment_end == -1 else comment_end + 2
+        else:
+            has_content = True
+            i += 1
+    if has_content:
+        statements.append(Statement(
+            script[start:].strip(), compound = delimiter != ";"))
+    return statements
+# -----------------------------^ Splitting ^----------------------------- #
+
+class ScriptRunner:
+    """
+    Runs a SQL script on a connection with as few round trips and commits
+    as possible: consecutive statements are sent together as one 
+    multi-statement string, and committed in transaction batches.
+    Results are streamed per statement by run().
+    
+    Statements that implicitly commit (DDL) end the current transaction
+    batch early; the rest of that batch then runs in autocommit mode.
+    
+    Args:
+        connection (MySQLConnection): The connection to run the script on
+        script (str): The SQL script
+        statements_per_round_trip (int): Maximum statements sent at once
+        max_round_trip_bytes (int): Maximum size of one round trip, must
+            stay below the server's max_allowed_packet
+        transaction_size (int): Statements per transaction, 0 runs the
+            script in the connection's own (autocommit) mode
+        stop_on_error (bool): Stop at the first failing statement, rolling
+            back its transaction batch. Otherwise log it and continue
+    """
+    __slots__ = ["_connection", "statements", "_statements_per_round_trip",
+                 "_max_round_trip_bytes", "_transaction_size", 
+                 "_stop_on_error", "_stop_requested", "executed", "errors",
+                 "round_trips"]
+    
+    def __init__(self,
+                 connection: mysql.connector.MySQLConnection,
+                 script: str,
+                 statements_per_round_trip: int = 100,
+                 max_round_trip_bytes: int = 1024 * 1024,
+                 transaction_size: int = 1000,
+                 stop_on_error: bool = True) -> None:
+        self._connection = connection
+        self.statements = split_statements(script)
+        self._statements_per_round_trip = max(1, statements_per_round_trip)
+        self._max_round_trip_bytes = max_round_trip_bytes
+        self._transaction_size = transaction_size
+        self._stop_on_error = stop_on_error
+        self._stop_requested = threading.Event()
+        # Progress, readable while running
+        self.executed = 0
+        self.errors = 0
+        self.round_trips = 0
+    
+    def stop(self) -> None:
+        """
+        Stop the script after the current round trip, rolling back the 
+        current transaction batch. Safe to call from any thread.
+        """
+        self._stop_requested.set()
+        
+    def stopped(self) -> bool:
+        """Returns whether stop() was called."""
+        return self._stop_requested.is_set()
+    
+    # ------------------------------ Running ------------------------------ #
+    def run(self) -> Iterator[StatementResult]:
+        """
+        Run the script, yielding each statement's result as its round trip
+        completes.
+        
+        Yields:
+            StatementResult: The result of each executed statement
+        """
+        indexed = list(enumerate(self.statements))
+        size = self._transaction_size or len(indexed) or 1
+        failed = False
+        # With autocommit off, an earlier SELECT on the connection leaves
+        # a transaction open; end it, so start_transaction() can be used
+        # and the script does not read that transaction's old snapshot
+        if self._connection.in_transaction:
+            self._connection.commit()
+        try:
+            for tx_start in range(0, len(indexed), size):
+                if self._transaction_size:
+                    self._connection.start_transaction()
+                for batch in self._round_trips(
+                        indexed[tx_start:tx_start + size]):
+                    while batch and not self.stopped():
+                        results, failed_at = self._execute(batch)
+                        yield from results
+                        if failed_at is None:
+                            break
+                        self.errors += 1
+                        if self._stop_on_error:
+                            failed = True
+                            break
+                        batch = batch[failed_at:]
+                    if failed or self.stopped():
+                        break
+                if self._connection.in_transaction:
+                    if failed or self.stopped():
+                        self._connection.rollback()
+                    else:
+                        self._connection.commit()
+                if failed or self.stopped():
+                    break
+        finally:
+            # Generator closed early, or connection error
+            if self._connection.in_transaction:
+                self._connection.rollback()
+    
+    def _round_trips(self, indexed: List[Tuple[int, Statement]]) \
+        -> Iterator[List[Tuple[int, Statement]]]:
+        """
+        Group statements into round trips, within the statement and byte 
+        limits. Standalone statements get a round trip of their own.
+        
+        Args:
+            indexed (List[Tuple[int, Statement]]): Statements with their
+                index in the script
+        
+        Yields:
+            List[Tuple[int, Statement]]: The statements of one round trip
+        """
+        batch: List[Tuple[int, Statement]] = []
+        batch_bytes = 0
+        for index, statement in indexed:
+            statement_bytes = len(statement.text.encode()) + 2
+            if batch and (statement.standalone()
+                    or len(batch) >= self._statements_per_round_trip
+                    or batch_bytes + statement_bytes > 
+                        self._max_round_trip_bytes):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append((index, statement))
+            batch_bytes += statement_bytes
+            if statement.standalone():
+                yield batch
+                batch = []
+                batch_bytes = 0
+        if batch:
+            yield batch
+    
+    def _execute(self, batch: List[Tuple[int, Statement]]) \
+        -> Tuple[List[StatementResult], Optional[int]]:
+        """
+        Send one round trip and collect a result per statement.
+        The server stops at the first failing statement of a 
+        multi-statement string, the rest of the batch is not executed.
+        Query listeners are notified of each executed statement, timed 
+        from the previous statement's result.
+        
+        Args:
+            batch (List[Tuple[int, Statement]]): The statements to send
+            
+        Returns:
+            Tuple[List[StatementResult], Optional[int]]: The results, and
+                the position in the batch after the failed statement (None
+                if all statements succeeded)
+        """
+        results: List[StatementResult] = []
+        durations: List[float] = []
+        cursor = self._connection.cursor()
+        self.round_trips += 1
+        last = time.perf_counter()
+        try:
+            # Multi-statement strings are executed directly, each result 
+            # set is then reached with nextset(). Delimiters go on their
+            # own line, so a trailing '-- comment' cannot swallow them
+            cursor.execute("\n;\n".join(stmt.text for _, stmt in batch))
+            while True:
+                columns: List[str] = []
+                rows: List[tuple] = []
+                if cursor.description:
+                    columns = [column[0] for column in cursor.description]
+                    rows = cursor.fetchall()
+                if len(results) < len(batch):
+                    index, statement = batch[len(results)]
+                    results.append(StatementResult(
+                        index, statement.text, columns, rows, 
+                        cursor.rowcount))
+                    durations.append(time.perf_counter() - last)
+                    last = time.perf_counter()
+                    self.executed += 1
+                if not cursor.nextset():
+                    break
+            return results, None
+        except mysql.connector.Error as err:
+            index, statement = batch[min(len(results), len(batch) - 1)]
+            results.append(StatementResult(
+                index, statement.text, [], [], -1, err))
+            durations.append(time.perf_counter() - last)
+            self.executed += 1
+            return results, len(results)
+        finally:
+            try:
+                cursor.close()
+                if self._connection.unread_result:
+                    self._connection.consume_results()
+            except mysql.connector.Error:
+                pass
+            # After the round trip, so listeners never wait on the server
+            for result, duration in zip(results, durations):
+                database.notify_query(
+                    self._connection, result.statement, duration,
+                    len(result.rows) if result.columns else result.rowcount,
+                    result.error)
+    # -----------------------------^ Running ^----------------------------- #
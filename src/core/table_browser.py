@@ -0,0 +1,349 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import mysql.connector
+
+from core.data_diff import row_checksum
+
+class ColumnInfo:
+    """
+    A column of a browsed table.
+    
+    Args:
+        name (str): The column name
+        data_type (str): The MySQL data type, e.g. 'int', 'longblob'
+        primary_key (bool): Whether the column is part of the primary key
+    """
+    __slots__ = ["name", "data_type", "primary_key"]
+    
+    def __init__(self, name: str, data_type: str, primary_key: bool) -> None:
+        self.name = name
+        self.data_type = data_type.lower()
+        self.primary_key = primary_key
+        
+    def is_large(self) -> bool:
+        """
+        Returns whether values of the column may be large, so only a 
+        preview of them is fetched when browsing.
+        """
+        return self.data_type in TableBrowser.LARGE_TYPES
+    
+    def is_binary(self) -> bool:
+        """Returns whether the column holds bytes rather than text."""
+        return self.data_type.endswith("blob") or \
+            self.data_type in ("binary", "varbinary", "geometry")
+
+class LargeValue:
+    """
+    The preview of a large value, as fetched when browsing.
+    
+    Args:
+        preview (Any): The first characters (or bytes) of the value
+        length (int): The full length of the value, in characters (or 
+            bytes, for binary values)
+    """
+    __slots__ = ["preview", "length"]
+    
+    def __init__(self, preview: Any, length: int) -> None:
+        self.preview = preview
+        self.length = length
+        
+    def __str__(self) -> str:
+        if isinstance(self.preview, (bytes, bytearray)):
+            preview = self.preview[:32].hex()
+            size = _size(self.length)
+        else:
+            preview = " ".join(str(self.preview).split())
+            size = f"{self.length:,} characters"
+        if self.length <= len(self.preview):
+            return preview
+        return f"{preview}... [{size}]"
+
+def _size(length: int) -> str:
+    """Format a length in bytes for display."""
+    for unit in ("B", "KB", "MB"):
+        if length < 1024:
+            return f"{length:g} {unit}"
+        length = round(length / 1024, 1)
+    return f"{length:g} GB"
+
+class TableBrowser:
+    """
+    Pages through a table, fetching only previews of large (BLOB, TEXT,
+    JSON, ...) values: LEFT(col, n) and their length instead of the full
+    value. Full values are then loaded on demand by primary key, streamed
+    in chunks (SUBSTRING) into a viewer or a file.
+    Pages are read by primary key (keyset pagination), so later pages are
+    as cheap as the first. The checksum of each row read is kept, so 
+    edits can detect rows changed by others since (see EditBuffer).
+    
+    Args:
+        connection (MySQLConnection): The connection to browse with
+        schema (str): The schema of the table
+        table (str): The table to browse
+        page_size (int): Rows per page
+        preview_length (int): Characters (or bytes) previewed per value
+    """
+    __slots__ = ["_connection", "_schema", "_table", "_page_size", 
+                 "_preview_length", "columns", "checksums", "_last_key",
+                 "_offset"]
+    
+    LARGE_TYPES = ("tinyblob", "blob", "mediumblob", "longblob", "text", 
+                   "mediumtext", "longtext", "json", "geometry")
+    
+    def __init__(self, connection: mysql.connector.MySQLConnection,
+                 schema: str, table: str, page_size: int = 200,
+                 preview_length: int = 256) -> None:
+        self._connection = connection
+        self._schema = schema
+        self._table = table
+        self._page_size = page_size
+        self._preview_length = preview_length
+        self.columns: List[ColumnInfo] = []
+        # Key: primary key of a row read, Value: its checksum when read
+        self.checksums: Dict[Tuple, int] = {}
+        # Position of the next page: last key read, or the row offset if 
+        # the table has no primary key
+        self._last_key: Optional[Tuple] = None
+        self._offset = 0
+        
+    @property
+    def table(self) -> str:
+        """Returns the name of the browsed table."""
+        return self._table
+    
+    # ------------------------------ Metadata ------------------------------ #
+    def load_columns(self) -> List[ColumnInfo]:
+        """
+        Read the table's columns.
+        
+        Returns:
+            List[ColumnInfo]: The columns, in table order
+        """
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(
+                "SELECT COLUMN_NAME, DATA_TYPE, COLUMN_KEY = 'PRI'"
+                " FROM information_schema.COLUMNS"
+                " WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s"
+                " ORDER BY ORDINAL_POSITION", (self._schema, self._table))
+            self.columns = [ColumnInfo(name, data_type, bool(primary_key))
+                            for name, data_type, primary_key 
+                            in cursor.fetchall()]
+        finally:
+            cursor.close()
+        return self.columns
+    
+    def key_columns(self) -> List[ColumnInfo]:
+        """Returns the primary key columns."""
+        return [column for column in self.columns if column.primary_key]
+    
+    def qualified_table(self) -> str:
+        """Returns the quoted schema.table name."""
+        return f"`{self._schema}`.`{self._table}`"
+    
+    def key_condition(self, operator: str) -> str:
+        """
+        Returns a condition comparing the primary key to placeholders.
+        
+        Args:
+            operator (str): The comparison, e.g. '=' or '>'
+        """
+        keys = self.key_columns()
+        columns = ", ".join(f"`{column.name}`" for column in keys)
+        placeholders = ", ".join(["%s"] * len(keys))
+        return f"({columns}) {operator} ({placeholders})"
+    
+    def checksum(self) -> str:
+        """
+        Returns the SQL expression of a row's checksum, kept per row read
+        (see checksums). Large columns only contribute the prefix and 
+        length already read for their preview, so pages stay cheap.
+        """
+        return row_checksum(
+            [column.name for column in self.columns],
+            [column.name for column in self.columns if column.is_large()],
+            self._preview_length)
+    # -----------------------------^ Metadata ^----------------------------- #
+    
+    # ------------------------------ Browsing ------------------------------ #
+    def _select_list(self) -> str:
+        """
+        Returns the select list of a page: large columns as a preview and
+        their length, primary key columns always in full, and the row's 
+        checksum last if the table has a primary key.
+        """
+        items = []
+        for column in self.columns:
+            name = f"`{column.name}`"
+            if column.is_large() and not column.primary_key:
+                items.append(f"LEFT({name}, {self._preview_length})")
+                # LEFT counts characters, so must the length of text
+                items.append(f"LENGTH({name})" if column.is_binary()
+                             else f"CHAR_LENGTH({name})")
+            else:
+                items.append(name)
+        if self.key_columns():
+            items.append(self.checksum())
+        return ", ".join(items)
+    
+    def copy(self, connection: mysql.connector.MySQLConnection) \
+            -> "TableBrowser":
+        """
+        Copy the browser, at the same position, to read further pages on
+        another connection (e.g. one prefetched on a side connection).
+        
+        Args:
+            connection (MySQLConnection): The connection of the copy
+            
+        Returns:
+            TableBrowser: The copy
+        """
+        browser = TableBrowser(connection, self._schema, self._table,
+                               self._page_size, self._preview_length)
+        browser.columns = list(self.columns)
+        browser.checksums = dict(self.checksums)
+        browser._last_key = self._last_key
+        browser._offset = self._offset
+        return browser
+        
+    def restart(self) -> None:
+        """
+        Start browsing again from the first page.
+        """
+        self._last_key = None
+        self._offset = 0
+        self.checksums.clear()
+        
+    def next_page(self) -> List[List[Any]]:
+        """
+        Fetch the next page of rows.
+        
+        Returns:
+            List[List[Any]]: The rows, one value per column; large values 
+                are LargeValue previews. Empty when there are no more rows
+        """
+        if not self.columns:
+            self.load_columns()
+        keys = self.key_columns()
+        sql = f"SELECT {self._select_list()} FROM {self.qualified_table()}"
+        params: List[Any] = []
+        if keys:
+            if self._last_key is not None:
+                sql += f" WHERE {self.key_condition('>')}"
+                params += list(self._last_key)
+            sql += " ORDER BY " + ", ".join(f"`{column.name}`" 
+                                             for column in keys)
+            sql += f" LIMIT {int(self._page_size)}"
+        else:
+            sql += f" LIMIT {int(self._page_size)} OFFSET {self._offset}"
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            raw_rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        rows = []
+        for raw in raw_rows:
+            row, position = [], 0
+            for column in self.columns:
+                if column.is_large() and not column.primary_key:
+                    preview, length = raw[position], raw[position + 1]
+                    row.append(None if length is None 
+                               else LargeValue(preview, int(length)))
+                    position += 2
+                else:
+                    row.append(raw[position])
+                    position += 1
+            if keys:
+                self.checksums[self.row_key(row)] = raw[position]
+            rows.append(row)
+        self._offset += len(rows)
+        if rows and keys:
+            self._last_key = self.row_key(rows[-1])
+        return rows
+    
+    def row_key(self, row: List[Any]) -> Tuple:
+        """
+        Get the primary key of a fetched row.
+        
+        Args:
+            row (List[Any]): A row returned by next_page
+            
+        Returns:
+            Tuple: The row's primary key values
+        """
+        return tuple(value for column, value in zip(self.columns, row)
+                     if column.primary_key)
+    # -----------------------------^ Browsing ^----------------------------- #
+    
+    # ---------------------------- Full Values ---------------------------- #
+    def stream_value(self, key: Tuple, column: ColumnInfo,
+                     write: Callable[[Any], None],
+                     chunk_size: int = 1024 * 1024,
+                     should_stop: Callable[[], bool] = lambda: False) -> int:
+        """
+        Stream the full value of a cell in chunks, by primary key, so 
+        values of any size are never held in memory at once.
+        
+        Args:
+            key (Tuple): The row's primary key values
+            column (ColumnInfo): The column of the value
+            write (Callable): Called with each chunk (bytes or str)
+            chunk_size (int): Characters (or bytes) fetched per query
+            should_stop (Callable): Polled between chunks to abandon the 
+                stream
+            
+        Returns:
+            int: The number of characters (or bytes) streamed
+        """
+        if not self.key_columns():
+            raise ValueError(f"Table {self._table} has no primary key, "
+                             "values cannot be loaded by row")
+        name = f"`{column.name}`"
+        if column.data_type == "json":
+            name = f"CAST({name} AS CHAR)"
+        sql = f"SELECT SUBSTRING({name}, %s, {int(chunk_size)})" \
+            f" FROM {self.qualified_table()}" \
+            f" WHERE {self.key_condition('=')}"
+        position = 1
+        cursor = self._connection.cursor()
+        try:
+            while not should_stop():
+                cursor.execute(sql, [position] + list(key))
+                rows = cursor.fetchall()
+                chunk = rows[0][0] if rows else None
+                if not chunk:
+                    break
+                write(chunk)
+                position += len(chunk)
+                if len(chunk) < chunk_size:
+                    break
+        finally:
+            cursor.close()
+        return position - 1
+    
+    def save_value(self, key: Tuple, column: ColumnInfo, path: str,
+                   should_stop: Callable[[], bool] = lambda: False) -> int:
+        """
+        Stream the full value of a cell into a file.
+        
+        Args:
+            key (Tuple): The row's primary key values
+            column (ColumnInfo): The column of the value
+            path (str): The file to write
+            should_stop (Callable): Polled between chunks to abandon it
+            
+        Returns:
+            int: The number of characters (or bytes) written
+        """
+        if column.is_binary():
+            with open(path, "wb") as file:
+                return self.stream_value(key, column, file.write,
+                                         should_stop = should_stop)
+        with open(path, "w", encoding="utf-8") as file:
+            return self.stream_value(
+                key, column, 
+                lambda chunk: file.write(
+                    chunk.decode("utf-8", errors="replace")
+                    if isinstance(chunk, (bytes, bytearray)) else chunk),
+                should_stop = should_stop)
+    # ---------------------------^ Full Values ^--------------------------- #
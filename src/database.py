@@ -1,8 +1,12 @@
 import mysql.connector
 from mysql.connector import Error
 import os
+import time
 from dotenv import load_dotenv
 
+# Callables notified after every query, see add_query_listener
+_query_listeners = []
+
 # ------------------- Database Functions ------------------- # 
 
 def create_connection():
@@ -22,29 +26,223 @@ def create_connection():
     return connection
 
 def execute_query(connection, query):
+    cursor = connection.cursor()
+    started = time.perf_counter()
+    error = None
     try:
-        connection.cursor().execute(query)
+        cursor.execute(query)
         connection.commit()
         print("Query executed successfully")
     except Error as e:
+        error = e
         print(f"Error: '{e}'")
     finally:
-        connection.cursor().close()
+        rows = cursor.rowcount
+        cursor.close()
+        notify_query(connection, query, time.perf_counter() - started,
+                     rows, error)
         
 def read_query(connection, query):
     cursor = connection.cursor()
     result = None
+    started = time.perf_counter()
+    error = None
     try:
         cursor.execute(query)
         result = cursor.fetchall()
     except Error as e:
+        error = e
         print(f"Error: '{e}'")
     finally:
         cursor.close()
+        notify_query(connection, query, time.perf_counter() - started,
+                     len(result) if result is not None else 0, error)
         return result
 
+def stream_query(connection, query, fetch_size=1000):
+    """
+    Run a query and stream its rows in batches through an unbuffered 
+    cursor, so results of any size are never held in memory at once.
+    An empty result set yields its column names with no rows, once.
+    Statements without a result set are committed and yield nothing.
+    Unlike read_query, errors are raised (after notifying listeners).
+    
+    Args:
+        connection (MySQLConnection): The connection to run the query on
+        query (str): The query to run
+        fetch_size (int): Rows fetched per batch
+    
+    Yields:
+        Tuple[List[str], List[tuple]]: The column names and a batch of rows
+    """
+    cursor = connection.cursor()
+    started = time.perf_counter()
+    error = None
+    rows = 0
+    try:
+        cursor.execute(query)
+        if cursor.description:
+            columns = [column[0] for column in cursor.description]
+            while True:
+                batch = cursor.fetchmany(fetch_size)
+                if not batch:
+                    if not rows:
+                        # The columns are still needed, e.g. CSV headers
+                        yield columns, batch
+                    break
+                rows += len(batch)
+                yield columns, batch
+        else:
+            connection.commit()
+            rows = cursor.rowcount
+    except Error as e:
+        error = e
+        raise
+    finally:
+        try:
+            cursor.close()
+        except Error:
+            # Stream abandoned with rows unread
+            connection.consume_results()
+        notify_query(connection, query, time.perf_counter() - started,
+                     rows, error)
+
 # ------------------^ Database Functions ^------------------ #
 
+# -------------------- Query Listeners --------------------- #
+
+def add_query_listener(listener):
+    """
+    Register a callable to be notified after every query run through this
+    module (and other runners that call notify_query). Listeners run on
+    the querying thread, so they must be cheap and must not raise.
+    
+    Args:
+        listener (Callable): Called as listener(connection, query, 
+            duration, rows, error)
+    """
+    if listener not in _query_listeners:
+        _query_listeners.append(listener)
+
+def remove_query_listener(listener):
+    """
+    Unregister a callable added with add_query_listener.
+    
+    Args:
+        listener (Callable): The listener to remove
+    """
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+def notify_query(connection, query, duration, rows, error=None):
+    """
+    Notify all query listeners of a finished query.
+    
+    Args:
+        connection (MySQLConnection): The connection the query ran on
+        query (str): The query text
+        duration (float): The time taken, in seconds
+        rows (int): Rows returned or affected (-1 if unknown)
+        error (Optional [Error]): The error, if the query failed
+    """
+    for listener in list(_query_listeners):
+        try:
+            listener(connection, query, duration, rows, error)
+        except Exception as e:
+            print(f"Query listener error: '{e}'")
+
+def connection_name(connection):
+    """
+    Get the name (user@host) of a connection, as used by AppState.
+    
+    Args:
+        connection (MySQLConnection): The connection to name
+    
+    Returns:
+        str: The connection name
+    """
+    return f"{connection.user}@{connection.server_host}"
+
+# -------------------^ Query Listeners ^-------------------- #
+
+# ---------------------- Cancellation ---------------------- #
+
+def get_connection_id(connection):
+    """
+    Get the server-side id (PROCESSLIST_ID) of a connection.
+    
+    Args:
+        connection (MySQLConnection): The connection to identify
+    
+    Returns:
+        int: The connection id, as used by KILL QUERY
+    """
+    return connection.connection_id
+
+def kill_query(side_connection, connection_id):
+    """
+    Abort the statement currently running on another connection.
+    Must be sent over a separate (side) connection, as the target
+    connection is blocked by the statement being killed.
+    
+    Args:
+        side_connection (MySQLConnection): The connection to send KILL on
+        connection_id (int): The id of the connection running the query
+    """
+    cursor = side_connection.cursor()
+    try:
+        cursor.execute(f"KILL QUERY {int(connection_id)}")
+    except Error as e:
+        # Unknown thread id: the query (or connection) already finished
+        print(f"Error: '{e}'")
+    finally:
+        cursor.close()
+
+def with_max_execution_time(query, milliseconds):
+    """
+    Add a MAX_EXECUTION_TIME optimizer hint to a SELECT statement, so 
+    the server aborts it after the given time. An existing hint block is
+    extended, as the server only reads the first one. Other statements 
+    are returned unchanged, as the server only honours the hint on SELECT.
+    
+    Args:
+        query (str): The query to add the hint to
+        milliseconds (int): The server-side time limit in milliseconds
+    
+    Returns:
+        str: The query with the hint added
+    """
+    stripped = query.lstrip()
+    if not milliseconds or stripped[:6].upper() != "SELECT":
+        return query
+    hint = f"MAX_EXECUTION_TIME({int(milliseconds)})"
+    rest = stripped[6:].lstrip()
+    end = rest.find("*/")
+    if rest.startswith("/*+") and end != -1:
+        return f"SELECT /*+ {rest[3:end].strip()} {hint} */{rest[end + 2:]}"
+    return f"SELECT /*+ {hint} */ {rest}"
+
+def reset_connection_state(connection):
+    """
+    Return a connection to a clean, reusable state after a cancelled or
+    failed query: discard unread results and roll back any open
+    transaction. Session state (selected database, variables) is kept.
+    
+    Args:
+        connection (MySQLConnection): The connection to clean up
+    """
+    try:
+        if connection.unread_result:
+            connection.consume_results()
+        if connection.in_transaction:
+            connection.rollback()
+    except Error as e:
+        print(f"Error: '{e}'")
+        # Connection is unusable, reconnect with its original settings
+        connection.reconnect(attempts=1)
+
+# ---------------------^ Cancellation ^--------------------- #
+
 # --------------------- Common Queries --------------------- #
 
 def show_databases(connection):
@@ -0,0 +1,105 @@
+import os
+import time
+from dotenv import load_dotenv
+from mysql.connector import Error
+import mysql.connector.aio
+
+import database
+
+# Async versions of the database.py functions, using mysql.connector.aio.
+# They must be awaited on the AsyncBackend loop (core.async_backend).
+
+# ------------------- Database Functions ------------------- # 
+
+async def create_connection(host=None, user=None, password=None):
+    """
+    Open an asyncio connection. Credentials default to the DB_HOST, 
+    DB_USER and DB_PASSWORD environment variables, as in database.py.
+    
+    Args:
+        host (Optional [str]): The host to connect to
+        user (Optional [str]): The user to connect as
+        password (Optional [str]): The password to connect with
+    
+    Returns:
+        MySQLConnectionAbstract: The connection, or None if it failed
+    """
+    load_dotenv()
+    connection = None
+    
+    try:
+        connection = await mysql.connector.aio.connect(
+            host=host or os.getenv('DB_HOST'),
+            user=user or os.getenv('DB_USER'),
+            # An empty password is a valid password
+            password=password if password is not None 
+                else os.getenv('DB_PASSWORD')
+        )
+    except Error as e:
+        print(f"Error: '{e}'")
+    
+    return connection
+
+async def execute_query(connection, query):
+    cursor = await connection.cursor()
+    started = time.perf_counter()
+    error = None
+    try:
+        await cursor.execute(query)
+        await connection.commit()
+    except Error as e:
+        error = e
+        print(f"Error: '{e}'")
+    finally:
+        rows = cursor.rowcount
+        await cursor.close()
+        database.notify_query(connection, query, 
+                              time.perf_counter() - started, rows, error)
+        
+async def read_query(connection, query, notify=True):
+    # notify=False keeps internal polling (e.g. the status monitor) out of
+    # the query listeners: history, aggregates and the index advisor
+    cursor = await connection.cursor()
+    result = None
+    started = time.perf_counter()
+    error = None
+    try:
+        await cursor.execute(query)
+        result = await cursor.fetchall()
+    except Error as e:
+        error = e
+        print(f"Error: '{e}'")
+    finally:
+        await cursor.close()
+        if notify:
+            database.notify_query(connection, query, 
+                                  time.perf_counter() - started,
+                                  len(result) if result is not None else 0,
+                                  error)
+    return result
+
+# ------------------^ Database Functions ^------------------ #
+
+# --------------------- Common Queries --------------------- #
+
+async def show_databases(connection):
+    query = "SHOW DATABASES"
+    return await read_query(connection, query)
+
+async def show_tables(connection):
+    query = "SHOW TABLES"
+    return await read_query(connection, query)
+
+async def use_database(connection, database_name):
+    query = f"USE {database_name}"
+    await execute_query(connection, query)
+    
+# --------------------^ Common Queries ^-------------------- #
+
+# ---------------------- Specialized ----------------------- #
+
+async def list_databases(connection):
+    databases = await show_databases(connection)
+    return [db[0] for db in databases]
+
+# ---------------------^ Specialized ^---------------------- #
@@ -0,0 +1,738 @@
+import argparse
+import contextlib
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import mysql.connector
+
+import core.event_system as event_sys
+import ui.ui_components as ui_cmp
+from core.app_state import AppState
+from core.autocomplete import CompletionEngine
+from core.edit_buffer import EditBuffer
+from core.query_handle import QueryHandle
+from core.query_history import QueryHistory
+from core.script_runner import ScriptRunner, split_statements
+from core.table_browser import TableBrowser
+import database
+
+# Memory and latency regression harness. Runs scripted sessions against a
+# fake connector (no server needed) and fails when memory stays up after
+# a session, or when an operation gets slower than its threshold.
+#   python src/perf_harness.py
+#   python src/perf_harness.py -n 50 --only large_results connections
+# Window scenarios need a display, they are skipped without one.
+
+# Exit codes
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+
+# Rows returned by the fake server for a SELECT
+LARGE_RESULT_ROWS = 100000
+# Bytes a scenario may leave allocated after all its iterations
+MAX_MEMORY_GROWTH = 512 * 1024
+# Peak bytes allocated while streaming a large result
+MAX_STREAM_PEAK = 4 * 1024 * 1024
+# Seconds allowed per operation (worst of all iterations), scaled by
+# --latency-scale for slower machines
+LATENCY_THRESHOLDS = {
+    "read_query": 1.0,
+    "stream_query": 1.0,
+    "query_handle": 1.5,
+    "history_record": 0.05,
+    "history_search": 0.25,
+    "history_aggregates": 0.5,
+    "connect": 0.1,
+    "disconnect": 0.1,
+    "split_statements": 0.5,
+    "script_run": 1.0,
+    "save_edits": 0.05,
+    "completion_load": 2.0,
+    "completion": 0.005,
+    "open_window": 0.5,
+    "close_window": 0.5,
+}
+
+# ----------------------------- Fake Connector ---------------------------- #
+class FakeCursor:
+    """
+    Cursor of a FakeConnection. SELECT statements return the rows of the
+    connection's responder; multi-statement strings (joined with ';'
+    lines) return one result per statement, reached with nextset().
+    
+    Args:
+        connection (FakeConnection): The connection of the cursor
+    """
+    def __init__(self, connection: "FakeConnection") -> None:
+        self._connection = connection
+        self._results: List[Tuple[List[str], List[tuple]]] = []
+        self._rows: List[tuple] = []
+        self._position = 0
+        self.description = None
+        self.rowcount = -1
+    
+    def execute(self, operation: str, params: Any = None) -> None:
+        """Run a statement, or several joined with ';' lines."""
+        self._connection.queries += 1
+        self._results = []
+        for statement in operation.split("\n;\n"):
+            self._connection.track_transaction(statement.strip())
+            self._results.append(self._connection.respond(statement.strip()))
+        self._next()
+    
+    def _next(self) -> bool:
+        """Move to the next result, returns False if there is none."""
+        if not self._results:
+            self.description = None
+            self._rows = []
+            return False
+        columns, self._rows = self._results.pop(0)
+        self._position = 0
+        self.description = [(column,) for column in columns] or None
+        self.rowcount = len(self._rows)
+        return True
+    
+    @property
+    def with_rows(self) -> bool:
+        """Returns whether the current result has rows."""
+        return self.description is not None
+    
+    @property
+    def column_names(self) -> List[str]:
+        """Returns the column names of the current result."""
+        return [column[0] for column in self.description or []]
+    
+    def fetchall(self) -> List[tuple]:
+        """Returns the remaining rows of the current result."""
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+    
+    def fetchmany(self, size: int = 1) -> List[tuple]:
+        """Returns up to size of the remaining rows."""
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+    
+    def fetchone(self) -> Optional[tuple]:
+        """Returns the next row, or None."""
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+    
+    def nextset(self) -> bool:
+        """Move to the next result, returns False if there is none."""
+        return self._next()
+    
+    def close(self) -> None:
+        """Drop the unread results."""
+        self._results = []
+        self._rows = []
+        self.description = None
+
+class FakeConnection:
+    """
+    Stand-in for a MySQLConnection, answering queries from memory.
+    As with the real driver, autocommit is off by default: any statement
+    but SET, USE and SHOW opens a transaction, and start_transaction() 
+    fails while one is open.
+    
+    Args:
+        responder (Callable): Returns (column names, rows) for a statement
+        user (str): The user name reported
+        host (str): The host name reported
+    """
+    _next_id = 0
+    
+    def __init__(self,
+                 responder: Callable[[str], Tuple[List[str], List[tuple]]],
+                 user: str = "harness", host: str = "fake") -> None:
+        FakeConnection._next_id += 1
+        self.connection_id = FakeConnection._next_id
+        self.respond = responder
+        self.user = user
+        self.server_host = host
+        self.autocommit = False
+        self.in_transaction = False
+        self.unread_result = False
+        self.queries = 0
+        self.closed = False
+    
+    def cursor(self, *args, **kwargs) -> FakeCursor:
+        """Returns a new cursor."""
+        return FakeCursor(self)
+    
+    def track_transaction(self, statement: str) -> None:
+        """Open or end the (fake) transaction as a statement would."""
+        words = statement.split(None, 1)
+        keyword = words[0].upper() if words else ""
+        if keyword in ("COMMIT", "ROLLBACK"):
+            self.in_transaction = False
+        elif keyword in ("START", "BEGIN") or (
+                not self.autocommit and 
+                keyword not in ("", "SET", "USE", "SHOW")):
+            self.in_transaction = True
+    
+    def start_transaction(self) -> None:
+        """Begin a (fake) transaction."""
+        if self.in_transaction:
+            raise mysql.connector.ProgrammingError(
+                "Transaction already in progress")
+        self.in_transaction = True
+    
+    def commit(self) -> None:
+        """End the (fake) transaction."""
+        self.in_transaction = False
+    
+    def rollback(self) -> None:
+        """End the (fake) transaction."""
+        self.in_transaction = False
+    
+    def consume_results(self) -> None:
+        """Drop unread results."""
+        self.unread_result = False
+    
+    def is_connected(self) -> bool:
+        """Returns whether the connection is open."""
+        return not self.closed
+    
+    def close(self) -> None:
+        """Close the connection."""
+        self.closed = True
+
+class FakeServer:
+    """
+    Generates the results of the fake connections: large SELECT results,
+    and schema metadata for information_schema queries.
+    
+    Args:
+        rows (int): Rows returned by a SELECT
+        tables (int): Tables in the fake schema
+        columns_per_table (int): Columns of each fake table
+    """
+    def __init__(self, rows: int = LARGE_RESULT_ROWS, tables: int = 1000,
+                 columns_per_table: int = 50) -> None:
+        self.rows = rows
+        self.tables = tables
+        self.columns_per_table = columns_per_table
+        self.open_connections: List[FakeConnection] = []
+    
+    def respond(self, statement: str) -> Tuple[List[str], List[tuple]]:
+        """
+        Answer a statement.
+        
+        Args:
+            statement (str): The statement
+        
+        Returns:
+            Tuple[List[str], List[tuple]]: The column names and rows,
+                empty for statements without a result set
+        """
+        upper = statement.upper()
+        if "INFORMATION_SCHEMA.SCHEMATA" in upper:
+            return ["SCHEMA_NAME"], [("shop",), ("mysql",)]
+        if "INFORMATION_SCHEMA.TABLES" in upper:
+            return ["TABLE_SCHEMA", "TABLE_NAME"], \
+                [("shop", f"table_{idx}") for idx in range(self.tables)]
+        if "INFORMATION_SCHEMA.COLUMNS" in upper:
+            return ["TABLE_SCHEMA", "TABLE_NAME", "COLUMN_NAME"], \
+                [("shop", f"table_{idx}", f"column_{idx}_{col}")
+                 for idx in range(self.tables)
+                 for col in range(self.columns_per_table)]
+        if upper.startswith(("SELECT", "SHOW")):
+            return ["id", "name", "amount"], \
+                [(idx, f"name {idx}", idx * 1.5) for idx in range(self.rows)]
+        return [], []
+    
+    def connect(self, *args, **kwargs) -> FakeConnection:
+        """
+        Open a fake connection, replaces mysql.connector.connect.
+        
+        Returns:
+            FakeConnection: The connection
+        """
+        connection = FakeConnection(self.respond, kwargs.get("user",
+                                                             "harness"),
+                                    kwargs.get("host", "fake"))
+        self.open_connections = [conn for conn in self.open_connections
+                                 if not conn.closed] + [connection]
+        return connection
+
+@contextlib.contextmanager
+def fake_connector(server: FakeServer):
+    """
+    Route mysql.connector.connect to the fake server.
+    
+    Args:
+        server (FakeServer): The server to connect to
+    """
+    connect = mysql.connector.connect
+    mysql.connector.connect = server.connect
+    try:
+        yield server
+    finally:
+        mysql.connector.connect = connect
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silence the modules' progress prints while measuring.
+    """
+    with open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        yield
+# ----------------------------^ Fake Connector ^--------------------------- #
+
+# -------------------------------- Harness -------------------------------- #
+class Harness:
+    """
+    Runs scenarios and collects their timings and failures.
+    
+    Args:
+        iterations (int): Times each scenario is repeated after warm up
+        latency_scale (float): Multiplier of the latency thresholds
+        verbose (bool): Print every timing
+    """
+    def __init__(self, iterations: int, latency_scale: float,
+                 verbose: bool) -> None:
+        self.iterations = iterations
+        self.latency_scale = latency_scale
+        self.verbose = verbose
+        # Key: operation name, Value: seconds of each run
+        self.timings: Dict[str, List[float]] = {}
+        self.failures: List[str] = []
+    
+    @contextlib.contextmanager
+    def timed(self, operation: str):
+        """
+        Time an operation, see LATENCY_THRESHOLDS.
+        
+        Args:
+            operation (str): The operation's name
+        """
+        started = time.perf_counter()
+        yield
+        self.timings.setdefault(operation, []).append(
+            time.perf_counter() - started)
+    
+    def check(self, condition: bool, message: str) -> None:
+        """
+        Record a failure if a condition does not hold.
+        
+        Args:
+            condition (bool): The condition
+            message (str): The failure's description
+        """
+        if not condition:
+            self.failures.append(message)
+    
+    def run(self, name: str, scenario: Callable[["Harness"], None]) -> None:
+        """
+        Run a scenario once to warm up (imports, caches), then repeatedly
+        to time it, then repeatedly while tracing allocations (which slows
+        everything down, so it is not timed) to check that memory did not
+        grow. When it did, the allocations and the types of live objects
+        that grew most are reported with the failure.
+        
+        Args:
+            name (str): The scenario's name
+            scenario (Callable): Runs one session, given the harness
+        """
+        print(f"{name}: ", end="", flush=True)
+        failures = len(self.failures)
+        with quiet():
+            scenario(self)
+            self.timings.clear()
+            for _ in range(self.iterations):
+                scenario(self)
+        timings = self.timings
+        self.timings = {}
+        gc.collect()
+        objects = Counter(type(obj).__name__ for obj in gc.get_objects())
+        tracemalloc.start(10)
+        baseline = tracemalloc.take_snapshot()
+        before = tracemalloc.get_traced_memory()[0]
+        with quiet():
+            for _ in range(self.iterations):
+                scenario(self)
+        self.timings = timings
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        growth = after - before
+        if growth > MAX_MEMORY_GROWTH:
+            grown = Counter(type(obj).__name__ for obj in gc.get_objects())
+            grown.subtract(objects)
+            self.failures.append(
+                f"{name}: memory grew by {growth / 1024:.0f} KB over "
+                f"{self.iterations} iterations")
+            for stat in snapshot.compare_to(baseline, "traceback")[:3]:
+                self.failures.append(f"    {stat}")
+            self.failures.append("    most grown types: " + ", ".join(
+                f"{type_name} +{count}"
+                for type_name, count in grown.most_common(5)))
+        self._check_latency(name)
+        status = "ok" if len(self.failures) == failures else "FAILED"
+        print(f"{status} (memory {growth / 1024:+.0f} KB)")
+    
+    def _check_latency(self, name: str) -> None:
+        """
+        Compare the scenario's timings to their thresholds.
+        
+        Args:
+            name (str): The scenario's name
+        """
+        for operation, timings in self.timings.items():
+            threshold = LATENCY_THRESHOLDS[operation] * self.latency_scale
+            worst = max(timings)
+            if self.verbose:
+                print(f"\n    {operation}: median "
+                      f"{statistics.median(timings) * 1000:.2f} ms, worst "
+                      f"{worst * 1000:.2f} ms", end="")
+            self.check(worst <= threshold,
+                       f"{name}: {operation} took {worst * 1000:.1f} ms, "
+                       f"threshold {threshold * 1000:.1f} ms")
+        if self.verbose:
+            print("\n    ", end="")
+        self.timings.clear()
+# -------------------------------^ Harness ^------------------------------- #
+
+# ------------------------------- Scenarios ------------------------------- #
+def large_results(harness: Harness) -> None:
+    """
+    Run large queries and discard their results.
+    """
+    server = FakeServer()
+    connection = server.connect()
+    with harness.timed("read_query"):
+        rows = database.read_query(connection, "SELECT * FROM orders")
+    harness.check(len(rows) == server.rows, "read_query lost rows")
+    del rows
+    handle = QueryHandle(connection, "SELECT * FROM orders", server.connect)
+    with harness.timed("query_handle"):
+        handle.start().wait()
+    harness.check(len(handle.rows) == server.rows, "QueryHandle lost rows")
+    del handle
+
+def stream_query(harness: Harness) -> None:
+    """
+    Stream a large result, which must never be held in memory at once.
+    """
+    # Result rows are generated by the fake server up front, so only the
+    # consumer's own allocations are traced
+    server = FakeServer()
+    result = server.respond("SELECT")
+    connection = FakeConnection(lambda statement: result)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = tracemalloc.get_traced_memory()[0]
+    count = 0
+    with harness.timed("stream_query"):
+        for _, batch in database.stream_query(connection,
+                                              "SELECT * FROM orders"):
+            count += len(batch)
+    harness.check(count == server.rows, "stream_query lost rows")
+    # Only measured in the memory phase, see Harness.run
+    if tracing:
+        peak = tracemalloc.get_traced_memory()[1] - start
+        harness.check(peak <= MAX_STREAM_PEAK,
+                      f"stream_query peaked at {peak / 1024:.0f} KB")
+
+def query_history(harness: Harness) -> None:
+    """
+    Record queries into the history and query it.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        history = QueryHistory(os.path.join(directory, "history.db"))
+        try:
+            for idx in range(2000):
+                with harness.timed("history_record"):
+                    history.record("harness@fake",
+                                   f"SELECT * FROM orders WHERE id = {idx}",
+                                   0.001 * (idx % 50), 1, None)
+            history.flush()
+            with harness.timed("history_search"):
+                history.search("orders", limit = 100)
+            with harness.timed("history_aggregates"):
+                history.aggregates()
+        finally:
+            history.close()
+
+def connections(harness: Harness) -> None:
+    """
+    Connect and disconnect through AppState, which must release the
+    connections, their completion engines and query listeners.
+    """
+    server = FakeServer(rows = 10, tables = 100, columns_per_table = 10)
+    ui_components = ui_cmp.UIComponents.get_instance()
+    listeners = len(database._query_listeners)
+    threads = threading.active_count()
+    with tempfile.TemporaryDirectory() as directory, \
+            fake_connector(server):
+        history = QueryHistory(os.path.join(directory, "history.db"))
+        app = AppState(ui_components, None, history)
+        try:
+            for idx in range(20):
+                name = f"harness@fake{idx}"
+                with harness.timed("connect"):
+                    app.add_connection(name, server.connect(),
+                                       {"host": f"fake{idx}",
+                                        "user": "harness",
+                                        "password": ""})
+                    app.select_connection(name)
+                    app._start_completion_engine(name)
+                with harness.timed("disconnect"):
+                    app.close_connection(name)
+            _wait_for_threads(threads)
+        finally:
+            history.close()
+        harness.check(not app._connections,
+                      f"{len(app._connections)} connections kept")
+        harness.check(not app._completion_engines,
+                      f"{len(app._completion_engines)} completion "
+                      "engines kept")
+    harness.check(len(database._query_listeners) == listeners,
+                  f"{len(database._query_listeners) - listeners} query "
+                  "listeners kept")
+    harness.check(all(conn.closed for conn in server.open_connections),
+                  "side connections left open")
+
+def script_runner(harness: Harness) -> None:
+    """
+    Split and run a long script.
+    """
+    server = FakeServer(rows = 10)
+    script = "\n".join(
+        f"INSERT INTO orders VALUES ({idx}, 'name {idx}', {idx});"
+        if idx % 10 else f"SELECT * FROM orders WHERE id = {idx};"
+        for idx in range(10000))
+    with harness.timed("split_statements"):
+        statements = split_statements(script)
+    harness.check(len(statements) == 10000, "split_statements miscounted")
+    runner = ScriptRunner(server.connect(), script)
+    with harness.timed("script_run"):
+        results = sum(1 for _ in runner.run())
+    harness.check(results == 10000, f"ScriptRunner ran {results} of 10000")
+
+def transactions(harness: Harness) -> None:
+    """
+    Run a script and save edits on connections left in a transaction by
+    an earlier SELECT (autocommit off), which must not make them fail.
+    """
+    server = FakeServer(rows = 10)
+    connection = server.connect()
+    database.read_query(connection, "SELECT * FROM orders")
+    harness.check(connection.in_transaction,
+                  "SELECT did not open a transaction")
+    runner = ScriptRunner(connection, "INSERT INTO orders VALUES (1);")
+    try:
+        results = list(runner.run())
+        harness.check(results[0].error is None,
+                      f"ScriptRunner failed: {results[0].error}")
+    except mysql.connector.Error as err:
+        harness.check(False, f"ScriptRunner failed: {err}")
+
+    def respond(statement: str) -> Tuple[List[str], List[tuple]]:
+        if "INFORMATION_SCHEMA.COLUMNS" in statement.upper():
+            return ["COLUMN_NAME", "DATA_TYPE", "PRIMARY_KEY"], \
+                [("id", "int", 1), ("name", "varchar", 0)]
+        return server.respond(statement)
+    connection = FakeConnection(respond)
+    browser = TableBrowser(connection, "shop", "orders")
+    browser.load_columns()
+    edits = EditBuffer(connection, browser)
+    edits.set_value(edits.insert_row(), 1, "new")
+    try:
+        with harness.timed("save_edits"):
+            edits.save()
+    except mysql.connector.Error as err:
+        harness.check(False, f"EditBuffer.save failed: {err}")
+    harness.check(not connection.in_transaction,
+                  "EditBuffer.save left a transaction open")
+
+def completion(harness: Harness) -> None:
+    """
+    Load schema metadata of 50,000 columns and complete names.
+    """
+    server = FakeServer()
+    engine = CompletionEngine("harness@fake")
+    with harness.timed("completion_load"):
+        engine.load(server.connect())
+    for before in ("SELECT col", "SELECT * FROM shop.tab",
+                   "SELECT * FROM table_7 WHERE column_7_", "USE sh"):
+        for _ in range(20):
+            with harness.timed("completion"):
+                engine.complete(before, "", 50)
+
+def windows(harness: Harness) -> None:
+    """
+    Open and close windows through events, which must leave neither
+    windows nor event subscribers behind.
+    """
+    import tkinter as tk
+    server = FakeServer(rows = 5000)
+    ui_components = ui_cmp.UIComponents.get_instance()
+    event_system = ui_components._event_system
+    subscribers = event_system.subscriber_count()
+    root = tk.Tk()
+    root.withdraw()
+    ui_components.attach_render_scheduler(root)
+    with tempfile.TemporaryDirectory() as directory, \
+            fake_connector(server):
+        history = QueryHistory(os.path.join(directory, "history.db"))
+        app = AppState(ui_components, root, history)
+        app._subscribe_events()
+        app.add_connection("harness@fake", server.connect(),
+                           {"host": "fake", "user": "harness",
+                            "password": ""})
+        app.select_connection("harness@fake")
+        app_subscribers = event_system.subscriber_count()
+        try:
+            for _ in range(5):
+                for window_name in ("new_connection", "saved_connections",
+                                    "history_window"):
+                    with harness.timed("open_window"):
+                        ui_components.publish(
+                            "OPEN_WINDOW", {"window_name": window_name})
+                        root.update()
+                    with harness.timed("close_window"):
+                        ui_components.publish(
+                            "CLOSE_WINDOW", {"window_name": window_name})
+                        root.update()
+                ui_components.publish("RUN_QUERY",
+                                      {"query": "SELECT * FROM orders"})
+                window = app._windows["result_window"]
+                while not window.handle.done() or window._treeview is None:
+                    root.update()
+                ui_components.publish(
+                    "CLOSE_WINDOW", {"window_name": "result_window"})
+                del window
+                root.update()
+            harness.check(
+                event_system.subscriber_count() == app_subscribers,
+                f"{event_system.subscriber_count() - app_subscribers} "
+                "event subscribers kept by closed windows")
+            harness.check(list(app._windows) == ["main_window"],
+                          f"windows kept open: {list(app._windows)}")
+        finally:
+            for name in list(app._connections):
+                app.close_connection(name)
+            _unsubscribe_app(event_system, app)
+            history.close()
+            ui_components.cancel_updates(root)
+            root.destroy()
+    gc.collect()
+    toplevels = sum(1 for obj in gc.get_objects()
+                    if isinstance(obj, tk.Toplevel))
+    harness.check(toplevels == 0, f"{toplevels} closed windows kept alive")
+    harness.check(event_system.subscriber_count() == subscribers,
+                  "event subscribers kept after the session")
+
+def _unsubscribe_app(event_system: event_sys.EventSystem,
+                     app: AppState) -> None:
+    """
+    Remove the subscriptions AppState makes for a session, as the
+    application itself only unsubscribes by exiting.
+    """
+    for event, callback in (
+            ("OPEN_WINDOW", app._open_window),
+            ("CLOSE_WINDOW", app._close_window),
+            ("QUIT", app.quit),
+            ("CONNECT_TO_SERVER", app._connect_to_server),
+            ("USE_DATABASE", app._use_database),
+            ("RUN_QUERY", app._run_query),
+            ("RUN_SCRIPT", app._run_script),
+            ("PROFILE_QUERY", app._profile_query)):
+        event_system.unsubscribe(event, callback)
+
+def _wait_for_threads(count: int, timeout: float = 5.0) -> None:
+    """
+    Wait for background threads (e.g. completion loading) to finish.
+    
+    Args:
+        count (int): The number of threads to wait for
+        timeout (float): Maximum time to wait in seconds
+    """
+    deadline = time.monotonic() + timeout
+    while threading.active_count() > count and \
+            time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def _has_display() -> bool:
+    """Returns whether Tk windows can be created."""
+    import tkinter as tk
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        return False
+    return True
+
+SCENARIOS = {
+    "large_results": large_results,
+    "stream_query": stream_query,
+    "query_history": query_history,
+    "connections": connections,
+    "script_runner": script_runner,
+    "transactions": transactions,
+    "completion": completion,
+    "windows": windows,
+}
+# SCENARIOS that create Tk windows
+WINDOW_SCENARIOS = ("windows",)
+# ------------------------------^ Scenarios ^------------------------------ #
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the harness.
+    
+    Args:
+        argv (Optional [List[str]]): The arguments (default sys.argv)
+        
+    Returns:
+        int: The exit code
+    """
+    parser = argparse.ArgumentParser(
+        description="Memory and latency regression harness, run against "
+        "a fake connector.")
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=10,
+                        help="iterations per scenario after warm up")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="multiply the latency thresholds, e.g. 3 on "
+                        "slow machines")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="print every operation's timings")
+    args = parser.parse_args(argv)
+    
+    ui_cmp.UIComponents.initialize(event_sys.EventSystem())
+    harness = Harness(args.iterations, args.latency_scale, args.verbose)
+    display = None
+    for name in args.only or list(SCENARIOS):
+        if name in WINDOW_SCENARIOS:
+            if display is None:
+                display = _has_display()
+            if not display:
+                print(f"{name}: skipped (no display)")
+                continue
+        harness.run(name, SCENARIOS[name])
+    
+    if harness.failures:
+        print("\nRegressions:")
+        for failure in harness.failures:
+            print(f"  {failure}")
+        return EXIT_REGRESSION
+    print("\nNo regressions")
+    return EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
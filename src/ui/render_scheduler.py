@@ -0,0 +1,238 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+class _ItemsJob:
+    """
+    A pending fill of a Listbox or Treeview: optionally clears it, then
+    inserts the items in chunks, so a large list spreads over frames.
+    
+    Args:
+        widget (tk.Listbox | ttk.Treeview): The widget to fill
+        items (List[Any]): Listbox items, or Treeview row values
+        replace (bool): Clear the widget before inserting
+        chunk_size (int): Items inserted per step
+    """
+    __slots__ = ["widget", "items", "replace", "chunk_size", "_position"]
+    
+    def __init__(self, widget, items: List[Any], replace: bool, 
+                 chunk_size: int) -> None:
+        self.widget = widget
+        self.items = items
+        self.replace = replace
+        self.chunk_size = chunk_size
+        self._position = 0
+        
+    def __call__(self, deadline: float) -> bool:
+        """
+        Insert chunks until done or the frame's deadline is reached.
+        
+        Args:
+            deadline (float): time.perf_counter() value to stop at
+            
+        Returns:
+            bool: True when all items are inserted
+        """
+        is_tree = isinstance(self.widget, ttk.Treeview)
+        if self.replace:
+            if is_tree:
+                self.widget.delete(*self.widget.get_children())
+            else:
+                self.widget.delete(0, tk.END)
+            self.replace = False
+        while self._position < len(self.items):
+            chunk = self.items[self._position:
+                               self._position + self.chunk_size]
+            self._position += len(chunk)
+            if is_tree:
+                for values in chunk:
+                    self.widget.insert("", tk.END, values=values)
+            else:
+                self.widget.insert(tk.END, *chunk)
+            if time.perf_counter() >= deadline:
+                break
+        return self._position >= len(self.items)
+
+class RenderScheduler:
+    """
+    Queues widget mutations and applies them in bulk once per frame, 
+    within a time budget, so heavy updates never stall the UI:
+        - mutations with the same key are merged, only the last one runs
+        - configure() calls on one widget merge their options
+        - list fills are inserted in chunks, spread over as many frames 
+          as needed; replacing a list drops its pending inserts
+    Must only be used from the Tk thread.
+    
+    Args:
+        frame_ms (int): Delay between frames while work remains
+        budget_ms (float): Time spent applying mutations per frame
+        chunk_size (int): Items inserted into a list per step
+    """
+    __slots__ = ["_frame_ms", "_budget", "_chunk_size", "_root", 
+                 "_pending", "_configure_options", "_flush_id"]
+    
+    def __init__(self, frame_ms: int = 16, budget_ms: float = 8.0,
+                 chunk_size: int = 200) -> None:
+        self._frame_ms = frame_ms
+        self._budget = budget_ms / 1000
+        self._chunk_size = chunk_size
+        self._root: Optional[tk.Misc] = None
+        # Key: mutation key, Value: job(deadline) -> done. Run in order
+        self._pending: Dict[Hashable, Callable[[float], bool]] = {}
+        # Key: widget path, Value: merged options of its configure job
+        self._configure_options: Dict[str, Dict[str, Any]] = {}
+        self._flush_id = None
+    
+    # ---------------------------- Scheduling ---------------------------- #
+    def attach(self, widget: tk.Misc) -> None:
+        """
+        Set the widget whose after() loop runs the frames. It must outlive
+        the scheduled work (usually the main window); by default the Tk
+        root of the first widget updated is used.
+        
+        Args:
+            widget (tk.Misc): The widget to schedule frames on
+        """
+        # A frame requested on the previous widget would never run if it
+        # was destroyed, so it is requested again on the new one
+        if self._flush_id is not None and self._root is not None:
+            try:
+                self._root.after_cancel(self._flush_id)
+            except tk.TclError:
+                pass
+            self._flush_id = None
+        self._root = widget
+        if self._pending:
+            self._flush_id = widget.after_idle(self._flush)
+    
+    def _queue(self, key: Hashable, job: Callable[[float], bool],
+               widget: tk.Misc) -> None:
+        """
+        Queue a job, replacing (and moving after the others) any pending 
+        job with the same key, and request a frame.
+        """
+        self._pending.pop(key, None)
+        self._pending[key] = job
+        if self._root is None:
+            self._root = widget.nametowidget(".")
+        if self._flush_id is None:
+            self._flush_id = self._root.after_idle(self._flush)
+    
+    def schedule(self, key: Hashable, widget: tk.Misc, 
+                 mutation: Callable, *args) -> None:
+        """
+        Schedule a mutation; a pending mutation with the same key is 
+        replaced, so only the latest one runs.
+        
+        Args:
+            key (Hashable): Identifies what the mutation updates
+            widget (tk.Misc): The widget mutated
+            mutation (Callable): The function to call
+            args: Arguments to call it with
+        """
+        def job(_deadline: float) -> bool:
+            mutation(*args)
+            return True
+        self._queue(key, job, widget)
+    
+    def configure(self, widget: tk.Misc, **options) -> None:
+        """
+        Schedule widget.configure(**options), merged with any pending 
+        configure of the same widget (later values win).
+        
+        Args:
+            widget (tk.Misc): The widget to configure
+            options: The options to set, e.g. text="..."
+        """
+        path = str(widget)
+        if path in self._configure_options:
+            self._configure_options[path].update(options)
+            return
+        self._configure_options[path] = dict(options)
+        
+        def job(_deadline: float) -> bool:
+            widget.configure(**self._configure_options.pop(path))
+            return True
+        self._queue((path, "configure"), job, widget)
+    
+    def set_items(self, widget, items: List[Any]) -> None:
+        """
+        Schedule replacing all items of a Listbox (or rows of a Treeview),
+        dropping any pending inserts into it.
+        
+        Args:
+            widget (tk.Listbox | ttk.Treeview): The widget to fill
+            items (List[Any]): Listbox items, or Treeview row values
+        """
+        self._pending.pop((str(widget), "append"), None)
+        self._queue((str(widget), "items"), 
+                    _ItemsJob(widget, list(items), True, self._chunk_size),
+                    widget)
+    
+    def append_items(self, widget, items: List[Any]) -> None:
+        """
+        Schedule appending items to a Listbox (or rows to a Treeview), 
+        merged with any pending append to it.
+        
+        Args:
+            widget (tk.Listbox | ttk.Treeview): The widget to append to
+            items (List[Any]): Listbox items, or Treeview row values
+        """
+        key = (str(widget), "append")
+        pending = self._pending.get(key)
+        if isinstance(pending, _ItemsJob):
+            pending.items.extend(items)
+            return
+        self._queue(key, _ItemsJob(widget, list(items), False, 
+                                   self._chunk_size), widget)
+    
+    def cancel(self, widget: tk.Misc) -> None:
+        """
+        Drop all pending mutations of a widget (e.g. before destroying it).
+        
+        Args:
+            widget (tk.Misc): The widget
+        """
+        path = str(widget)
+        for key in [key for key in self._pending 
+                    if isinstance(key, tuple) and key[0] == path]:
+            del self._pending[key]
+        self._configure_options.pop(path, None)
+    # ---------------------------^ Scheduling ^--------------------------- #
+    
+    # ------------------------------ Frames ------------------------------ #
+    def _flush(self) -> None:
+        """
+        Apply pending mutations until the frame's budget is used up, then 
+        schedule the next frame if work remains.
+        """
+        self._flush_id = None
+        deadline = time.perf_counter() + self._budget
+        while self._pending and time.perf_counter() < deadline:
+            key, job = next(iter(self._pending.items()))
+            try:
+                done = job(deadline)
+            except tk.TclError:
+                done = True     # Widget was destroyed
+            if done and self._pending.get(key) is job:
+                del self._pending[key]
+        if self._pending and self._root is not None:
+            self._flush_id = self._root.after(self._frame_ms, self._flush)
+    
+    def flush_now(self) -> None:
+        """
+        Apply all pending mutations immediately, ignoring the budget.
+        """
+        if self._flush_id is not None and self._root is not None:
+            self._root.after_cancel(self._flush_id)
+        self._flush_id = None
+        while self._pending:
+            key, job = next(iter(self._pending.items()))
+            try:
+                done = job(float("inf"))
+            except tk.TclError:
+                done = True
+            if done and self._pending.get(key) is job:
+                del self._pending[key]
+    # -----------------------------^ Frames ^----------------------------- #
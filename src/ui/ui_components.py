@@ -1,19 +1,25 @@
 
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox, filedialog
 from typing import Callable, Optional, Any, Dict, List
 
 from core.event_system import EventSystem
+from ui.render_scheduler import RenderScheduler
 
 class UIComponents:
     """
     A singleton class that provides functions for creating 
     common UI components.
     Also handles all event subscription and publishing, through
-    the EventSystem instance that is passed in at initialization.
+    the EventSystem instance that is passed in at initialization,
+    and batches widget updates per frame through a RenderScheduler.
     """
     _instance = None
     _event_system = None
+    _render_scheduler = None
+    # Lists up to this long are filled immediately, longer ones over
+    # several frames
+    IMMEDIATE_ITEMS = 200
     
     @classmethod
     def initialize(cls, event_system: EventSystem):
@@ -26,6 +32,7 @@ class UIComponents:
         if cls._instance is None:
             cls._instance = cls()
             cls._event_system = event_system
+            cls._render_scheduler = RenderScheduler()
         return cls._instance
     
     @classmethod
@@ -157,11 +164,249 @@ class UIComponents:
         # Create the listbox
         listbox = tk.Listbox(parent, width=width, height=height, selectmode=selectmode)
         # Populate the listbox with items
-        for item in items_list:
-            listbox.insert(tk.END, item)
+        self.set_items(listbox, items_list)
         
         return listbox
-    # -----------------------^ Create UI Components ^----------------------- #   
+    
+    def create_text(self,
+        parent: tk.Widget,
+        width: int,
+        height: int,
+    ) -> tk.Text:
+        """
+        Create a multi-line text widget (e.g. for entering queries).
+        
+        Args:
+            parent (tk.Widget): The parent widget to place the text in
+            width (int): The width of the text widget, in characters
+            height (int): The height of the text widget, in lines
+        
+        Returns:
+            tk.Text: The created text widget
+        """
+        text = tk.Text(parent, width=width, height=height, undo=True)
+        
+        return text
+    
+    def create_combobox(self,
+        parent: tk.Widget,
+        width: int,
+        values: List[str],
+    ) -> ttk.Combobox:
+        """
+        Create a read-only combobox to choose one of the given values.
+        The first value is selected, if there is one.
+        
+        Args:
+            parent (tk.Widget): The parent widget to place the combobox in
+            width (int): The width of the combobox, in characters
+            values (List[str]): The values to choose from
+        
+        Returns:
+            ttk.Combobox: The created combobox
+        """
+        combobox = ttk.Combobox(parent, width=width, values=values, 
+                                state="readonly")
+        if values:
+            combobox.current(0)
+        
+        return combobox
+    
+    def create_checkbutton(self,
+        parent: tk.Widget,
+        text: str,
+        variable: tk.BooleanVar,
+    ) -> ttk.Checkbutton:
+        """
+        Create a checkbutton bound to a boolean variable.
+        
+        Args:
+            parent (tk.Widget): The parent widget to place the checkbutton in
+            text (str): The text to display next to the checkbutton
+            variable (tk.BooleanVar): The variable holding the checked state
+        
+        Returns:
+            ttk.Checkbutton: The created checkbutton
+        """
+        checkbutton = ttk.Checkbutton(
+            master=parent,
+            text=text,
+            variable=variable)
+        
+        return checkbutton
+    
+    def create_treeview(self,
+        parent: tk.Widget,
+        columns: List[str],
+        height: int = 20,
+        column_width: int = 120,
+        tree_heading: Optional[str] = None,
+    ) -> ttk.Treeview:
+        """
+        Create a treeview showing rows in named columns, with scrollbars.
+        The treeview and scrollbars are placed in a frame, which must be
+        placed in the parent (treeview.master).
+        
+        Args:
+            parent (tk.Widget): The parent widget to place the frame in
+            columns (List[str]): The column headings
+            height (int): The number of visible rows
+            column_width (int): The initial width of each column, in pixels
+            tree_heading (Optional [str]): If given, also show the tree
+                column (item text, with expandable children) under this
+                heading
+        
+        Returns:
+            ttk.Treeview: The created treeview
+        """
+        frame = ttk.Frame(parent)
+        column_ids = [f"#{idx}" for idx in range(1, len(columns) + 1)]
+        treeview = ttk.Treeview(
+            frame, columns=column_ids, height=height,
+            show="tree headings" if tree_heading else "headings")
+        if tree_heading:
+            treeview.heading("#0", text=tree_heading, anchor=tk.W)
+            treeview.column("#0", width=column_width * 3)
+        for column_id, heading in zip(column_ids, columns):
+            treeview.heading(column_id, text=heading, anchor=tk.W)
+            treeview.column(column_id, width=column_width, stretch=False)
+        y_scroll = ttk.Scrollbar(frame, orient=tk.VERTICAL,
+                                 command=treeview.yview)
+        x_scroll = ttk.Scrollbar(frame, orient=tk.HORIZONTAL,
+                                 command=treeview.xview)
+        treeview.configure(yscrollcommand=y_scroll.set,
+                           xscrollcommand=x_scroll.set)
+        treeview.grid(row=0, column=0, sticky=tk.NSEW)
+        y_scroll.grid(row=0, column=1, sticky=tk.NS)
+        x_scroll.grid(row=1, column=0, sticky=tk.EW)
+        frame.grid_rowconfigure(0, weight=1)
+        frame.grid_columnconfigure(0, weight=1)
+        
+        return treeview
+    
+    def create_message_box(self, title: str, message: str) -> None:
+        """
+        Show an error message box.
+        
+        Args:
+            title (str): The title of the message box
+            message (str): The message to display
+        """
+        messagebox.showerror(title, message)
+    
+    def ask_open_file(self, 
+                      title: str,
+                      filetypes: List[tuple] = [("All files", "*")]
+                      ) -> str:
+        """
+        Ask the user to choose an existing file.
+        
+        Args:
+            title (str): The title of the file dialog
+            filetypes (List[tuple]): (description, pattern) pairs of the
+                file types that can be chosen
+        
+        Returns:
+            str: The chosen path, or "" if the dialog was cancelled
+        """
+        return filedialog.askopenfilename(title=title, filetypes=filetypes)
+    
+    def ask_save_file(self, 
+                      title: str,
+                      filetypes: List[tuple] = [("All files", "*")]
+                      ) -> str:
+        """
+        Ask the user to choose a file to write.
+        
+        Args:
+            title (str): The title of the file dialog
+            filetypes (List[tuple]): (description, pattern) pairs of the
+                file types that can be chosen
+        
+        Returns:
+            str: The chosen path, or "" if the dialog was cancelled
+        """
+        return filedialog.asksaveasfilename(title=title, filetypes=filetypes)
+    # -----------------------^ Create UI Components ^----------------------- #
+    
+    # --------------------------- Batched Updates -------------------------- #
+    def attach_render_scheduler(self, widget: tk.Misc) -> None:
+        """
+        Run batched updates on a long-lived widget's after() loop.
+        
+        Args:
+            widget (tk.Misc): Usually the main window
+        """
+        self._render_scheduler.attach(widget)
+        
+    def schedule_update(self, key: Any, widget: tk.Misc, 
+                        mutation: Callable, *args) -> None:
+        """
+        Apply a widget mutation in the next frame. Pending mutations with
+        the same key are replaced, only the latest runs.
+        
+        Args:
+            key (Any): Identifies what the mutation updates
+            widget (tk.Misc): The widget mutated
+            mutation (Callable): The function to call
+            args: Arguments to call it with
+        """
+        self._render_scheduler.schedule(key, widget, mutation, *args)
+    
+    def configure_later(self, widget: tk.Misc, **options) -> None:
+        """
+        Configure a widget in the next frame, merged with other pending
+        configure calls on it (e.g. frequent status/progress text).
+        
+        Args:
+            widget (tk.Misc): The widget to configure
+            options: The options to set, e.g. text="..."
+        """
+        self._render_scheduler.configure(widget, **options)
+        
+    def set_items(self, widget, items: List[Any]) -> None:
+        """
+        Replace the items of a Listbox (or rows of a Treeview). Short 
+        lists are filled immediately in one call, long ones are filled
+        in chunks over several frames.
+        
+        Args:
+            widget (tk.Listbox | ttk.Treeview): The widget to fill
+            items (List[Any]): Listbox items, or Treeview row values
+        """
+        if len(items) > self.IMMEDIATE_ITEMS:
+            self._render_scheduler.set_items(widget, items)
+            return
+        self._render_scheduler.cancel(widget)
+        if isinstance(widget, ttk.Treeview):
+            widget.delete(*widget.get_children())
+            for values in items:
+                widget.insert("", tk.END, values=values)
+        else:
+            widget.delete(0, tk.END)
+            if items:
+                widget.insert(tk.END, *items)
+    
+    def append_items(self, widget, items: List[Any]) -> None:
+        """
+        Append items to a Listbox (or rows to a Treeview) in the next 
+        frames, merged with other pending appends to it.
+        
+        Args:
+            widget (tk.Listbox | ttk.Treeview): The widget to append to
+            items (List[Any]): Listbox items, or Treeview row values
+        """
+        self._render_scheduler.append_items(widget, items)
+        
+    def cancel_updates(self, widget: tk.Misc) -> None:
+        """
+        Drop the pending updates of a widget, e.g. when it is destroyed.
+        
+        Args:
+            widget (tk.Misc): The widget
+        """
+        self._render_scheduler.cancel(widget)
+    # --------------------------^ Batched Updates ^------------------------- #   
     
     # -------------------------- Event Interaction ------------------------- #   
     def subscribe(self, event_name: str, callback: Callable) -> None:
@@ -176,6 +421,16 @@ class UIComponents:
                 the event is triggered
         """
         self._event_system.subscribe(event_name, callback)
+    
+    def unsubscribe(self, event_name: str, callback: Callable) -> None:
+        """
+        Unsubscribe a callback function from an event.
+        
+        Args:
+            event_name (str): The name of the event
+            callback (Callable): The subscribed callback function
+        """
+        self._event_system.unsubscribe(event_name, callback)
         
     def publish(self, event_name: str, data: Dict[str, Any] = {}) -> None:
         """
@@ -0,0 +1,224 @@
+import queue
+import threading
+import tkinter as tk
+from typing import Callable, Optional
+import mysql.connector
+
+from ui.ui_components import UIComponents
+from core.query_history import QueryHistory
+import core.index_advisor as advisor
+
+class AdvisorWindow(tk.Toplevel):
+    """
+    Window that runs the index advisor on a captured workload, either the
+    tool's own query history or the server's statement digest summary,
+    and lists the proposed indexes with their estimated benefit.
+    The advisor runs in the background on its own side connection.
+
+    Args:
+        ui_components (UIComponents): UIComponents singleton instance.
+        side_connection_factory (Callable): Returns a new connection to 
+            the server to advise on.
+        query_history (QueryHistory): The query history.
+        connection_name (str): The name of the connection advised on.
+        schema (Optional [str]): The default schema of history queries, 
+            usually the selected database.
+    """
+    POLL_INTERVAL_MS = 100
+    COLUMNS = ["Benefit (rows)", "Queries", "Reasons", "Index"]
+    
+    def __init__(self, 
+                 ui_components: UIComponents,
+                 side_connection_factory: Callable[
+                     [], mysql.connector.MySQLConnection],
+                 query_history: QueryHistory,
+                 connection_name: str,
+                 schema: Optional[str] = None):
+        tk.Toplevel.__init__(self)
+        
+        self._ui_components = ui_components
+        self._side_connection_factory = side_connection_factory
+        self._query_history = query_history
+        self._connection_name = connection_name
+        self._messages = queue.Queue()
+        self._running = False
+        self._poll_id = None
+        
+        self.title("Index Advisor")
+        self.geometry("1000x500")
+        self.resizable(True, True)
+        
+        self._create_widgets()
+        if schema:
+            self._schema_entry.insert(0, schema)
+        
+    def _create_widgets(self):
+        """
+        Create widgets for the advisor window:
+            - Schema: entry for the default schema of history queries,
+              needed to explain their unqualified tables
+            - From History / From Server Digests: buttons that run the 
+              advisor on the chosen workload
+            - Candidates: treeview of proposed indexes, best first
+            - Status: label that displays progress
+        """
+        top_frame = tk.Frame(self)
+        schema_label = self._ui_components.create_label(
+            parent = top_frame,
+            text = "Schema (history)"
+        )
+        self._schema_entry = self._ui_components.create_entry(
+            parent = top_frame,
+            width = 20
+        )
+        self._history_btn = self._ui_components.create_button(
+            parent = top_frame,
+            text = "From History",
+            command = lambda: self._start("history")
+        )
+        self._digest_btn = self._ui_components.create_button(
+            parent = top_frame,
+            text = "From Server Digests",
+            command = lambda: self._start("digests")
+        )
+        close_btn = self._ui_components.create_button(
+            parent = top_frame,
+            text = "Close",
+            event = "CLOSE_WINDOW",
+            event_data = {"window_name": "advisor_window"}
+        )
+        self._status_label = self._ui_components.create_label(
+            parent = self,
+            text = "Choose a workload to analyze"
+        )
+        self._treeview = self._ui_components.create_treeview(
+            parent = self,
+            columns = self.COLUMNS,
+            column_width = 150
+        )
+        self._treeview.column("#4", width = 500)
+        
+        top_frame.pack(side = tk.TOP, fill = tk.X)
+        schema_label.pack(side = tk.LEFT, padx = 5, pady = 5)
+        self._schema_entry.pack(side = tk.LEFT, padx = 5, pady = 5)
+        self._history_btn.pack(side = tk.LEFT, padx = 5, pady = 5)
+        self._digest_btn.pack(side = tk.LEFT, padx = 5, pady = 5)
+        close_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+        self._status_label.pack(side = tk.BOTTOM, fill = tk.X)
+        self._treeview.master.pack(side = tk.TOP, fill = tk.BOTH, 
+                                   expand = True)
+    
+    def _start(self, source: str):
+        """
+        Run the advisor on a workload in the background.
+        
+        Args:
+            source (str): 'history' or 'digests'
+        """
+        if self._running:
+            return
+        self._running = True
+        self._history_btn.state(["disabled"])
+        self._digest_btn.state(["disabled"])
+        self._treeview.delete(*self._treeview.get_children())
+        schema = self._schema_entry.get().strip() or None
+        if source == "history" and schema is None:
+            self._ui_components.configure_later(
+                self._status_label,
+                text = "Capturing workload (no schema: queries on "
+                       "unqualified tables will be skipped)...")
+        else:
+            self._ui_components.configure_later(
+                self._status_label, text = "Capturing workload...")
+        threading.Thread(
+            target = self._advise, 
+            args = (source, schema),
+            daemon = True).start()
+        self._poll()
+    
+    def _advise(self, source: str, schema):
+        """
+        Capture the workload and run the advisor (worker thread). Progress
+        and the result are passed back through the message queue.
+        
+        Args:
+            source (str): 'history' or 'digests'
+            schema (Optional [str]): Default schema of history queries
+        """
+        connection = None
+        try:
+            connection = self._side_connection_factory()
+            if source == "history":
+                workload = advisor.workload_from_history(
+                    self._query_history, self._connection_name, schema)
+            else:
+                workload = advisor.workload_from_digests(connection)
+            index_advisor = advisor.IndexAdvisor(connection)
+            candidates = index_advisor.advise(
+                workload, lambda done, total: self._messages.put(
+                    ("progress", f"Analyzed {done}/{total} queries")))
+            self._messages.put(("done", (candidates, 
+                                         index_advisor.skipped)))
+        except Exception as err:
+            # Any failure must reach _poll, or the window stays disabled
+            self._messages.put(("error", f"Advisor failed: {err}"))
+        finally:
+            if connection is not None:
+                connection.close()
+    
+    def _poll(self):
+        """
+        Show the advisor's progress, and its candidates once done.
+        """
+        self._poll_id = None
+        while not self._messages.empty():
+            kind, message = self._messages.get_nowait()
+            if kind == "progress":
+                self._ui_components.configure_later(self._status_label,
+                                                    text = message)
+            elif kind == "error":
+                self._ui_components.configure_later(
+                    self._status_label, text = message)
+                self._finish()
+                return
+            else:
+                self._show_candidates(*message)
+                self._finish()
+                return
+        self._poll_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+        
+    def _show_candidates(self, candidates, skipped):
+        """
+        Display the proposed indexes.
+        
+        Args:
+            candidates (List[IndexCandidate]): The proposed indexes
+            skipped (List[Tuple[str, str]]): Queries that were not analyzed
+        """
+        self._ui_components.set_items(self._treeview, [
+            (f"{candidate.benefit:,.0f}", len(candidate.queries),
+             ", ".join(sorted(candidate.reasons)), candidate.ddl())
+            for candidate in candidates])
+        for query, reason in skipped:
+            print(f"Advisor skipped query ({reason}): {query}")
+        self._ui_components.configure_later(
+            self._status_label,
+            text = f"{len(candidates)} indexes proposed, "
+                   f"{len(skipped)} queries skipped")
+    
+    def _finish(self):
+        """
+        Allow the advisor to be run again.
+        """
+        self._running = False
+        self._history_btn.state(["!disabled"])
+        self._digest_btn.state(["!disabled"])
+        
+    def destroy(self):
+        """
+        Stop polling and destroy the window. A running analysis finishes
+        in the background and closes its side connection.
+        """
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+        tk.Toplevel.destroy(self)
@@ -0,0 +1,564 @@
+import queue
+import threading
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional
+import mysql.connector
+
+from ui.ui_components import UIComponents
+from ui.windows.value_window import ValueWindow
+from core.table_browser import TableBrowser, LargeValue
+from core.edit_buffer import EditBuffer
+from core.prefetcher import Prefetcher
+import database
+
+class DatabaseWindow(tk.Toplevel):
+    """
+    Window that browses the tables of a database. Rows are shown a page 
+    at a time, with only a preview of large (BLOB, TEXT, JSON, ...) 
+    values; double-clicking a preview streams the full value into a 
+    viewer, from which it can be saved to a file.
+    Cells can be edited, and rows added or deleted; the edits are kept 
+    in an EditBuffer until saved together in one transaction.
+    All work runs in order on a worker thread, on a side connection owned
+    by the window. Table lists and first pages already prefetched (while 
+    the database was chosen in the server window) are shown from the
+    prefetcher's cache instead.
+
+    Args:
+        ui_components (UIComponents): UIComponents singleton instance.
+        side_connection_factory (Callable): Returns a new connection.
+        database_name (str): The database to browse.
+        prefetcher (Optional [Prefetcher]): Cache of prefetched tables.
+    """
+    POLL_INTERVAL_MS = 100
+    
+    def __init__(self, 
+                 ui_components: UIComponents,
+                 side_connection_factory: Callable[
+                     [], mysql.connector.MySQLConnection],
+                 database_name: str,
+                 prefetcher: Optional[Prefetcher] = None):
+        tk.Toplevel.__init__(self)
+        
+        self._ui_components = ui_components
+        self._side_connection_factory = side_connection_factory
+        self._database_name = database_name
+        self._prefetcher = prefetcher
+        # Work for the worker thread: (job, on_done) pairs, None to stop
+        self._jobs = queue.Queue()
+        # Finished work for the UI: (on_done, result) pairs
+        self._results = queue.Queue()
+        self._browser: Optional[TableBrowser] = None
+        self._tables: List[str] = []
+        self._rows: List[List[Any]] = []
+        self._edits: Optional[EditBuffer] = None
+        # Key: treeview item of a new row, Value: the row. New rows are 
+        # shown first, above the rows read
+        self._new_items: Dict[str, List[Any]] = {}
+        # (item, column position) of the cell last clicked
+        self._selected_cell = None
+        # Shown once with the next status, e.g. the result of saving
+        self._notice = ""
+        self._treeview = None
+        self._poll_id = None
+        
+        self.title(f"Database {database_name}")
+        self.geometry("1000x600")
+        self.resizable(True, True)
+        
+        self._create_widgets()
+        threading.Thread(target=self._work, daemon=True).start()
+        tables = None
+        if prefetcher is not None:
+            tables = prefetcher.tables(database_name)
+        if tables is not None:
+            self._show_tables(tables)
+        else:
+            self._submit(
+                lambda connection: [row[0] for row 
+                                    in database.show_tables(connection)],
+                self._show_tables)
+        self._poll()
+        
+    def _create_widgets(self):
+        """
+        Create widgets for the database window:
+            - Tables: listbox of the database's tables
+            - Browse: button that shows the first page of the selected table
+            - More rows: button that appends the next page
+            - Rows: treeview of the browsed rows (created per table)
+            - Value: entry for the new value of the selected cell
+            - Set / Set NULL: buttons that change the selected cell
+            - Add row / Delete row: buttons that add and delete rows
+            - Save / Discard: buttons that write or forget the edits
+            - Status: label that displays progress
+            - Close: button that closes the window
+        """
+        self._table_frame = tk.Frame(self)
+        button_frame = tk.Frame(self)
+        self._table_listbox = self._ui_components.create_listbox(
+            parent = self._table_frame,
+            width = 30,
+            height = 30,
+            items_list = [],
+            selectmode = "single"
+        )
+        self._table_listbox.bind("<Double-Button-1>", 
+                                 lambda event: self._browse())
+        browse_btn = self._ui_components.create_button(
+            parent = self._table_frame,
+            text = "Browse",
+            command = self._browse
+        )
+        self._more_btn = self._ui_components.create_button(
+            parent = button_frame,
+            text = "More rows",
+            command = self._next_page
+        )
+        self._more_btn.state(["disabled"])
+        self._status_label = self._ui_components.create_label(
+            parent = button_frame,
+            text = "Loading tables..."
+        )
+        close_btn = self._ui_components.create_button(
+            parent = button_frame,
+            text = "Close",
+            event = "CLOSE_WINDOW",
+            event_data = {"window_name": "database_window"}
+        )
+        edit_frame = tk.Frame(self)
+        value_label = self._ui_components.create_label(
+            parent = edit_frame,
+            text = "Value"
+        )
+        self._value_entry = self._ui_components.create_entry(
+            parent = edit_frame,
+            width = 40
+        )
+        self._edit_buttons = [
+            self._ui_components.create_button(
+                parent = edit_frame,
+                text = text,
+                command = command
+            ) for text, command in (
+                ("Set", self._set_value),
+                ("Set NULL", lambda: self._set_value(null = True)),
+                ("Add row", self._add_row),
+                ("Delete row", self._delete_row),
+                ("Save", self._save),
+                ("Discard", self._discard))]
+        
+        button_frame.pack(side = tk.BOTTOM, fill = tk.X)
+        edit_frame.pack(side = tk.BOTTOM, fill = tk.X)
+        value_label.pack(side = tk.LEFT, padx = 5, pady = 5)
+        self._value_entry.pack(side = tk.LEFT, padx = 5, pady = 5)
+        for button in self._edit_buttons:
+            button.pack(side = tk.LEFT, padx = 5, pady = 5)
+        self._table_frame.pack(side = tk.LEFT, fill = tk.Y)
+        self._table_listbox.pack(side = tk.TOP, fill = tk.Y, expand = True)
+        browse_btn.pack(side = tk.TOP, padx = 5, pady = 5)
+        self._status_label.pack(side = tk.LEFT, padx = 5, pady = 5)
+        close_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+        self._more_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+    
+    # ------------------------------ Worker ------------------------------ #
+    def _submit(self, job: Callable[[mysql.connector.MySQLConnection], Any],
+                on_done: Callable[[Any], None]):
+        """
+        Queue work for the worker thread.
+        
+        Args:
+            job (Callable): Called with the window's connection (worker 
+                thread); its result, or the error it raised, is passed 
+                to on_done
+            on_done (Callable): Called with the result (UI thread)
+        """
+        self._jobs.put((job, on_done))
+        
+    def _work(self):
+        """
+        Run queued work in order on the window's connection (worker 
+        thread).
+        """
+        try:
+            connection = self._side_connection_factory()
+            # Each page read sees the latest data, and no transaction is
+            # left open by reads when EditBuffer.save() starts its own
+            connection.autocommit = True
+            database.use_database(connection, self._database_name)
+        except (mysql.connector.Error, KeyError) as err:
+            self._results.put((self._show_error, err))
+            return
+        try:
+            while True:
+                work = self._jobs.get()
+                if work is None:
+                    return
+                job, on_done = work
+                try:
+                    result = job(connection)
+                except (mysql.connector.Error, OSError, ValueError) as err:
+                    result = err
+                self._results.put((on_done, result))
+        finally:
+            connection.close()
+    
+    def _poll(self):
+        """
+        Pass finished work to its callbacks.
+        """
+        while not self._results.empty():
+            on_done, result = self._results.get_nowait()
+            on_done(result)
+        self._poll_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+        
+    def _show_error(self, error: Exception):
+        """
+        Display the error of failed work.
+        
+        Args:
+            error (Exception): The error raised
+        """
+        self._ui_components.configure_later(self._status_label,
+                                            text = f"Error: {error}")
+    # -----------------------------^ Worker ^----------------------------- #
+    
+    # ----------------------------- Browsing ----------------------------- #
+    def _show_tables(self, tables):
+        """
+        Display the database's tables.
+        
+        Args:
+            tables (List[str] | Exception): The table names
+        """
+        if isinstance(tables, Exception):
+            self._show_error(tables)
+            return
+        self._tables = tables
+        self._ui_components.set_items(self._table_listbox, tables)
+        self._ui_components.configure_later(
+            self._status_label, text = f"{len(tables)} tables")
+    
+    def _browse(self):
+        """
+        Show the first page of the selected table.
+        """
+        selection = self._table_listbox.curselection()
+        if not selection:
+            return
+        self._load_table(self._tables[selection[0]])
+        
+    def _load_table(self, table: str):
+        """
+        Show the first page of a table, dropping any unsaved edits.
+        
+        Args:
+            table (str): The table to show
+        """
+        def first_page(connection):
+            prefetched = None
+            if self._prefetcher is not None:
+                prefetched = self._prefetcher.take_page(
+                    self._database_name, table, connection)
+            if prefetched is not None:
+                browser, rows = prefetched
+            else:
+                browser = TableBrowser(connection, self._database_name, 
+                                       table)
+                browser.load_columns()
+                rows = browser.next_page()
+            return browser, EditBuffer(connection, browser), rows
+        if self._prefetcher is not None:
+            self._prefetcher.used(self._database_name, table)
+        self._more_btn.state(["disabled"])
+        self._ui_components.configure_later(
+            self._status_label, text = f"Loading {table}...")
+        self._submit(first_page, self._show_first_page)
+        
+    def _show_first_page(self, result):
+        """
+        Display the first page of a newly browsed table.
+        
+        Args:
+            result (Tuple[TableBrowser, EditBuffer, List] | Exception): 
+                The browser of the table, its edit buffer and first page
+        """
+        if isinstance(result, Exception):
+            self._show_error(result)
+            return
+        browser, self._edits, rows = result
+        self._show_page(browser, rows, True)
+        
+    def _next_page(self):
+        """
+        Append the next page of the browsed table.
+        """
+        if self._browser is None:
+            return
+        browser = self._browser
+        self._more_btn.state(["disabled"])
+        self._submit(lambda connection: browser.next_page(),
+                     lambda rows: self._show_page(browser, rows, False))
+        
+    def _show_page(self, browser: TableBrowser, rows, first: bool):
+        """
+        Display a page of rows.
+        
+        Args:
+            browser (TableBrowser): The browser the page was read with
+            rows (List[List[Any]] | Exception): The page's rows
+            first (bool): Whether it is the first page of the table
+        """
+        if isinstance(rows, Exception):
+            self._show_error(rows)
+            return
+        if first:
+            self._browser = browser
+            self._rows = []
+            self._new_items = {}
+            self._selected_cell = None
+            if self._treeview is not None:
+                self._ui_components.cancel_updates(self._treeview)
+                self._treeview.master.destroy()
+            self._treeview = self._ui_components.create_treeview(
+                parent = self,
+                columns = [column.name for column in browser.columns]
+            )
+            self._treeview.bind("<Double-Button-1>", self._open_value)
+            self._treeview.bind("<ButtonRelease-1>", self._select_cell)
+            self._treeview.tag_configure("edited", background = "#fff3b0")
+            self._treeview.tag_configure("new", background = "#d8f5d0")
+            self._treeview.tag_configure("deleted", foreground = "grey")
+            self._treeview.master.pack(side = tk.TOP, fill = tk.BOTH,
+                                       expand = True)
+        elif browser is not self._browser:
+            return
+        self._rows.extend(rows)
+        self._ui_components.append_items(
+            self._treeview, [self._values(row) for row in rows])
+        if rows:
+            self._more_btn.state(["!disabled"])
+        self._show_status()
+        
+    def _show_status(self):
+        """
+        Display the number of rows shown and of unsaved edits.
+        """
+        status = f"{self._notice}{len(self._rows)} rows"
+        self._notice = ""
+        if not self._browser.key_columns():
+            status += " (no primary key, rows cannot be edited and large" \
+                " values cannot be opened)"
+        elif self._edits is not None and self._edits.pending():
+            status += f", {self._edits.pending()} rows with unsaved edits"
+        self._ui_components.configure_later(self._status_label, 
+                                            text = status)
+        
+    def _values(self, row: List[Any]) -> List[str]:
+        """Returns the displayed values of a row."""
+        return ["NULL" if value is None else str(value) for value in row]
+    
+    def _row_of(self, item: str) -> List[Any]:
+        """
+        Get the row shown by a treeview item.
+        
+        Args:
+            item (str): The treeview item
+            
+        Returns:
+            List[Any]: The row
+        """
+        if item in self._new_items:
+            return self._new_items[item]
+        return self._rows[self._treeview.index(item) - len(self._new_items)]
+    # ----------------------------^ Browsing ^---------------------------- #
+    
+    # --------------------------- Large Values --------------------------- #
+    def _open_value(self, event):
+        """
+        Stream the full value of a double-clicked large cell into a 
+        value window.
+        """
+        item = self._treeview.identify_row(event.y)
+        column_id = self._treeview.identify_column(event.x)
+        if not item or not column_id.startswith("#"):
+            return
+        row = self._row_of(item)
+        position = int(column_id[1:]) - 1
+        if not (0 <= position < len(row)) or \
+                not isinstance(row[position], LargeValue):
+            return
+        browser = self._browser
+        if not browser.key_columns():
+            return
+        column = browser.columns[position]
+        key = browser.row_key(row)
+        viewer = ValueWindow(
+            self._ui_components, self, f"{browser.columns[position].name}"
+            f" of {', '.join(map(str, key))}",
+            lambda path: self._save_value(viewer, browser, key, column, 
+                                          path))
+        self._submit(
+            lambda connection: browser.stream_value(
+                key, column, viewer.write, chunk_size = 256 * 1024,
+                should_stop = viewer.should_stop),
+            lambda result: viewer.finish(
+            f"Error: {result}" if isinstance(result, Exception) 
+            else f"{result} characters"))
+    
+    def _save_value(self, viewer: ValueWindow, browser: TableBrowser, 
+                    key, column, path: str):
+        """
+        Stream the full value of a cell into a file.
+        
+        Args:
+            viewer (ValueWindow): The window showing the value
+            browser (TableBrowser): The browser the value was read with
+            key (Tuple): The row's primary key values
+            column (ColumnInfo): The column of the value
+            path (str): The file to write
+        """
+        def saved(result):
+            if viewer.winfo_exists():
+                viewer.set_status(f"Error: {result}" 
+                                  if isinstance(result, Exception)
+                                  else f"Saved {result} to {path}")
+        self._submit(lambda connection: browser.save_value(key, column, 
+                                                           path), 
+                     saved)
+    # --------------------------^ Large Values ^-------------------------- #
+    
+    # ----------------------------- Editing ----------------------------- #
+    def _select_cell(self, event):
+        """
+        Select the clicked cell for editing, showing its value.
+        """
+        item = self._treeview.identify_row(event.y)
+        column_id = self._treeview.identify_column(event.x)
+        if not item or not column_id.startswith("#"):
+            return
+        position = int(column_id[1:]) - 1
+        value = self._row_of(item)[position]
+        self._selected_cell = (item, position)
+        self._value_entry.delete(0, tk.END)
+        # Previews of large values are not prefilled, so they are never
+        # saved back truncated
+        if value is not None and not isinstance(value, LargeValue):
+            self._value_entry.insert(0, str(value))
+            
+    def _set_value(self, null: bool = False):
+        """
+        Change the selected cell to the entered value.
+        
+        Args:
+            null (bool): Set the cell to NULL instead
+        """
+        if self._edits is None or self._selected_cell is None:
+            return
+        item, position = self._selected_cell
+        if not self._treeview.exists(item):
+            return
+        row = self._row_of(item)
+        try:
+            self._edits.set_value(row, position, 
+                                  None if null else self._value_entry.get())
+        except ValueError as err:
+            self._ui_components.configure_later(
+                self._status_label, text = str(err))
+            return
+        self._treeview.item(item, values = self._values(row),
+                            tags = ("new",) if self._edits.is_new(row)
+                            else ("edited",))
+        self._show_status()
+        
+    def _add_row(self):
+        """
+        Add a new row, shown first, whose cells can then be set.
+        """
+        if self._edits is None:
+            return
+        row = self._edits.insert_row()
+        item = self._treeview.insert("", 0, values = self._values(row),
+                                     tags = ("new",))
+        self._new_items[item] = row
+        self._treeview.see(item)
+        self._show_status()
+        
+    def _delete_row(self):
+        """
+        Delete the selected rows.
+        """
+        if self._edits is None:
+            return
+        for item in self._treeview.selection():
+            row = self._row_of(item)
+            try:
+                self._edits.delete_row(row)
+            except ValueError as err:
+                self._ui_components.configure_later(
+                    self._status_label, text = str(err))
+                return
+            if item in self._new_items:
+                del self._new_items[item]
+                self._treeview.delete(item)
+            else:
+                self._treeview.item(item, tags = ("deleted",))
+        self._show_status()
+        
+    def _save(self):
+        """
+        Write all edits in one transaction, in the background.
+        """
+        if self._edits is None or not self._edits.pending():
+            return
+        edits = self._edits
+        for button in self._edit_buttons:
+            button.state(["disabled"])
+        self._ui_components.configure_later(
+            self._status_label,
+            text = f"Saving {edits.pending()} rows...")
+        self._submit(lambda connection: edits.save(),
+                     lambda result: self._saved(edits, result))
+        
+    def _saved(self, edits: EditBuffer, result):
+        """
+        Display the result of saving, showing the table again on success.
+        
+        Args:
+            edits (EditBuffer): The saved edits
+            result (List[Tuple] | Exception): The keys of conflicting rows
+        """
+        for button in self._edit_buttons:
+            button.state(["!disabled"])
+        if isinstance(result, Exception):
+            self._show_error(result)
+        elif result:
+            keys = "; ".join(", ".join(map(str, key)) for key in result[:5])
+            self._ui_components.configure_later(
+                self._status_label,
+                text = f"Not saved: {len(result)} rows were changed by "
+                f"others since read ({keys}). Discard to reload them.")
+        else:
+            self._notice = f"Saved in {edits.round_trips} round trips. "
+            if self._prefetcher is not None:
+                self._prefetcher.invalidate(self._database_name,
+                                            self._browser.table)
+            self._load_table(self._browser.table)
+            
+    def _discard(self):
+        """
+        Forget all edits, showing the table again.
+        """
+        if self._browser is not None:
+            self._load_table(self._browser.table)
+    # ----------------------------^ Editing ^---------------------------- #
+    
+    def destroy(self):
+        """
+        Stop the worker thread (after its current work) and destroy the 
+        window.
+        """
+        self._jobs.put(None)
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+        tk.Toplevel.destroy(self)
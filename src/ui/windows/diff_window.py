@@ -0,0 +1,326 @@
+import queue
+import threading
+import tkinter as tk
+from typing import Callable, List
+import mysql.connector
+
+from ui.ui_components import UIComponents
+from core.data_diff import TableDiff
+
+class DiffWindow(tk.Toplevel):
+    """
+    Window that compares a table between two open connections (e.g. a 
+    source and its replica) using chunked checksums, listing the rows that
+    differ. Selecting a difference shows the source and target rows side
+    by side. The comparison runs in the background on side connections.
+
+    Args:
+        ui_components (UIComponents): UIComponents singleton instance.
+        connection_names (List[str]): Names of the open connections.
+        side_connection_factory (Callable): Returns a new connection for a
+            connection name.
+    """
+    POLL_INTERVAL_MS = 100
+    # Differing rows shown in the treeview
+    MAX_SHOWN = 10000
+    
+    def __init__(self, 
+                 ui_components: UIComponents,
+                 connection_names: List[str],
+                 side_connection_factory: Callable[
+                     [str], mysql.connector.MySQLConnection]):
+        tk.Toplevel.__init__(self)
+        
+        self._ui_components = ui_components
+        self._connection_names = connection_names
+        self._side_connection_factory = side_connection_factory
+        self._messages = queue.Queue()
+        self._diff = None
+        self._stop_requested = False
+        self._found = 0
+        self._poll_id = None
+        # Compared connection names, and the keys of the shown differences
+        self._compared_names = ()
+        self._keys = []
+        self._row_messages = queue.Queue()
+        self._fetching = 0
+        self._rows_poll_id = None
+        self._rows_treeview = None
+        
+        self.title("Compare Data")
+        self.geometry("700x500")
+        self.resizable(True, True)
+        
+        self._create_widgets()
+        
+    def _create_widgets(self):
+        """
+        Create widgets for the diff window:
+            - Source / Target: connections to compare
+            - Schema / Table: the table to compare
+            - Compare / Stop: buttons that start and stop the comparison
+            - Differences: treeview of differing rows
+            - Rows: the selected difference's source and target rows
+            - Status: label that displays progress
+        """
+        form_frame = tk.Frame(self)
+        labels = [self._ui_components.create_label(form_frame, text)
+                  for text in ("Source", "Target", "Schema", "Table")]
+        self._source_combobox = self._ui_components.create_combobox(
+            parent = form_frame,
+            width = 30,
+            values = self._connection_names
+        )
+        self._target_combobox = self._ui_components.create_combobox(
+            parent = form_frame,
+            width = 30,
+            values = self._connection_names
+        )
+        if len(self._connection_names) > 1:
+            self._target_combobox.current(1)
+        self._schema_entry = self._ui_components.create_entry(form_frame, 33)
+        self._table_entry = self._ui_components.create_entry(form_frame, 33)
+        self._compare_btn = self._ui_components.create_button(
+            parent = form_frame,
+            text = "Compare",
+            command = self._start
+        )
+        self._stop_btn = self._ui_components.create_button(
+            parent = form_frame,
+            text = "Stop",
+            command = self._stop
+        )
+        self._stop_btn.state(["disabled"])
+        close_btn = self._ui_components.create_button(
+            parent = form_frame,
+            text = "Close",
+            event = "CLOSE_WINDOW",
+            event_data = {"window_name": "diff_window"}
+        )
+        self._status_label = self._ui_components.create_label(
+            parent = self,
+            text = "Choose two connections and a table"
+        )
+        self._treeview = self._ui_components.create_treeview(
+            parent = self,
+            columns = ["Difference", "Primary key"],
+            column_width = 200
+        )
+        self._treeview.bind("<<TreeviewSelect>>", 
+                            lambda _event: self._select_difference())
+        self._rows_frame = tk.Frame(self)
+        
+        form_frame.pack(side = tk.TOP, fill = tk.X)
+        for row, (label, widget) in enumerate(zip(labels, (
+                self._source_combobox, self._target_combobox,
+                self._schema_entry, self._table_entry))):
+            label.grid(row = row, column = 0, padx = 5, pady = 2, 
+                       sticky = tk.W)
+            widget.grid(row = row, column = 1, padx = 5, pady = 2)
+        self._compare_btn.grid(row = 0, column = 2, padx = 5, pady = 2)
+        self._stop_btn.grid(row = 1, column = 2, padx = 5, pady = 2)
+        close_btn.grid(row = 3, column = 2, padx = 5, pady = 2)
+        self._status_label.pack(side = tk.BOTTOM, fill = tk.X)
+        self._rows_frame.pack(side = tk.BOTTOM, fill = tk.X)
+        self._treeview.master.pack(side = tk.TOP, fill = tk.BOTH, 
+                                   expand = True)
+    
+    def _start(self):
+        """
+        Start comparing the chosen table in the background.
+        """
+        source_name = self._source_combobox.get()
+        target_name = self._target_combobox.get()
+        schema = self._schema_entry.get().strip()
+        table = self._table_entry.get().strip()
+        if not (source_name and target_name and schema and table):
+            self._ui_components.configure_later(
+                self._status_label,
+                text = "Choose two connections and a table")
+            return
+        self._compare_btn.state(["disabled"])
+        self._stop_btn.state(["!disabled"])
+        # Rows of the previous comparison may still be queued for display
+        self._ui_components.cancel_updates(self._treeview)
+        self._treeview.delete(*self._treeview.get_children())
+        self._diff = None
+        self._stop_requested = False
+        self._found = 0
+        self._compared_names = (source_name, target_name)
+        self._keys = []
+        threading.Thread(
+            target = self._compare,
+            args = (source_name, target_name, schema, table),
+            daemon = True).start()
+        self._poll()
+        
+    def _compare(self, source_name: str, target_name: str, schema: str,
+                 table: str):
+        """
+        Compare the table, passing progress and differing rows back 
+        through the message queue (worker thread).
+        
+        Args:
+            source_name (str): Name of the source connection
+            target_name (str): Name of the target connection
+            schema (str): The schema of the table
+            table (str): The table to compare
+        """
+        source = target = None
+        try:
+            source = self._side_connection_factory(source_name)
+            target = self._side_connection_factory(target_name)
+            self._diff = TableDiff(source, target, schema, table)
+            # Stop was pressed before there was a comparison to stop
+            if self._stop_requested:
+                self._diff.stop()
+            for difference in self._diff.differences(
+                    lambda message: self._messages.put(("progress", 
+                                                        message))):
+                self._messages.put(("row", difference))
+            self._messages.put(("done", "Comparison finished"))
+        except (mysql.connector.Error, ValueError) as err:
+            self._messages.put(("done", f"Comparison failed: {err}"))
+        finally:
+            for connection in (source, target):
+                if connection is not None:
+                    connection.close()
+    
+    def _poll(self):
+        """
+        Show progress and differing rows as they arrive.
+        """
+        self._poll_id = None
+        finished = None
+        rows = []
+        while not self._messages.empty():
+            kind, message = self._messages.get_nowait()
+            if kind == "row":
+                self._found += 1
+                if self._found <= self.MAX_SHOWN:
+                    self._keys.append(message.key)
+                    rows.append((message.kind, 
+                                 ", ".join(map(str, message.key))))
+            elif kind == "progress":
+                self._ui_components.configure_later(self._status_label,
+                                                    text = message)
+            else:
+                finished = message
+        if rows:
+            self._ui_components.append_items(self._treeview, rows)
+        if finished is None:
+            self._poll_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+            return
+        compared = ""
+        if self._diff is not None:
+            compared = f", {self._diff.chunks_compared} chunks and " \
+                f"{self._diff.rows_compared} rows compared"
+        self._ui_components.configure_later(
+            self._status_label,
+            text = f"{finished}: {self._found} rows differ{compared}")
+        self._compare_btn.state(["!disabled"])
+        self._stop_btn.state(["disabled"])
+    
+    def _select_difference(self):
+        """
+        Fetch the rows of the selected difference from both connections in
+        the background, to show them side by side.
+        """
+        selection = self._treeview.selection()
+        if not selection or self._diff is None:
+            return
+        index = self._treeview.index(selection[0])
+        if index >= len(self._keys):
+            return
+        self._fetching += 1
+        threading.Thread(
+            target = self._fetch_rows,
+            args = (self._diff, self._compared_names, self._keys[index]),
+            daemon = True).start()
+        if self._rows_poll_id is None:
+            self._poll_rows()
+    
+    def _fetch_rows(self, diff: TableDiff, names: tuple, key: tuple):
+        """
+        Fetch a row by primary key from the source and the target, on new
+        side connections (worker thread).
+        
+        Args:
+            diff (TableDiff): The comparison the row was found by
+            names (tuple): Names of the source and target connections
+            key (tuple): The primary key of the row
+        """
+        try:
+            rows = []
+            for side, name in zip(("Source", "Target"), names):
+                connection = self._side_connection_factory(name)
+                try:
+                    columns, found = diff.fetch_rows(connection, [key])
+                finally:
+                    connection.close()
+                rows += [(side, *row) for row in found] or \
+                    [(side, "(missing)")]
+            self._row_messages.put((columns, rows))
+        except (mysql.connector.Error, ValueError) as err:
+            self._row_messages.put((None, f"Could not fetch rows: {err}"))
+    
+    def _poll_rows(self):
+        """
+        Show the latest fetched source and target rows, once fetched.
+        """
+        self._rows_poll_id = None
+        result = None
+        while not self._row_messages.empty():
+            result = self._row_messages.get_nowait()
+            self._fetching -= 1
+        if result is not None:
+            columns, rows = result
+            if columns is None:
+                self._ui_components.configure_later(
+                    self._status_label, text = rows)
+            else:
+                self._show_rows(columns, rows)
+        if self._fetching > 0:
+            self._rows_poll_id = self.after(self.POLL_INTERVAL_MS, 
+                                            self._poll_rows)
+    
+    def _show_rows(self, columns: List[str], rows: List[tuple]):
+        """
+        Replace the displayed source and target rows.
+        
+        Args:
+            columns (List[str]): The table's column names
+            rows (List[tuple]): The rows, each prefixed with its side
+        """
+        if self._rows_treeview is not None:
+            self._rows_treeview.master.destroy()
+        self._rows_treeview = self._ui_components.create_treeview(
+            parent = self._rows_frame,
+            columns = ["Side"] + columns,
+            height = 3
+        )
+        self._ui_components.set_items(self._rows_treeview, rows)
+        self._rows_treeview.master.pack(side = tk.TOP, fill = tk.X)
+    
+    def _stop(self):
+        """
+        Stop the comparison after the current range.
+        """
+        self._stop_requested = True
+        if self._diff is not None:
+            self._diff.stop()
+        self._ui_components.configure_later(
+            self._status_label, text = "Stopping...")
+        
+    def destroy(self):
+        """
+        Stop the comparison (if running) and destroy the window.
+        """
+        self._stop_requested = True
+        if self._diff is not None:
+            self._diff.stop()
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+        if self._rows_poll_id is not None:
+            self.after_cancel(self._rows_poll_id)
+        tk.Toplevel.destroy(self)
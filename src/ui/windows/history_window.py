@@ -0,0 +1,170 @@
+import queue
+import time
+import tkinter as tk
+
+from ui.ui_components import UIComponents
+from core.query_history import QueryHistory
+
+class HistoryWindow(tk.Toplevel):
+    """
+    Window to search the query history, and to list the slowest recurring
+    queries (per-fingerprint count and latency percentiles).
+
+    Args:
+        ui_components (UIComponents): UIComponents singleton instance.
+        query_history (QueryHistory): The query history to display.
+    """
+    POLL_INTERVAL_MS = 50
+    
+    def __init__(self, 
+                 ui_components: UIComponents,
+                 query_history: QueryHistory):
+        tk.Toplevel.__init__(self)
+        
+        self._ui_components = ui_components
+        self._query_history = query_history
+        self._treeview = None
+        self._results = queue.Queue()
+        self._poll_id = None
+        
+        self.title("Query History")
+        self.geometry("900x500")
+        self.resizable(True, True)
+        
+        self._create_widgets()
+        self._search()
+        
+    def _create_widgets(self):
+        """
+        Create widgets for the history window:
+            - Search: entry and button to search query text
+            - Slowest: button that lists queries by total time, with 
+              count and p50/p95 latency
+            - Close: button that closes the window
+        """
+        search_frame = tk.Frame(self)
+        self._search_entry = self._ui_components.create_entry(
+            parent = search_frame, 
+            width = 50
+        )
+        self._search_entry.bind("<Return>", lambda _event: self._search())
+        search_btn = self._ui_components.create_button(
+            parent = search_frame,
+            text = "Search",
+            command = self._search
+        )
+        slowest_btn = self._ui_components.create_button(
+            parent = search_frame,
+            text = "Slowest",
+            command = self._show_slowest
+        )
+        close_btn = self._ui_components.create_button(
+            parent = search_frame,
+            text = "Close",
+            event = "CLOSE_WINDOW",
+            event_data = {"window_name": "history_window"}
+        )
+        
+        search_frame.pack(side = tk.TOP, fill = tk.X)
+        self._search_entry.pack(side = tk.LEFT, padx = 5, pady = 5)
+        search_btn.pack(side = tk.LEFT, padx = 5, pady = 5)
+        slowest_btn.pack(side = tk.LEFT, padx = 5, pady = 5)
+        close_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+        
+    def _show_rows(self, columns, rows):
+        """
+        Replace the displayed treeview with one showing the given rows.
+        
+        Args:
+            columns (List[str]): The column headings
+            rows (List[tuple]): The rows to display
+        """
+        if self._treeview is not None:
+            self._treeview.master.destroy()
+        self._treeview = self._ui_components.create_treeview(
+            parent = self,
+            columns = columns
+        )
+        self._ui_components.set_items(self._treeview, rows)
+        self._treeview.master.pack(side = tk.TOP, fill = tk.BOTH, 
+                                   expand = True)
+        
+    def _read(self, read, show):
+        """
+        Read the history on its writer thread, once the queries still 
+        queued for writing are written, and show the result when polled.
+        
+        Args:
+            read (Callable): Reads the history, returns the result
+            show (Callable): Displays the result (Tk thread)
+        """
+        self._query_history.when_written(
+            lambda: self._results.put((show, read())))
+        if self._poll_id is None:
+            self._poll()
+    
+    def _poll(self):
+        """
+        Display history reads that have completed.
+        """
+        self._poll_id = None
+        while not self._results.empty():
+            show, result = self._results.get_nowait()
+            show(result)
+        self._poll_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+        
+    def _search(self):
+        """
+        Show the most recent queries matching the search text.
+        """
+        text = self._search_entry.get()
+        self._read(lambda: self._query_history.search(text), 
+                   self._show_entries)
+    
+    def _show_entries(self, entries):
+        """
+        Display history entries.
+        
+        Args:
+            entries (List[Dict[str, Any]]): The entries, from search()
+        """
+        self._show_rows(
+            ["Time", "Connection", "Duration (s)", "Rows", "Error", "SQL"],
+            [(time.strftime("%Y-%m-%d %H:%M:%S", 
+                            time.localtime(entry["executed_at"])),
+              entry["connection"], f"{entry['duration']:.4f}",
+              entry["rows"], entry["error"] or "", 
+              " ".join(entry["sql"].split()))
+             for entry in entries]
+        )
+        
+    def _show_slowest(self):
+        """
+        Show recurring queries, by total time spent running them.
+        """
+        self._read(self._query_history.aggregates, self._show_aggregates)
+    
+    def _show_aggregates(self, aggregates):
+        """
+        Display per-fingerprint statistics.
+        
+        Args:
+            aggregates (List[Dict[str, Any]]): The statistics, from 
+                aggregates()
+        """
+        self._show_rows(
+            ["Count", "Total (s)", "p50 (s)", "p95 (s)", "Max (s)", 
+             "Errors", "Fingerprint"],
+            [(stats["count"], f"{stats['total']:.3f}", 
+              f"{stats['p50']:.4f}", f"{stats['p95']:.4f}", 
+              f"{stats['max']:.4f}", stats["errors"], stats["fingerprint"])
+             for stats in aggregates]
+        )
+        
+    def destroy(self):
+        """
+        Stop polling and destroy the window.
+        """
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+        tk.Toplevel.destroy(self)
@@ -90,6 +90,16 @@ class NewConnectionWindow(tk.Toplevel):
             "Failed to connect to the server. Please check your credentials and try again."
         )        
     # -------------------------^ Event Callbacks ^------------------------- #
+    
+    def destroy(self):
+        """
+        Unsubscribe from events and destroy the window, so the event 
+        system does not keep the closed window alive.
+        """
+        self._ui_components.unsubscribe(
+            "CONNECT_SERVER_FAIL", 
+            self._connect_fail)
+        tk.Toplevel.destroy(self)
         
         
         
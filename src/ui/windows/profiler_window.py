@@ -0,0 +1,175 @@
+import tkinter as tk
+
+from ui.ui_components import UIComponents
+from core.query_handle import QueryHandle
+import core.query_profiler as profiler
+
+class ProfilerWindow(tk.Toplevel):
+    """
+    Window that displays the plan of a query as a tree, from EXPLAIN 
+    FORMAT=JSON (estimates) or EXPLAIN ANALYZE (estimates and actual rows
+    and time per node), flagging full scans and filesorts. After EXPLAIN
+    ANALYZE, the statement's stage timings are listed too.
+    The EXPLAIN runs in the background and can be cancelled.
+
+    Args:
+        ui_components (UIComponents): UIComponents singleton instance.
+        handle (QueryHandle): The (started) EXPLAIN statement; after
+            EXPLAIN ANALYZE, its follow-up reads the stage timings.
+        analyze (bool): Whether the statement is an EXPLAIN ANALYZE.
+    """
+    POLL_INTERVAL_MS = 50
+    COLUMNS = ["Est. rows", "Actual rows", "Est. cost", "Actual time (ms)", 
+               "Loops", "Flags"]
+    
+    def __init__(self, 
+                 ui_components: UIComponents,
+                 handle: QueryHandle,
+                 analyze: bool):
+        tk.Toplevel.__init__(self)
+        
+        self._ui_components = ui_components
+        self.handle = handle
+        self._analyze = analyze
+        self._poll_id = None
+        
+        self.title("Query Profile")
+        self.geometry("1000x600")
+        self.resizable(True, True)
+        
+        self._create_widgets()
+        self._poll()
+        
+    def _create_widgets(self):
+        """
+        Create widgets for the profiler window:
+            - Plan: tree of plan nodes, flagged nodes highlighted
+            - Stages: listbox of stage timings (EXPLAIN ANALYZE only)
+            - Status: label that displays the EXPLAIN's state
+            - Cancel: button that cancels the EXPLAIN
+            - Close: button that closes the window
+        """
+        button_frame = tk.Frame(self)
+        self._status_label = self._ui_components.create_label(
+            parent = button_frame,
+            text = self.handle.status()
+        )
+        self._cancel_btn = self._ui_components.create_button(
+            parent = button_frame,
+            text = "Cancel",
+            command = self._cancel
+        )
+        close_btn = self._ui_components.create_button(
+            parent = button_frame,
+            text = "Close",
+            event = "CLOSE_WINDOW",
+            event_data = {"window_name": "profiler_window"}
+        )
+        self._plan_treeview = self._ui_components.create_treeview(
+            parent = self,
+            columns = self.COLUMNS,
+            height = 20,
+            column_width = 100,
+            tree_heading = "Operation"
+        )
+        self._plan_treeview.tag_configure("flagged", foreground = "red")
+        self._stages_listbox = self._ui_components.create_listbox(
+            parent = self,
+            width = 60,
+            height = 8,
+            items_list = []
+        )
+        
+        button_frame.pack(side = tk.BOTTOM, fill = tk.X)
+        self._status_label.pack(side = tk.LEFT, padx = 5, pady = 5)
+        close_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+        self._cancel_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+        if self._analyze:
+            self._stages_listbox.pack(side = tk.BOTTOM, fill = tk.X)
+        self._plan_treeview.master.pack(side = tk.TOP, fill = tk.BOTH,
+                                        expand = True)
+    
+    def _poll(self):
+        """
+        Check whether the EXPLAIN is done, showing the plan if it is.
+        """
+        if self.handle.done():
+            self._show_profile()
+        else:
+            self._poll_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+    
+    def _show_profile(self):
+        """
+        Display the plan tree and, after EXPLAIN ANALYZE, stage timings.
+        """
+        self._cancel_btn.state(["disabled"])
+        self._status_label.configure(text = self.handle.status())
+        if self.handle.error is not None or not self.handle.rows:
+            return
+        try:
+            root = profiler.parse_plan(self.handle.rows[0][0], 
+                                       self._analyze)
+        except (ValueError, KeyError) as err:
+            self._status_label.configure(
+                text = f"Could not parse plan: {err}")
+            return
+        self._insert_node("", root)
+        flagged = sum(1 for node in root.walk() if node.flags)
+        self._status_label.configure(
+            text = f"{self.handle.status()}, {flagged} flagged nodes")
+        if self._analyze:
+            # Read on the EXPLAIN's worker thread, see _profile_query
+            stages = self.handle.follow_up_result
+            if not stages:
+                stages = [("No stages: enable stage/% instruments and the "
+                           "events_stages_history consumer", 0.0)]
+            self._ui_components.set_items(self._stages_listbox, [
+                f"{name:<45} {ms:>10.3f} ms" for name, ms in stages])
+            
+    def _insert_node(self, parent: str, node: profiler.PlanNode):
+        """
+        Insert a plan node and its children into the plan treeview.
+        
+        Args:
+            parent (str): The treeview item to insert under ("" for root)
+            node (PlanNode): The node to insert
+        """
+        def show(value, fmt = "{:g}"):
+            return "" if value is None else fmt.format(value)
+        item = self._plan_treeview.insert(
+            parent, tk.END, text = node.label, open = True,
+            tags = ("flagged",) if node.flags else (),
+            values = (show(node.estimated_rows), show(node.actual_rows),
+                      show(node.estimated_cost), 
+                      show(node.actual_time, "{:.3f}"), show(node.loops), 
+                      ", ".join(node.flags)))
+        for child in node.children:
+            self._insert_node(item, child)
+    
+    def _cancel(self):
+        """
+        Cancel the running EXPLAIN.
+        """
+        self.handle.cancel()
+        self._status_label.configure(text = "Cancelling...")
+        
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the EXPLAIN has stopped using the connection.
+        
+        Args:
+            timeout (Optional [float]): Maximum time to wait in seconds
+            
+        Returns:
+            bool: True if the EXPLAIN is done
+        """
+        return self.handle.wait(timeout)
+        
+    def destroy(self):
+        """
+        Cancel the EXPLAIN (if still running) and destroy the window.
+        """
+        self.handle.cancel()
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+        tk.Toplevel.destroy(self)
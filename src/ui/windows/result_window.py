@@ -0,0 +1,120 @@
+import tkinter as tk
+
+from ui.ui_components import UIComponents
+from core.query_handle import QueryHandle
+
+class ResultWindow(tk.Toplevel):
+    """
+    Window that displays the result of a query run through a QueryHandle.
+    The query runs in the background, while it runs the window can be 
+    used to cancel it. Closing the window also cancels the query.
+
+    Args:
+        ui_components (UIComponents): UIComponents singleton instance.
+        handle (QueryHandle): The (started) query to display.
+        window_name (str): The name the window is registered under.
+    """
+    POLL_INTERVAL_MS = 50
+    
+    def __init__(self, 
+                 ui_components: UIComponents,
+                 handle: QueryHandle,
+                 window_name: str = "result_window"):
+        tk.Toplevel.__init__(self)
+        
+        self._ui_components = ui_components
+        self.handle = handle
+        self._window_name = window_name
+        self._treeview = None
+        self._poll_id = None
+        
+        self.title("Query Result")
+        self.geometry("800x500")
+        self.resizable(True, True)
+        
+        self._create_widgets()
+        self._poll()
+        
+    def _create_widgets(self):
+        """
+        Create widgets for the result window:
+            - Status: label that displays the query's state
+            - Cancel: button that cancels the running query
+            - Close: button that closes the window
+        The result treeview is created once the query is done.
+        """
+        self._button_frame = tk.Frame(self)
+        self._status_label = self._ui_components.create_label(
+            parent = self._button_frame,
+            text = self.handle.status()
+        )
+        self._cancel_btn = self._ui_components.create_button(
+            parent = self._button_frame,
+            text = "Cancel",
+            command = self._cancel
+        )
+        self._close_btn = self._ui_components.create_button(
+            parent = self._button_frame,
+            text = "Close",
+            event = "CLOSE_WINDOW",
+            event_data = {"window_name": self._window_name}
+        )
+        
+        self._button_frame.pack(side = tk.BOTTOM, fill = tk.X)
+        self._status_label.pack(side = tk.LEFT, padx = 5, pady = 5)
+        self._close_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+        self._cancel_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+    
+    def _poll(self):
+        """
+        Check whether the query is done, showing the result if it is.
+        """
+        if self.handle.done():
+            self._show_result()
+        else:
+            self._poll_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+            
+    def _show_result(self):
+        """
+        Display the query's status and, if any, its rows.
+        """
+        self._cancel_btn.state(["disabled"])
+        self._status_label.configure(text = self.handle.status())
+        if not self.handle.columns:
+            return
+        self._treeview = self._ui_components.create_treeview(
+            parent = self,
+            columns = self.handle.columns
+        )
+        # Large results are inserted over several frames
+        self._ui_components.set_items(self._treeview, self.handle.rows)
+        self._treeview.master.pack(side = tk.TOP, fill = tk.BOTH, 
+                                   expand = True)
+    
+    def _cancel(self):
+        """
+        Cancel the running query.
+        """
+        self.handle.cancel()
+        self._status_label.configure(text = "Cancelling...")
+        
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the query has stopped using the connection.
+        
+        Args:
+            timeout (Optional [float]): Maximum time to wait in seconds
+            
+        Returns:
+            bool: True if the query is done
+        """
+        return self.handle.wait(timeout)
+        
+    def destroy(self):
+        """
+        Cancel the query (if still running) and destroy the window.
+        """
+        self.handle.cancel()
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+        tk.Toplevel.destroy(self)
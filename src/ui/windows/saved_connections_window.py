@@ -96,10 +96,8 @@ class SavedConnectionsWindow(tk.Toplevel):
         Update the saved connections listbox.
         """
         self._saved_connections = self.connection_manager.get_connections()
-        self.saved_connections_listbox.delete(0, tk.END)
-        
-        for connection in self._saved_connections.keys():
-            self.saved_connections_listbox.insert(tk.END, connection)
+        self._ui_components.set_items(self.saved_connections_listbox,
+                                      list(self._saved_connections.keys()))
             
     def _use_saved_connection(self):
         """
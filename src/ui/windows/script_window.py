@@ -0,0 +1,155 @@
+import queue
+import threading
+import tkinter as tk
+
+from ui.ui_components import UIComponents
+from core.script_runner import ScriptRunner
+
+class ScriptWindow(tk.Toplevel):
+    """
+    Window that runs a SQL script through a ScriptRunner in the 
+    background, listing each statement's result as it arrives.
+    The script can be stopped, closing the window also stops it.
+
+    Args:
+        ui_components (UIComponents): UIComponents singleton instance.
+        runner (ScriptRunner): The runner of the script to run.
+        window_name (str): The name the window is registered under.
+    """
+    POLL_INTERVAL_MS = 100
+    
+    def __init__(self, 
+                 ui_components: UIComponents,
+                 runner: ScriptRunner,
+                 window_name: str = "script_window"):
+        tk.Toplevel.__init__(self)
+        
+        self._ui_components = ui_components
+        self._runner = runner
+        self._window_name = window_name
+        self._results = queue.Queue()
+        self._finished = threading.Event()
+        self._poll_id = None
+        
+        self.title("Script")
+        self.geometry("800x500")
+        self.resizable(True, True)
+        
+        self._create_widgets()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._poll()
+        
+    def _create_widgets(self):
+        """
+        Create widgets for the script window:
+            - Log: listbox of statement results and errors
+            - Status: label that displays progress
+            - Stop: button that stops the script
+            - Close: button that closes the window
+        """
+        button_frame = tk.Frame(self)
+        self._log_listbox = self._ui_components.create_listbox(
+            parent = self,
+            width = 100,
+            height = 25,
+            items_list = []
+        )
+        self._status_label = self._ui_components.create_label(
+            parent = button_frame,
+            text = f"0/{len(self._runner.statements)} statements"
+        )
+        self._stop_btn = self._ui_components.create_button(
+            parent = button_frame,
+            text = "Stop",
+            command = self._stop
+        )
+        close_btn = self._ui_components.create_button(
+            parent = button_frame,
+            text = "Close",
+            event = "CLOSE_WINDOW",
+            event_data = {"window_name": self._window_name}
+        )
+        
+        button_frame.pack(side = tk.BOTTOM, fill = tk.X)
+        self._log_listbox.pack(side = tk.TOP, fill = tk.BOTH, expand = True)
+        self._status_label.pack(side = tk.LEFT, padx = 5, pady = 5)
+        close_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+        self._stop_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+    
+    def _run(self):
+        """
+        Run the script, queueing a log line per statement (worker thread).
+        """
+        try:
+            for result in self._runner.run():
+                statement = " ".join(result.statement.split())[:80]
+                if result.error is not None:
+                    line = f"#{result.index + 1} ERROR {result.error}" \
+                        f" -- {statement}"
+                elif result.columns:
+                    line = f"#{result.index + 1} {len(result.rows)} rows" \
+                        f" -- {statement}"
+                else:
+                    line = f"#{result.index + 1} OK, {result.rowcount} " \
+                        f"affected -- {statement}"
+                self._results.put(line)
+        except Exception as err:
+            self._results.put(f"Script aborted: {err}")
+        finally:
+            self._finished.set()
+    
+    def _poll(self):
+        """
+        Move queued log lines into the listbox and update the progress.
+        """
+        lines = []
+        while not self._results.empty():
+            lines.append(self._results.get_nowait())
+        if lines:
+            self._ui_components.append_items(self._log_listbox, lines)
+            self._ui_components.schedule_update(
+                (str(self._log_listbox), "see"), self._log_listbox,
+                self._log_listbox.see, tk.END)
+        status = f"{self._runner.executed}/{len(self._runner.statements)}" \
+            f" statements, {self._runner.errors} errors, " \
+            f"{self._runner.round_trips} round trips"
+        if self._finished.is_set() and self._results.empty():
+            self._stop_btn.state(["disabled"])
+            if self._runner.stopped():
+                status += " (stopped)"
+            self._ui_components.configure_later(self._status_label,
+                                                text = status + " - Done")
+        else:
+            self._ui_components.configure_later(self._status_label,
+                                                text = status)
+            self._poll_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+    
+    def _stop(self):
+        """
+        Stop the script after the current round trip.
+        """
+        self._runner.stop()
+        self._ui_components.configure_later(
+            self._status_label, text = "Stopping...")
+        
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until the script has stopped using the connection.
+        
+        Args:
+            timeout (Optional [float]): Maximum time to wait in seconds
+            
+        Returns:
+            bool: True if the script is done
+        """
+        return self._finished.wait(timeout)
+        
+    def destroy(self):
+        """
+        Stop the script (if still running) and destroy the window.
+        """
+        self._runner.stop()
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+        tk.Toplevel.destroy(self)
@@ -1,8 +1,11 @@
 
 import tkinter as tk
+from typing import Optional
 import mysql.connector
 
 from ui.ui_components import UIComponents
+from core.autocomplete import CompletionEngine
+from core.prefetcher import Prefetcher
 import database
 
 class ServerWindow(tk.Toplevel):
@@ -13,15 +16,32 @@ class ServerWindow(tk.Toplevel):
     Args:
         ui_components (UIComponents): UIComponents singleton instance.
         connection (mysql.connector.MySQLConnection): MySQL connection instance.
+        completion_engine (Optional [CompletionEngine]): Schema completion
+            for the query text.
+        prefetcher (Optional [Prefetcher]): Prefetches the database that
+            is selected or hovered in the databases listbox.
     """
+    # Completions listed while typing a query
+    MAX_COMPLETIONS = 50
+    # Time the pointer must rest on a database before it is prefetched
+    PREFETCH_DELAY_MS = 250
     
     def __init__(self, 
                  ui_components: UIComponents, 
-                 connection: mysql.connector.MySQLConnection):
+                 connection: mysql.connector.MySQLConnection,
+                 completion_engine: Optional[CompletionEngine] = None,
+                 prefetcher: Optional[Prefetcher] = None):
         tk.Toplevel.__init__(self)
         
         self._ui_components = ui_components
         self._connection = connection
+        self._completion_engine = completion_engine
+        self._completion_prefix = ""
+        self._prefetcher = prefetcher
+        self._databases = []
+        # Database index the pending (or last) prefetch is for
+        self._prefetch_index = None
+        self._prefetch_id = None
         
         self.title(f"Server: {self._connection.server_host}")
         self.geometry("800x600")
@@ -37,9 +57,21 @@ class ServerWindow(tk.Toplevel):
             - Status: label that displays the server's status
             - Refresh: button that refreshes the databases list and status
             - Disconnect: button that disconnects from the server
+            - Query: text to enter a query, with a Run button, timeout
+              entry and a toggle to also enforce the timeout server-side
+            - Completions: listbox of schema names completing the word
+              being typed, Tab inserts the selected (or first) one
+            - Run Script: button that runs a SQL script file
+            - History: button that opens the query history
+            - Profile: button that shows the query's plan, with a toggle
+              to measure it with EXPLAIN ANALYZE
+            - Index Advisor: button that opens the index advisor
+            - Compare Data: button that compares a table between two 
+              open connections
         """
         # Create listbox to display databases
         databases = database.show_databases(self._connection)
+        self._databases = databases
         database_listbox = self._ui_components.create_listbox(
             parent = self, 
             width = 80, 
@@ -47,6 +79,21 @@ class ServerWindow(tk.Toplevel):
             items_list = databases, 
             selectmode = "single"
         )
+        # Load the database the user is about to open ahead of time
+        database_listbox.bind(
+            "<<ListboxSelect>>", lambda event: self._schedule_prefetch(
+                database_listbox.curselection()[0], 0)
+            if database_listbox.curselection() else None)
+        database_listbox.bind(
+            "<Motion>", lambda event: self._schedule_prefetch(
+                database_listbox.nearest(event.y), self.PREFETCH_DELAY_MS))
+        # Leaving the listbox (e.g. for the Use button) goes back to the
+        # selected database, if any
+        database_listbox.bind(
+            "<Leave>", lambda event: self._schedule_prefetch(
+                database_listbox.curselection()[0], 0)
+            if database_listbox.curselection() 
+            else self._cancel_prefetch())
         
         # Create button to use selected database
         use_button = self._ui_components.create_button(
@@ -59,13 +106,256 @@ class ServerWindow(tk.Toplevel):
         )
         
         # Create label to display server status
-        status_label = self._ui_components.create_label(
+        self._status_label = self._ui_components.create_label(
             parent = self, 
             text = "Status: Connected", 
             width = 400
         )
         
+        # Create query entry, with timeout options and run button
+        query_frame = tk.Frame(self)
+        self._query_text = self._ui_components.create_text(
+            parent = query_frame,
+            width = 60,
+            height = 10
+        )
+        self._completion_listbox = self._ui_components.create_listbox(
+            parent = query_frame,
+            width = 30,
+            height = 10,
+            items_list = []
+        )
+        self._query_text.bind("<KeyRelease>", self._update_completions)
+        self._query_text.bind("<Tab>", self._accept_completion)
+        self._completion_listbox.bind(
+            "<Double-Button-1>", self._accept_completion)
+        timeout_label = self._ui_components.create_label(
+            parent = query_frame,
+            text = "Timeout (s)"
+        )
+        self._timeout_entry = self._ui_components.create_entry(
+            parent = query_frame,
+            width = 8
+        )
+        self._server_timeout = tk.BooleanVar(self, value = False)
+        server_timeout_check = self._ui_components.create_checkbutton(
+            parent = query_frame,
+            text = "Server-side limit",
+            variable = self._server_timeout
+        )
+        run_button = self._ui_components.create_button(
+            parent = query_frame,
+            text = "Run",
+            command = self._run_query
+        )
+        self._stop_on_error = tk.BooleanVar(self, value = True)
+        stop_on_error_check = self._ui_components.create_checkbutton(
+            parent = query_frame,
+            text = "Stop script on error",
+            variable = self._stop_on_error
+        )
+        run_script_button = self._ui_components.create_button(
+            parent = query_frame,
+            text = "Run Script...",
+            command = self._run_script
+        )
+        advisor_button = self._ui_components.create_button(
+            parent = query_frame,
+            text = "Index Advisor",
+            event = "OPEN_WINDOW",
+            event_data = {"window_name": "advisor_window"}
+        )
+        diff_button = self._ui_components.create_button(
+            parent = query_frame,
+            text = "Compare Data",
+            event = "OPEN_WINDOW",
+            event_data = {"window_name": "diff_window"}
+        )
+        self._analyze = tk.BooleanVar(self, value = False)
+        analyze_check = self._ui_components.create_checkbutton(
+            parent = query_frame,
+            text = "EXPLAIN ANALYZE",
+            variable = self._analyze
+        )
+        profile_button = self._ui_components.create_button(
+            parent = query_frame,
+            text = "Profile",
+            command = self._profile_query
+        )
+        history_button = self._ui_components.create_button(
+            parent = query_frame,
+            text = "History",
+            event = "OPEN_WINDOW",
+            event_data = {"window_name": "history_window"}
+        )
+        
         # Place listbox on side, with button underneath, and label on side
         database_listbox.pack(side = tk.LEFT, fill = tk.BOTH)
         use_button.pack(side = tk.LEFT)
-        status_label.pack(side = tk.RIGHT)           
\ No newline at end of file
+        self._status_label.pack(side = tk.RIGHT)
+        query_frame.pack(side = tk.TOP, fill = tk.BOTH, expand = True)
+        self._query_text.grid(row = 0, column = 0, columnspan = 4, 
+                              padx = 5, pady = 5, sticky = tk.NSEW)
+        self._completion_listbox.grid(row = 0, column = 4, padx = 5, 
+                                      pady = 5, sticky = tk.NS)
+        timeout_label.grid(row = 1, column = 0, padx = 5, pady = 5)
+        self._timeout_entry.grid(row = 1, column = 1, padx = 5, pady = 5)
+        server_timeout_check.grid(row = 1, column = 2, padx = 5, pady = 5)
+        run_button.grid(row = 1, column = 3, padx = 5, pady = 5, 
+                        sticky = tk.E)
+        stop_on_error_check.grid(row = 2, column = 2, padx = 5, pady = 5)
+        run_script_button.grid(row = 2, column = 3, padx = 5, pady = 5,
+                               sticky = tk.E)
+        history_button.grid(row = 2, column = 0, padx = 5, pady = 5,
+                            sticky = tk.W)
+        advisor_button.grid(row = 3, column = 0, padx = 5, pady = 5,
+                            sticky = tk.W)
+        diff_button.grid(row = 3, column = 1, padx = 5, pady = 5)
+        analyze_check.grid(row = 3, column = 2, padx = 5, pady = 5)
+        profile_button.grid(row = 3, column = 3, padx = 5, pady = 5,
+                            sticky = tk.E)
+        
+    def set_status(self, status: str):
+        """
+        Display the server's status.
+        
+        Args:
+            status (str): The status text
+        """
+        self._ui_components.configure_later(self._status_label, 
+                                            text = status)
+        
+    def _schedule_prefetch(self, index: int, delay_ms: int):
+        """
+        Prefetch a database once the pointer (or selection) has rested on
+        it, abandoning the prefetch of any other database.
+        
+        Args:
+            index (int): The database's position in the listbox
+            delay_ms (int): Time to wait before prefetching
+        """
+        if self._prefetcher is None or index == self._prefetch_index or \
+                not (0 <= index < len(self._databases)):
+            return
+        self._cancel_prefetch()
+        self._prefetch_index = index
+        self._prefetch_id = self.after(
+            delay_ms, lambda: self._prefetch(self._databases[index][0]))
+        
+    def _prefetch(self, database_name: str):
+        """
+        Prefetch a database.
+        
+        Args:
+            database_name (str): The database
+        """
+        self._prefetch_id = None
+        self._prefetcher.prefetch(database_name)
+    
+    def _cancel_prefetch(self):
+        """
+        Abandon the pending or running prefetch.
+        """
+        if self._prefetch_id is not None:
+            self.after_cancel(self._prefetch_id)
+            self._prefetch_id = None
+        if self._prefetcher is not None:
+            self._prefetcher.cancel()
+        self._prefetch_index = None
+    
+    def _update_completions(self, event = None):
+        """
+        List completions for the word before the cursor.
+        """
+        if self._completion_engine is None or (event is not None and 
+                event.keysym in ("Tab", "Up", "Down")):
+            return
+        before = self._query_text.get("1.0", tk.INSERT)
+        after = self._query_text.get(tk.INSERT, tk.END)
+        # Only the statement being edited
+        before = before[before.rfind(";") + 1:]
+        after = after.split(";", 1)[0]
+        self._completion_prefix, completions = \
+            self._completion_engine.complete(before, after, 
+                                             self.MAX_COMPLETIONS)
+        self._ui_components.set_items(self._completion_listbox, 
+                                      completions)
+    
+    def _accept_completion(self, event = None):
+        """
+        Replace the word before the cursor with the selected completion
+        (or the first one).
+        """
+        if self._completion_listbox.size() == 0:
+            return None     # Default Tab behaviour
+        selected = self._completion_listbox.curselection()
+        completion = self._completion_listbox.get(
+            selected[0] if selected else 0)
+        if self._completion_prefix:
+            self._query_text.delete(
+                f"{tk.INSERT}-{len(self._completion_prefix)}c", tk.INSERT)
+        self._query_text.insert(tk.INSERT, completion)
+        self._query_text.focus_set()
+        self._update_completions()
+        return "break"
+        
+    def _get_timeout(self):
+        """
+        Returns the entered timeout in seconds, or None if there is none.
+        """
+        try:
+            return float(self._timeout_entry.get())
+        except ValueError:
+            return None
+        
+    def _run_query(self):
+        """
+        Publish the entered query to be run, with the entered timeout.
+        """
+        query = self._query_text.get("1.0", tk.END).strip()
+        if not query:
+            return
+        timeout = self._get_timeout()
+        max_execution_time = None
+        if timeout and self._server_timeout.get():
+            max_execution_time = int(timeout * 1000)
+        self._ui_components.publish("RUN_QUERY", {
+            "query": query,
+            "timeout": timeout,
+            "max_execution_time": max_execution_time
+        })           
+        
+    def _profile_query(self):
+        """
+        Publish the entered query to be profiled.
+        """
+        query = self._query_text.get("1.0", tk.END).strip()
+        if not query:
+            return
+        self._ui_components.publish("PROFILE_QUERY", {
+            "query": query,
+            "analyze": self._analyze.get(),
+            "timeout": self._get_timeout()
+        })
+        
+    def _run_script(self):
+        """
+        Ask for a SQL script file, and publish it to be run.
+        """
+        path = self._ui_components.ask_open_file(
+            title = "Run SQL Script",
+            filetypes = [("SQL scripts", "*.sql"), ("All files", "*")]
+        )
+        if not path:
+            return
+        self._ui_components.publish("RUN_SCRIPT", {
+            "path": path,
+            "stop_on_error": self._stop_on_error.get()
+        })
+        
+    def destroy(self):
+        """
+        Abandon any prefetch and destroy the window.
+        """
+        self._cancel_prefetch()
+        tk.Toplevel.destroy(self)
@@ -0,0 +1,167 @@
+import queue
+import tkinter as tk
+from typing import Any, Callable
+
+from ui.ui_components import UIComponents
+
+class ValueWindow(tk.Toplevel):
+    """
+    Window that displays one (possibly very large) cell value, streamed 
+    into it in chunks by a worker thread. At most VIEW_LIMIT characters 
+    are shown, the full value can always be saved to a file.
+
+    Args:
+        ui_components (UIComponents): UIComponents singleton instance.
+        master (tk.Misc): The window the value was opened from.
+        title (str): The window title, e.g. 'table.column'.
+        save (Callable): Called with a path to save the full value to.
+    """
+    POLL_INTERVAL_MS = 50
+    # Characters shown in the text widget, larger values must be saved
+    VIEW_LIMIT = 4 * 1024 * 1024
+    
+    def __init__(self, 
+                 ui_components: UIComponents,
+                 master: tk.Misc,
+                 title: str,
+                 save: Callable[[str], None]):
+        tk.Toplevel.__init__(self, master)
+        
+        self._ui_components = ui_components
+        self._save = save
+        self._chunks = queue.Queue()
+        self._shown = 0
+        self._closed = False
+        self._poll_id = None
+        
+        self.title(title)
+        self.geometry("700x500")
+        self.resizable(True, True)
+        
+        self._create_widgets()
+        self._poll()
+        
+    def _create_widgets(self):
+        """
+        Create widgets for the value window:
+            - Value: read-only text showing the value
+            - Status: label that displays loading progress
+            - Save to file: button that saves the full value
+            - Close: button that closes the window
+        """
+        button_frame = tk.Frame(self)
+        self._value_text = self._ui_components.create_text(
+            parent = self,
+            width = 80,
+            height = 25
+        )
+        self._value_text.configure(state = tk.DISABLED)
+        self._status_label = self._ui_components.create_label(
+            parent = button_frame,
+            text = "Loading..."
+        )
+        save_btn = self._ui_components.create_button(
+            parent = button_frame,
+            text = "Save to file...",
+            command = self._ask_save
+        )
+        close_btn = self._ui_components.create_button(
+            parent = button_frame,
+            text = "Close",
+            command = self.destroy
+        )
+        
+        button_frame.pack(side = tk.BOTTOM, fill = tk.X)
+        self._value_text.pack(side = tk.TOP, fill = tk.BOTH, expand = True)
+        self._status_label.pack(side = tk.LEFT, padx = 5, pady = 5)
+        close_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+        save_btn.pack(side = tk.RIGHT, padx = 5, pady = 5)
+    
+    def write(self, chunk: Any):
+        """
+        Queue a chunk of the value for display (worker thread).
+        
+        Args:
+            chunk (bytes | str): The next chunk of the value
+        """
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = chunk.hex(" ", 1)
+        self._shown += len(chunk)
+        self._chunks.put(chunk)
+        
+    def finish(self, message: str):
+        """
+        Queue the final status of the load (worker thread).
+        
+        Args:
+            message (str): The status to display
+        """
+        if self._shown >= self.VIEW_LIMIT:
+            message = f"Showing the first {self._shown} characters, " \
+                "save to file for the full value"
+        # One item, so _poll never sees the end without the message
+        self._chunks.put((None, message))
+        
+    def should_stop(self) -> bool:
+        """
+        Returns whether loading should stop: the window was closed or 
+        enough of the value is shown (worker thread).
+        """
+        return self._closed or self._shown >= self.VIEW_LIMIT
+    
+    def _poll(self):
+        """
+        Move queued chunks into the text widget.
+        """
+        self._poll_id = None
+        text = []
+        while not self._chunks.empty():
+            chunk = self._chunks.get_nowait()
+            if isinstance(chunk, tuple):
+                self._append("".join(text))
+                self._status_label.configure(text = chunk[1])
+                return
+            text.append(chunk)
+        if text:
+            self._append("".join(text))
+            self._status_label.configure(
+                text = f"Loading... {self._shown} characters")
+        self._poll_id = self.after(self.POLL_INTERVAL_MS, self._poll)
+    
+    def _append(self, text: str):
+        """
+        Append text to the read-only text widget.
+        
+        Args:
+            text (str): The text to append
+        """
+        self._value_text.configure(state = tk.NORMAL)
+        self._value_text.insert(tk.END, text)
+        self._value_text.configure(state = tk.DISABLED)
+        
+    def _ask_save(self):
+        """
+        Ask for a file and save the full value to it.
+        """
+        path = self._ui_components.ask_save_file(title = "Save Value")
+        if path:
+            self._status_label.configure(text = f"Saving to {path}...")
+            self._save(path)
+            
+    def set_status(self, status: str):
+        """
+        Display a status, e.g. the result of saving.
+        
+        Args:
+            status (str): The status to display
+        """
+        self._status_label.configure(text = status)
+        
+    def destroy(self):
+        """
+        Stop loading the value and destroy the window.
+        """
+        self._closed = True
+        if self._poll_id is not None:
+            self.after_cancel(self._poll_id)
+        tk.Toplevel.destroy(self)